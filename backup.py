@@ -0,0 +1,329 @@
+"""
+Compressed, rotated backups of the database.
+Once a day a gzip archive of the database is written to the Backup folder, on
+a background thread started after the main window is shown. With
+BACKUP_MODE = "incremental" most archives only hold the orders that changed
+since the previous backup, and a full archive is made every
+BACKUP_FULL_INTERVAL_DAYS. Old archives are rotated out, keeping the newest
+backup of each recent day, week and month (and whatever those need to be
+restored).
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import threading
+from datetime import datetime, timedelta
+import config
+import database
+from utils import write_json_atomic
+
+TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+MANIFEST_FILE = "Backup_Manifest.json"
+INCREMENTAL_SUFFIX = ".incr.json.gz"
+# Data_<timestamp>.json.gz (full), Data_<timestamp>.incr.json.gz (incremental)
+# and the uncompressed Data_<timestamp>.json copies of earlier versions
+BACKUP_NAME = re.compile(r"^Data_(\d{8}_\d{6})(\.incr)?\.(json|sqlite)(\.gz)?$")
+
+
+def backup_folder(json_file):
+    return os.path.join(os.path.dirname(json_file) or ".", config.BACKUP_FOLDER)
+
+
+def list_backups(folder):
+    """Return the (timestamp, incremental, filename) of the backups, oldest first."""
+    backups = []
+    if not os.path.isdir(folder):
+        return backups
+    for name in os.listdir(folder):
+        match = BACKUP_NAME.match(name)
+        if match:
+            timestamp = datetime.strptime(match.group(1), TIMESTAMP_FORMAT)
+            backups.append((timestamp, match.group(2) is not None, name))
+    backups.sort()
+    return backups
+
+
+def backup_chains(backups):
+    """Map each backup to the backups needed to restore it, itself last.
+
+    An incremental backup holds the changes since the previous backup, so it
+    needs the full backup it is based on and every incremental one between.
+    """
+    chains = {}
+    chain = []
+    for _, incremental, name in backups:
+        chain = chain + [name] if incremental and chain else [name]
+        chains[name] = chain
+    return chains
+
+
+def select_retained(backups):
+    """Return the names of the backups that the rotation keeps.
+
+    Keeps the newest backup of each of the last BACKUP_KEEP_DAILY days,
+    BACKUP_KEEP_WEEKLY weeks and BACKUP_KEEP_MONTHLY months that have one,
+    plus the backups they are restored from.
+    """
+    periods = [
+        (lambda ts: ts.date(), config.BACKUP_KEEP_DAILY),
+        (lambda ts: ts.isocalendar()[:2], config.BACKUP_KEEP_WEEKLY),
+        (lambda ts: (ts.year, ts.month), config.BACKUP_KEEP_MONTHLY),
+    ]
+    chains = backup_chains(backups)
+    keep = set()
+    for period_of, count in periods:
+        seen = set()
+        for timestamp, _, name in reversed(backups):
+            period = period_of(timestamp)
+            if period in seen:
+                continue
+            if len(seen) >= count:
+                break
+            seen.add(period)
+            keep.update(chains[name])
+    return keep
+
+
+def rotate_backups(folder):
+    """Delete the backups the rotation does not keep; returns their names."""
+    backups = list_backups(folder)
+    keep = select_retained(backups)
+    removed = []
+    for _, _, name in backups:
+        if name not in keep:
+            os.remove(os.path.join(folder, name))
+            removed.append(name)
+    return removed
+
+
+def order_fingerprints(db):
+    """Return {version: {order: digest}} of every order in the database.
+
+    The lock is taken per order, so the UI is not blocked for the whole scan.
+    """
+    with db.lock:
+        orders = [(version, order) for version, order, _ in db.select_orders()]
+    fingerprints = {}
+    for version, order in orders:
+        with db.lock:
+            details = db.get_order(version, order)
+            if details is None:
+                continue
+            encoded = json.dumps(details, sort_keys=True).encode("utf-8")
+        digest = hashlib.blake2b(encoded, digest_size=16).hexdigest()
+        fingerprints.setdefault(version, {})[order] = digest
+    return fingerprints
+
+
+def write_gzip_json(path, data):
+    tmp_path = path + ".tmp"
+    with gzip.open(
+        tmp_path, "wt", encoding="utf-8", compresslevel=config.BACKUP_COMPRESSLEVEL
+    ) as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def write_full_backup(db, folder, timestamp):
+    """Write a gzip copy of the database file; returns its path."""
+    extension = os.path.splitext(db.storage_file)[1]
+    path = os.path.join(folder, f"Data_{timestamp}{extension}.gz")
+    copy_path = path + ".copy"
+    tmp_path = path + ".tmp"
+    try:
+        # Only the plain copy holds the lock; compressing it does not.
+        # snapshot_file() folds pending journal entries in first
+        with db.lock:
+            shutil.copy2(db.snapshot_file(), copy_path)
+        with open(copy_path, "rb") as src, gzip.open(
+            tmp_path, "wb", compresslevel=config.BACKUP_COMPRESSLEVEL
+        ) as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        os.replace(tmp_path, path)
+    finally:
+        for leftover in (copy_path, tmp_path):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+    return path
+
+
+def write_incremental_backup(db, folder, timestamp, previous, fingerprints):
+    """Write the orders changed since `previous`; returns (path, changed count).
+
+    `previous` and `fingerprints` are order_fingerprints() of the last backup
+    and of now; removed orders are listed by (version, order).
+    """
+    changed = {}
+    removed = []
+    count = 0
+    for version, orders in fingerprints.items():
+        for order, digest in orders.items():
+            if previous.get(version, {}).get(order) == digest:
+                continue
+            with db.lock:
+                details = db.get_order(version, order)
+                if details is not None:
+                    # Copied under the lock, as the UI may change the order
+                    details = json.loads(json.dumps(details))
+            if details is not None:
+                changed.setdefault(version, {})[order] = details
+                count += 1
+    for version, orders in previous.items():
+        for order in orders:
+            if order not in fingerprints.get(version, {}):
+                removed.append([version, order])
+    path = os.path.join(folder, f"Data_{timestamp}{INCREMENTAL_SUFFIX}")
+    write_gzip_json(path, {"orders": changed, "removed": removed})
+    return path, count + len(removed)
+
+
+def needs_full_backup(manifest, backups, now):
+    """Whether the next incremental-mode backup must be a full one."""
+    names = [name for _, _, name in backups]
+    base = manifest.get("base")
+    if not names or base not in names or manifest.get("last") != names[-1]:
+        return True
+    base_time = datetime.strptime(BACKUP_NAME.match(base).group(1), TIMESTAMP_FORMAT)
+    return now - base_time >= timedelta(days=config.BACKUP_FULL_INTERVAL_DAYS)
+
+
+def run_backup(json_file):
+    """Make today's backup if there is none yet and rotate old backups.
+
+    Returns (success, message).
+    """
+    try:
+        db = database.get_database(json_file)
+        with db.lock:
+            if not db.exists():
+                return False, f"Backup skipped: {json_file} not found."
+
+        folder = backup_folder(json_file)
+        os.makedirs(folder, exist_ok=True)
+        now = datetime.now()
+        backups = list_backups(folder)
+        if any(timestamp.date() == now.date() for timestamp, _, _ in backups):
+            return True, f"Backup already exists for {now:%Y%m%d}."
+
+        # Leftovers of a backup interrupted by closing the application
+        for name in os.listdir(folder):
+            if name.startswith("Data_") and name.endswith((".tmp", ".copy")):
+                os.remove(os.path.join(folder, name))
+
+        timestamp = now.strftime(TIMESTAMP_FORMAT)
+        manifest_path = os.path.join(folder, MANIFEST_FILE)
+        manifest = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+
+        # Incremental backups need the JSON backend; SQLite is always copied
+        incremental = config.BACKUP_MODE == "incremental" and (
+            db.storage_file.endswith(".json")
+        )
+        if incremental:
+            # Taken before the archive is written: an order changed meanwhile
+            # is at worst stored again by the next backup, never missed
+            fingerprints = order_fingerprints(db)
+        if not incremental or needs_full_backup(manifest, backups, now):
+            path = write_full_backup(db, folder, timestamp)
+            message = f"Backup created: {path}"
+            base = os.path.basename(path)
+        else:
+            path, count = write_incremental_backup(
+                db, folder, timestamp, manifest["fingerprints"], fingerprints
+            )
+            message = f"Incremental backup created ({count} changed orders): {path}"
+            base = manifest["base"]
+
+        if incremental:
+            write_json_atomic(
+                manifest_path,
+                {
+                    "base": base,
+                    "last": os.path.basename(path),
+                    "fingerprints": fingerprints,
+                },
+            )
+        elif os.path.exists(manifest_path):
+            os.remove(manifest_path)
+
+        removed = rotate_backups(folder)
+        if removed:
+            message += f"\nRemoved {len(removed)} old backup(s)."
+        return True, message
+    except Exception as e:
+        return False, f"Error creating backup: {str(e)}"
+
+
+def start_backup(json_file):
+    """Run run_backup on a background thread; the result is printed."""
+
+    def run():
+        success, message = run_backup(json_file)
+        print(message)
+
+    thread = threading.Thread(target=run, name="backup", daemon=True)
+    thread.start()
+    return thread
+
+
+def read_backup(path):
+    """Return the database dict stored in a full JSON backup (gzip or plain)."""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_backup(path):
+    """Return the database dict as it was when the backup at `path` was made."""
+    folder = os.path.dirname(path) or "."
+    chain = backup_chains(list_backups(folder)).get(os.path.basename(path))
+    if chain is None:
+        raise ValueError(f"Not a backup archive: {path}")
+    if ".sqlite" in chain[0]:
+        raise ValueError("SQLite backups are restored by decompressing them.")
+    data = read_backup(os.path.join(folder, chain[0]))
+    for name in chain[1:]:
+        changes = read_backup(os.path.join(folder, name))
+        for version, order in changes["removed"]:
+            data.get(version, {}).pop(order, None)
+            if version in data and not data[version]:
+                del data[version]
+        for version, orders in changes["orders"].items():
+            data.setdefault(version, {}).update(orders)
+    return data
+
+
+def restore_backup(path, target_file):
+    """Write the database of a backup to `target_file` (not the open database).
+
+    Returns (success, message).
+    """
+    try:
+        name = os.path.basename(path)
+        if ".sqlite" in name:
+            opener = gzip.open if name.endswith(".gz") else open
+            with opener(path, "rb") as src, open(target_file, "wb") as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+        else:
+            write_json_atomic(target_file, load_backup(path), indent=2)
+        return True, f"Backup {name} restored to {target_file}"
+    except Exception as e:
+        return False, f"Error restoring backup: {str(e)}"
+
+
+if __name__ == "__main__":
+    # python backup.py                    -> back up config.JSON_FILE now
+    # python backup.py <archive> <target> -> restore a backup to a new file
+    if len(sys.argv) > 2:
+        success, message = restore_backup(sys.argv[1], sys.argv[2])
+    else:
+        success, message = run_backup(config.JSON_FILE)
+    print(message)
+    sys.exit(0 if success else 1)
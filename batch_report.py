@@ -0,0 +1,196 @@
+"""
+Headless batch reports for the Ballistic Tests Database application.
+Writes the same PDF and Excel reports as the report window, without the GUI
+(Tk is never imported), for one job per version. Jobs run in parallel worker
+processes, so the nightly report set of every version can run unattended:
+
+    python batch_report.py
+    python batch_report.py --versions V124 V125 --from 2025-01-01 --to 2025-06-30
+    python batch_report.py --versions V124 --orders 700011 700010 --temperatures RT HT
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime
+import config
+import database
+from order_index import UNDATED_ORDINAL
+from report_data import build_report_data
+from report_pdf import write_report_pdf
+from report_workbook import write_report_workbook
+
+FORMATS = {"pdf": write_report_pdf, "xlsx": write_report_workbook}
+
+
+def select_records(
+    json_file,
+    version,
+    orders=None,
+    start_date=None,
+    end_date=None,
+    temperatures=None,
+):
+    """Return the workplace records of a report job as (records, error).
+
+    Selects the orders of `version` tested between start_date and end_date
+    (date objects, inclusive), optionally only the given order numbers and
+    temperatures. An empty selection is not an error.
+    """
+    db = database.get_database(json_file)
+    if not db.exists():
+        return [], "Database not found."
+    with db.lock:
+        if start_date is None and end_date is not None:
+            # Undated orders sort at UNDATED_ORDINAL and match no date range
+            start_date = date.fromordinal(UNDATED_ORDINAL + 1)
+        selected = [
+            (v, order)
+            for v, order, _ in db.select_orders(version, start_date, end_date)
+            if not orders or order in orders
+        ]
+    if not selected:
+        return [], None
+    records, message = database.get_workplace_data(json_file, selected)
+    if not records:
+        return [], message
+    if temperatures:
+        records = [r for r in records if r["type"] in temperatures]
+    return records, None
+
+
+def run_job(json_file, job, output_dir, formats):
+    """Write the reports of one job; returns (written files, error).
+
+    `job` is a dict with the select_records arguments (version, orders,
+    start_date, end_date, temperatures). Runs in the worker processes; a job
+    without tests writes nothing.
+    """
+    try:
+        records, error = select_records(json_file, **job)
+        if error is not None or not records:
+            return [], error
+        data_by_temp, table_data, ms_points_dict = build_report_data(json_file, records)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        written = []
+        for extension in formats:
+            filename = os.path.join(
+                output_dir, f"report_{job['version']}_{timestamp}.{extension}"
+            )
+            FORMATS[extension](
+                data_by_temp, table_data, ms_points_dict, json_file, filename
+            )
+            written.append(filename)
+        return written, None
+    except Exception as e:
+        return [], f"Error generating report: {str(e)}"
+
+
+def run_jobs(json_file, jobs, output_dir, formats, workers=None, progress=None):
+    """Run report jobs, in parallel if configured.
+
+    Returns one (job, written files, error) tuple per job, in job order.
+    After each job, `progress(done, total, job, written, error)` is called if
+    given.
+    """
+    if workers is None:
+        workers = config.BATCH_REPORT_WORKERS
+    workers = min(workers, len(jobs))
+    os.makedirs(output_dir, exist_ok=True)
+    results = [None] * len(jobs)
+
+    def finish(done, idx, written, error):
+        results[idx] = (jobs[idx], written, error)
+        if progress is not None:
+            progress(done, len(jobs), jobs[idx], written, error)
+
+    if workers <= 1:
+        for idx, job in enumerate(jobs):
+            finish(idx + 1, idx, *run_job(json_file, job, output_dir, formats))
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(run_job, json_file, job, output_dir, formats): idx
+            for idx, job in enumerate(jobs)
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            idx = futures[future]
+            try:
+                written, error = future.result()
+            except Exception as e:
+                written, error = [], str(e)
+            finish(done, idx, written, error)
+    return results
+
+
+def parse_args(argv):
+    def date_arg(value):
+        try:
+            return datetime.strptime(value, "%Y-%m-%d").date()
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid date (YYYY-MM-DD): {value}")
+
+    parser = argparse.ArgumentParser(
+        description="Write PDF and Excel reports without the GUI, one per version."
+    )
+    parser.add_argument("--json-file", default=config.JSON_FILE)
+    parser.add_argument(
+        "--versions", nargs="+", help="versions to report (default: all versions)"
+    )
+    parser.add_argument("--orders", nargs="+", help="only these order numbers")
+    parser.add_argument("--from", dest="start_date", type=date_arg)
+    parser.add_argument("--to", dest="end_date", type=date_arg)
+    parser.add_argument("--temperatures", nargs="+", choices=config.TEMPERATURE_TYPES)
+    parser.add_argument(
+        "--formats", nargs="+", choices=list(FORMATS), default=list(FORMATS)
+    )
+    parser.add_argument("--output-dir", default=config.BATCH_REPORT_FOLDER)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=config.BATCH_REPORT_WORKERS,
+        help="worker processes (1 = serial)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    db = database.get_database(args.json_file)
+    if not db.exists():
+        print(f"Database not found: {args.json_file}")
+        return 1
+    with db.lock:
+        versions = args.versions or db.versions()
+
+    jobs = [
+        {
+            "version": version,
+            "orders": set(args.orders) if args.orders else None,
+            "start_date": args.start_date,
+            "end_date": args.end_date,
+            "temperatures": args.temperatures,
+        }
+        for version in versions
+    ]
+
+    def progress(done, total, job, written, error):
+        if error is not None:
+            status = error
+        else:
+            status = ", ".join(written) or "no tests to report"
+        print(f"[{done}/{total}] {job['version']}: {status}")
+
+    results = run_jobs(
+        args.json_file, jobs, args.output_dir, args.formats, args.workers, progress
+    )
+    failed = [job for job, written, error in results if error is not None]
+    reported = [job for job, written, error in results if written]
+    print(f"{len(reported)} of {len(jobs)} versions reported, {len(failed)} failed.")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
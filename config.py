@@ -5,12 +5,32 @@ Centralizes file paths, Excel processing parameters, UI settings, and other key
 to facilitate maintenance and updates.
 """
 
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-
 # File Paths and Database Settings
 JSON_FILE = "Data.json"
 BACKUP_FOLDER = "Backup"
 EXCEL_FOLDER = r"H:\TEAMS\Inflator_Lab\0_Evaluations\vi"
+MANIFEST_FILE = "Ingest_Manifest.json"  # Fingerprints of ingested workbooks
+
+# Storage Backend ("json" or "sqlite"; the SQLite file lives next to JSON_FILE
+# and is filled from it automatically the first time it is opened)
+STORAGE_BACKEND = "json"
+SQLITE_FILE = "Data.sqlite"
+
+# Startup (print how long each startup step took, see main.py)
+STARTUP_TIMING_REPORT = False
+
+# Journal Settings (changes are appended to JSON_FILE + JOURNAL_SUFFIX and
+# folded into the snapshot once the journal reaches JOURNAL_COMPACT_BYTES;
+# copy JSON_FILE together with its journal, or use a backup, which folds the
+# journal in first)
+JOURNAL_ENABLED = True
+JOURNAL_SUFFIX = ".journal"
+JOURNAL_COMPACT_BYTES = 5 * 1024 * 1024
+
+# Curve Store Settings (binary .npz copies of the pressure curves, derived
+# from the database and safe to delete; disabled = in-memory only)
+CURVE_STORE_ENABLED = True
+CURVE_STORE_FOLDER = "Curves"
 
 # Excel Processing Constants (for process_grafik and process_datenblatt)
 MIN_LIMIT_ROW = 51
@@ -21,12 +41,57 @@ MAX_COLUMN = 151
 EXPECTED_SHEET_NAME = "Grafik"  # Expected sheet name for grafik files
 DATENBLATT_SHEET_NAME = "Datenblatt"  # Expected sheet name for datenblatt files
 
+# Parallel Ingestion (worker processes used by process_orders; 1 = serial)
+INGEST_WORKERS = 4
+INGEST_POLL_MS = 100  # How often the UI reads progress from the ingestion thread
+
+# Report Window (graphs are re-rendered once resizing pauses for this long)
+REPORT_RESIZE_DEBOUNCE_MS = 150
+PRESSURE_MATRIX_CACHE_SIZE = 8  # Selections whose pressure matrix is kept
+
+# Trend Analysis (Cpk is tracked at the first TREND_KEY_POINTS time points,
+# i.e. the PK 10% ... PK MAX columns of the report)
+TREND_KEY_POINTS = 6
+TREND_CPK_TARGET = 1.33  # Reference line in the trend window
+
+# PDF Export (above this many curves per temperature the curves are embedded
+# as an image at PDF_RASTER_DPI; text, limits and mean stay vector graphics)
+PDF_VECTOR_CURVES_MAX = 200
+PDF_RASTER_DPI = 200
+PDF_ORDER_APPENDIX = True  # Append one section per order (curves and values)
+PDF_TABLE_ROWS_PER_PAGE = 40  # Table rows per page before continuing on the next
+
+# Batch Reports (batch_report.py; one job per version, run in worker
+# processes; 1 = serial)
+BATCH_REPORT_WORKERS = 4
+BATCH_REPORT_FOLDER = "output"
+
+# Orders Search (the search runs once typing pauses for SEARCH_DELAY_MS)
+SEARCH_DELAY_MS = 250
+SEARCH_MAX_RESULTS = 200
+
 # Temperature Types
 TEMPERATURE_TYPES = ["RT", "LT", "HT"]
 
+# Pressure Points (columns of the report tables and trend charts, one per
+# time point in ms order)
+PRESSURE_POINTS = ["PK 10%", "PK 25%", "PK 50%", "PK 75%", "PK 90%", "PK MAX"]
+
 # Backup Settings
 BACKUP_PREFIX = "Backup_Data_"
 BACKUP_EXTENSION = ".json"
+# One gzip backup a day, made on a background thread BACKUP_DELAY_MS after the
+# window opens. "incremental" stores only the orders changed since the previous
+# backup, with a full one every BACKUP_FULL_INTERVAL_DAYS; "full" always copies
+# the whole database. The rotation keeps the newest backup of the last
+# BACKUP_KEEP_DAILY days, BACKUP_KEEP_WEEKLY weeks and BACKUP_KEEP_MONTHLY months
+BACKUP_MODE = "full"
+BACKUP_FULL_INTERVAL_DAYS = 7
+BACKUP_COMPRESSLEVEL = 6  # gzip level, 1 (fastest) to 9 (smallest)
+BACKUP_KEEP_DAILY = 7
+BACKUP_KEEP_WEEKLY = 4
+BACKUP_KEEP_MONTHLY = 12
+BACKUP_DELAY_MS = 2000
 
 # Date Filter Periods (for main.py)
 DATE_FILTER_PERIODS = {
@@ -36,54 +101,63 @@ DATE_FILTER_PERIODS = {
     "Last 90 days": 90,
 }
 
-# Excel Styling Constants (for export_database.py)
-TITLE_FONT = Font(name="Calibri", size=10, bold=True, color="FFFFFF")
-METADATA_FONT = Font(name="Calibri", size=10, bold=True)
-HEADER_FONT = Font(name="Calibri", size=10, bold=True)
-DATA_FONT = Font(name="Calibri", size=10)
-NOTE_FONT = Font(name="Calibri", size=9, italic=True)
-
-TITLE_FILL = PatternFill(
-    start_color="4682B4", end_color="4682B4", fill_type="solid"
-)  # Steel blue
-METADATA_FILL = PatternFill(
-    start_color="E6F0FA", end_color="E6F0FA", fill_type="solid"
-)  # Light blue
-RT_FILL = PatternFill(
-    start_color="CCFFCC", end_color="CCFFCC", fill_type="solid"
-)  # Light green
-LT_FILL = PatternFill(
-    start_color="CCE6FF", end_color="CCE6FF", fill_type="solid"
-)  # Light blue
-HT_FILL = PatternFill(
-    start_color="FFE6CC", end_color="FFE6CC", fill_type="solid"
-)  # Light orange
-ALT_FILL = PatternFill(
-    start_color="F5F5F5", end_color="F5F5F5", fill_type="solid"
-)  # Light gray
-WARNING_FILL = PatternFill(
-    start_color="FF9999", end_color="FF9999", fill_type="solid"
-)  # Red
-LOW_FILL = PatternFill(
-    start_color="99CCFF", end_color="99CCFF", fill_type="solid"
-)  # Blue
-
-CENTER_ALIGNMENT = Alignment(horizontal="center", vertical="center", wrap_text=True)
-LEFT_ALIGNMENT = Alignment(horizontal="left", vertical="center")
-
-THIN_BORDER = Border(
-    left=Side(style="thin"),
-    right=Side(style="thin"),
-    top=Side(style="thin"),
-    bottom=Side(style="thin"),
-)
-THICK_BORDER = Border(
-    left=Side(style="thick"),
-    right=Side(style="thick"),
-    top=Side(style="thick"),
-    bottom=Side(style="thick"),
+
+# Excel Styling Constants (for export_database.py; the openpyxl objects are
+# only built when one of them is first used, so importing config stays cheap)
+EXCEL_STYLE_NAMES = (
+    "TITLE_FONT",
+    "METADATA_FONT",
+    "HEADER_FONT",
+    "DATA_FONT",
+    "NOTE_FONT",
+    "TITLE_FILL",
+    "METADATA_FILL",
+    "RT_FILL",
+    "LT_FILL",
+    "HT_FILL",
+    "ALT_FILL",
+    "WARNING_FILL",
+    "LOW_FILL",
+    "CENTER_ALIGNMENT",
+    "LEFT_ALIGNMENT",
+    "THIN_BORDER",
+    "THICK_BORDER",
 )
 
+
+def _excel_styles():
+    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+
+    def solid(color):
+        return PatternFill(start_color=color, end_color=color, fill_type="solid")
+
+    def border(style):
+        side = Side(style=style)
+        return Border(left=side, right=side, top=side, bottom=side)
+
+    return {
+        "TITLE_FONT": Font(name="Calibri", size=10, bold=True, color="FFFFFF"),
+        "METADATA_FONT": Font(name="Calibri", size=10, bold=True),
+        "HEADER_FONT": Font(name="Calibri", size=10, bold=True),
+        "DATA_FONT": Font(name="Calibri", size=10),
+        "NOTE_FONT": Font(name="Calibri", size=9, italic=True),
+        "TITLE_FILL": solid("4682B4"),  # Steel blue
+        "METADATA_FILL": solid("E6F0FA"),  # Light blue
+        "RT_FILL": solid("CCFFCC"),  # Light green
+        "LT_FILL": solid("CCE6FF"),  # Light blue
+        "HT_FILL": solid("FFE6CC"),  # Light orange
+        "ALT_FILL": solid("F5F5F5"),  # Light gray
+        "WARNING_FILL": solid("FF9999"),  # Red
+        "LOW_FILL": solid("99CCFF"),  # Blue
+        "CENTER_ALIGNMENT": Alignment(
+            horizontal="center", vertical="center", wrap_text=True
+        ),
+        "LEFT_ALIGNMENT": Alignment(horizontal="left", vertical="center"),
+        "THIN_BORDER": border("thin"),
+        "THICK_BORDER": border("thick"),
+    }
+
+
 # Error Messages
 ERROR_MESSAGES = {
     "no_database_found": "Database file not found.",
@@ -92,3 +166,16 @@ ERROR_MESSAGES = {
     "invalid_date_format": "Invalid date format. Use YYYY-MM-DD.",
     "invalid_date_range": "End date must be after start date.",
 }
+
+
+def __getattr__(name):
+    """Build the Excel styling constants on first access (PEP 562).
+
+    Other names raise AttributeError without importing openpyxl, so hasattr()
+    and getattr() with a default stay cheap.
+    """
+    if name not in EXCEL_STYLE_NAMES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    styles = _excel_styles()
+    globals().update(styles)
+    return styles[name]
@@ -0,0 +1,129 @@
+"""
+Process capability statistics for pressure curves.
+Computes Cp, Cpk, Pp, Ppk, sigma and out-of-limit counts for every time point
+of a pressure matrix (inflators x ms) at once with NumPy; the specification
+limits are the maximum/minimum curves read from the Grafik sheets.
+"""
+
+import numpy as np
+
+# (label, statistic, format) of the rows shown in the report and the exports
+CAPABILITY_ROWS = [
+    ("Sigma (bar)", "sigma_within", "{:.2f}"),
+    ("Cp", "cp", "{:.2f}"),
+    ("Cpk", "cpk", "{:.2f}"),
+    ("Pp", "pp", "{:.2f}"),
+    ("Ppk", "ppk", "{:.2f}"),
+    ("Above Max", "above_max", "{:d}"),
+    ("Below Min", "below_min", "{:d}"),
+]
+
+
+def group_codes(groups):
+    """Map hashable group keys (e.g. (version, order)) to integer codes."""
+    codes = {}
+    return np.array([codes.setdefault(group, len(codes)) for group in groups])
+
+
+def pooled_sigma(matrix, codes):
+    """Within-group standard deviation per column, pooled over the groups.
+
+    sqrt(sum((n_i - 1) * s_i^2) / sum(n_i - 1)), ignoring NaN values.
+    """
+    finite = np.isfinite(matrix)
+    counts_total = finite.sum(axis=0)
+    # Centre each column first to keep the sum-of-squares numerically stable
+    with np.errstate(invalid="ignore", divide="ignore"):
+        column_mean = np.where(finite, matrix, 0.0).sum(axis=0) / counts_total
+    values = np.where(finite, matrix - column_mean, 0.0)
+
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    counts = np.add.reduceat(finite[order].astype(np.int64), starts, axis=0)
+    sums = np.add.reduceat(values[order], starts, axis=0)
+    sums_sq = np.add.reduceat(values[order] ** 2, starts, axis=0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        squares = np.where(counts > 0, sums_sq - sums**2 / counts, 0.0)
+        dof = np.clip(counts - 1, 0, None).sum(axis=0)
+        variance = np.where(dof > 0, squares.sum(axis=0) / dof, np.nan)
+    return np.sqrt(np.clip(variance, 0.0, None))
+
+
+def capability_indices(mean, sigma, limits_max, limits_min):
+    """Return (C, Ck) for a sigma: Cp/Cpk with the within, Pp/Ppk with the overall.
+
+    With only one limit defined, C is NaN and Ck uses that side alone.
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sigma = np.where(sigma > 0, sigma, np.nan)
+        c = (limits_max - limits_min) / (6 * sigma)
+        upper = (limits_max - mean) / (3 * sigma)
+        lower = (mean - limits_min) / (3 * sigma)
+    return c, np.fmin(upper, lower)
+
+
+def capability_stats(pressure_matrix, limits_max, limits_min, groups=None):
+    """Capability statistics for every column of a pressure matrix.
+
+    `groups` gives the subgroup (order) of every row for the within-order
+    sigma behind Cp/Cpk; Pp/Ppk use the overall sigma. Missing values and
+    limits are NaN. Returns a dict of arrays with one value per column.
+    """
+    matrix = np.asarray(pressure_matrix, dtype=np.float64)
+    limits_max = np.asarray(limits_max, dtype=np.float64)
+    limits_min = np.asarray(limits_min, dtype=np.float64)
+    if groups is None:
+        codes = np.zeros(len(matrix), dtype=np.int64)
+    else:
+        codes = group_codes(groups)
+
+    finite = np.isfinite(matrix)
+    n = finite.sum(axis=0)
+    values = np.where(finite, matrix, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = values.sum(axis=0) / n
+        deviations = np.where(finite, matrix - mean, 0.0)
+        sigma_overall = np.where(
+            n > 1, np.sqrt((deviations**2).sum(axis=0) / (n - 1)), np.nan
+        )
+    sigma_within = pooled_sigma(matrix, codes)
+
+    cp, cpk = capability_indices(mean, sigma_within, limits_max, limits_min)
+    pp, ppk = capability_indices(mean, sigma_overall, limits_max, limits_min)
+
+    # Comparisons with NaN are False, so missing points and limits never count
+    with np.errstate(invalid="ignore"):
+        above_max = (matrix > limits_max).sum(axis=0)
+        below_min = (matrix < limits_min).sum(axis=0)
+
+    return {
+        "n": n,
+        "mean": mean,
+        "sigma_within": sigma_within,
+        "sigma_overall": sigma_overall,
+        "cp": cp,
+        "cpk": cpk,
+        "pp": pp,
+        "ppk": ppk,
+        "above_max": above_max,
+        "below_min": below_min,
+    }
+
+
+def capability_rows(stats, n_columns):
+    """Format the first `n_columns` values of each statistic as table rows.
+
+    Returns (label, [label, value, ...]) tuples like the report table rows;
+    NaN or missing columns are shown as "-".
+    """
+    rows = []
+    for label, key, fmt in CAPABILITY_ROWS:
+        cells = []
+        for value in stats[key][:n_columns].tolist():
+            is_missing = isinstance(value, float) and not np.isfinite(value)
+            cells.append("-" if is_missing else fmt.format(value))
+        cells += ["-"] * (n_columns - len(cells))
+        rows.append((label, [label] + cells))
+    return rows
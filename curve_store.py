@@ -0,0 +1,170 @@
+"""
+Columnar sidecar store for pressure curves.
+Each temperature block of an order is kept as one .npz file holding the ms axis,
+the inflator numbers and a float64 matrix (inflators x ms, NaN where a point is
+missing). Reports slice these arrays directly instead of rebuilding matrices
+from the nested {"ms": value} dictionaries of the JSON database.
+A file also records a digest of the pressure_data it was built from, so a file
+left behind by an edit of the database is detected and rebuilt.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from collections import namedtuple
+import numpy as np
+import config
+
+CurveBlock = namedtuple("CurveBlock", ["ms_axis", "inflator_nos", "matrix"])
+
+
+def block_from_temperature(temp_data):
+    """Convert the pressure_data list of a temperature block into a CurveBlock."""
+    pressure_data = temp_data.get("pressure_data", [])
+    ms_keys = set()
+    for item in pressure_data:
+        ms_keys.update(item["pressures"].keys())
+    ms_axis = np.array(sorted(int(ms) for ms in ms_keys), dtype=np.int32)
+    column_of = {str(ms): col for col, ms in enumerate(ms_axis.tolist())}
+
+    matrix = np.full((len(pressure_data), len(ms_axis)), np.nan, dtype=np.float64)
+    for row, item in enumerate(pressure_data):
+        pressures = item["pressures"]
+        if pressures:
+            cols = [column_of[ms] for ms in pressures]
+            matrix[row, cols] = list(pressures.values())
+    inflator_nos = np.array(
+        [item["inflator_no"] for item in pressure_data], dtype=np.int64
+    )
+    return CurveBlock(ms_axis, inflator_nos, matrix)
+
+
+def source_digest(temp_data):
+    """Digest of the pressure_data a CurveBlock is built from."""
+    payload = json.dumps(temp_data.get("pressure_data", []), sort_keys=True)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class CurveStore:
+    """Cache of CurveBlocks, persisted as .npz files when a folder is given."""
+
+    def __init__(self, folder=None):
+        self.folder = folder
+        self._blocks = {}
+
+    def _path(self, version, order, temp_type):
+        return os.path.join(self.folder, f"{version}_{order}_{temp_type}.npz")
+
+    def get(self, version, order, temp_type, temp_data):
+        """Return the CurveBlock of a temperature block, building it if needed."""
+        key = (version, order, temp_type)
+        block = self._blocks.get(key)
+        if block is None and self.folder:
+            block = self._read(key, temp_data)
+        if block is None:
+            block = block_from_temperature(temp_data)
+            if self.folder:
+                self._write(key, block, source_digest(temp_data))
+        self._blocks[key] = block
+        return block
+
+    def _read(self, key, temp_data):
+        path = self._path(*key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as npz:
+                block = CurveBlock(npz["ms_axis"], npz["inflator_nos"], npz["matrix"])
+                digest = str(npz["source_digest"]) if "source_digest" in npz else None
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ignoring unreadable curve file {path}: {str(e)}")
+            return None
+        # The file is stale when the pressures changed since it was written
+        if digest != source_digest(temp_data):
+            return None
+        return block
+
+    def _write(self, key, block, digest):
+        os.makedirs(self.folder, exist_ok=True)
+        path = self._path(*key)
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=self.folder)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(
+                    f,
+                    ms_axis=block.ms_axis,
+                    inflator_nos=block.inflator_nos,
+                    matrix=block.matrix,
+                    source_digest=np.array(digest),
+                )
+            os.replace(tmp_path, path)
+        except OSError as e:
+            # The store is derived data; failing to persist only costs a rebuild
+            print(f"Error writing curve file {path}: {str(e)}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def write_order(self, version, order, details, temp_types=None):
+        """Rebuild the stored blocks of an order (or of some of its temperatures)."""
+        temperatures = details.get("temperatures", {})
+        for temp_type in temp_types or config.TEMPERATURE_TYPES:
+            key = (version, order, temp_type)
+            self._blocks.pop(key, None)
+            if temp_type in temperatures:
+                temp_data = temperatures[temp_type]
+                block = block_from_temperature(temp_data)
+                self._blocks[key] = block
+                if self.folder:
+                    self._write(key, block, source_digest(temp_data))
+            elif self.folder and os.path.exists(self._path(*key)):
+                os.remove(self._path(*key))
+
+    def remove_order(self, version, order):
+        """Drop every stored block of an order."""
+        for temp_type in config.TEMPERATURE_TYPES:
+            key = (version, order, temp_type)
+            self._blocks.pop(key, None)
+            if self.folder and os.path.exists(self._path(*key)):
+                os.remove(self._path(*key))
+
+    def clear_cache(self):
+        self._blocks = {}
+
+
+def stack_curves(records, load_block):
+    """Build the pressure matrix of workplace records from curve blocks.
+
+    `load_block(version, order, temp_type)` returns a CurveBlock or None.
+    Returns (ms_axis, matrix) where matrix has one float64 row per record
+    (NaN where no data) and ms_axis holds the time points with data.
+    """
+    groups = {}
+    for row, record in enumerate(records):
+        key = (record["version"], record["order"], record["type"])
+        groups.setdefault(key, []).append((row, record["inflator_no"]))
+
+    pieces = []
+    for key, members in groups.items():
+        block = load_block(*key)
+        if block is None or not len(block.ms_axis):
+            continue
+        block_row_of = {no: idx for idx, no in enumerate(block.inflator_nos.tolist())}
+        rows = [row for row, no in members if no in block_row_of]
+        block_rows = [block_row_of[no] for row, no in members if no in block_row_of]
+        if not rows:
+            continue
+        values = block.matrix[block_rows]
+        # Keep only time points that have data for the selected inflators
+        has_data = ~np.all(np.isnan(values), axis=0)
+        pieces.append((rows, block.ms_axis[has_data], values[:, has_data]))
+
+    if pieces:
+        ms_axis = np.unique(np.concatenate([ms for _, ms, _ in pieces]))
+    else:
+        ms_axis = np.array([], dtype=np.int32)
+    matrix = np.full((len(records), len(ms_axis)), np.nan, dtype=np.float64)
+    for rows, ms, values in pieces:
+        cols = np.searchsorted(ms_axis, ms)
+        matrix[np.ix_(rows, cols)] = values
+    return ms_axis, matrix
@@ -4,117 +4,805 @@ Handles all JSON and Excel manipulation for the Ballistic Tests Database applica
 Centralizes database operations (reading/writing JSON, processing Excel files) for modularity.
 """
 
+import hashlib
 import os
-import glob
-import shutil
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import json
 import numpy as np
 from datetime import datetime, timedelta
-from openpyxl import load_workbook
 import config
-from utils import clean_value, parse_date
+from utils import clean_value, parse_date, write_json_atomic
+from order_index import OrderIndex
+from search_index import SearchIndex
+from folder_index import get_folder_index
+from ingest_manifest import IngestManifest, file_digest
+from curve_store import CurveStore, stack_curves
+
+
+class Database:
+    """In-memory view of the JSON database.
+
+    The file is parsed once and kept in memory; it is only re-read when its
+    modification time or size changes on disk.
+
+    With config.JOURNAL_ENABLED, changes are appended to a journal next to the
+    snapshot (one compact JSON operation per line) instead of rewriting the
+    whole file. The journal is replayed on load and folded into the snapshot
+    by compact(), which replaces the file atomically. JSON_FILE alone can
+    therefore miss the latest changes: it must be copied together with its
+    journal (backups fold the journal in first).
+
+    The first journal line holds the SHA-256 of the snapshot the journal
+    applies to. A journal that does not match the snapshot (e.g. Data.json
+    was copied or restored without it) is never replayed; the next write
+    moves it aside for manual recovery instead of discarding it.
+
+    Callers that may run on a background thread (ingestion) hold `lock`
+    around every read or write of the in-memory data.
+    """
+
+    def __init__(self, json_file):
+        self.json_file = json_file
+        self.lock = threading.RLock()
+        self.storage_file = json_file
+        self.journal_file = json_file + config.JOURNAL_SUFFIX
+        self._data = None
+        self._signature = None
+        self._index = None
+        self._search = None
+        self._dirty = {}
+        self._journal_valid_bytes = None
+        self._journal_stale = False
+        self._snapshot_digest = None
+        self._revision = 0
+        self._order_revisions = {}
+        self._base_revision = 0
+        curve_folder = None
+        if config.CURVE_STORE_ENABLED:
+            base_dir = os.path.dirname(json_file) or "."
+            curve_folder = os.path.join(base_dir, config.CURVE_STORE_FOLDER)
+        self.curves = CurveStore(curve_folder)
+
+    def _file_signature(self):
+        signature = []
+        for path in (self.json_file, self.journal_file):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                signature.append(None)
+                continue
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        if signature[0] is None:
+            return None
+        return tuple(signature)
+
+    def exists(self):
+        return os.path.exists(self.json_file)
+
+    def load(self):
+        """Return the parsed database, re-reading the file only if it changed."""
+        signature = self._file_signature()
+        if self._data is None or signature != self._signature:
+            data = {}
+            if signature is not None:
+                with open(self.json_file, "rb") as f:
+                    raw = f.read()
+                data = json.loads(raw)
+                self._snapshot_digest = hashlib.sha256(raw).hexdigest()
+                del raw
+                self._replay_journal(data)
+            self._data = data
+            self._signature = signature
+            self._index = None
+            self._search = None
+            self._dirty = {}
+            self._revision += 1
+            self._order_revisions = {}
+            self._base_revision = self._revision
+            self.curves.clear_cache()
+        return self._data
+
+    def revision(self):
+        """Return a counter that changes whenever the data changes.
+
+        Lets callers cache results derived from the database.
+        """
+        self.load()
+        return self._revision
+
+    def order_revision(self, version, order):
+        """Like revision(), but only changes when this order changes."""
+        self.load()
+        return self._order_revisions.get((version, order), self._base_revision)
+
+    def _snapshot_header(self):
+        return {"op": "snapshot", "sha256": self._snapshot_digest}
+
+    def _replay_journal(self, data):
+        self._journal_valid_bytes = None
+        self._journal_stale = False
+        if not os.path.exists(self.journal_file):
+            return
+        offset = 0
+        with open(self.journal_file, "rb") as f:
+            for line_no, line in enumerate(f, start=1):
+                if line.strip():
+                    try:
+                        op = json.loads(line.decode("utf-8"))
+                    except ValueError:
+                        # Torn write from an interrupted append: drop it and
+                        # everything after it before the next append
+                        print(
+                            f"Journal truncated at line {line_no}: {self.journal_file}"
+                        )
+                        self._journal_valid_bytes = offset
+                        break
+                    if op["op"] != "snapshot":
+                        apply_journal_op(data, op)
+                    elif op.get("sha256") != self._snapshot_digest:
+                        # Left alone here, so a reader in another process
+                        # never moves the journal of the application
+                        print(
+                            f"Ignoring journal that does not match "
+                            f"{self.json_file}: {self.journal_file}"
+                        )
+                        self._journal_stale = True
+                        break
+                offset += len(line)
 
+    def _move_stale_journal(self):
+        """Move a journal that does not match the snapshot out of the way.
 
-def create_daily_backup(json_file):
-    """Create a daily backup of the JSON database if it doesn't already exist."""
-    try:
-        if not os.path.exists(json_file):
-            print(f"Backup skipped: {json_file} not found.")
+        It is kept as JOURNAL.stale_<timestamp> for manual recovery.
+        """
+        if not self._journal_stale:
+            return
+        self._journal_stale = False
+        self._journal_valid_bytes = None
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        stale_file = f"{self.journal_file}.stale_{timestamp}"
+        try:
+            os.replace(self.journal_file, stale_file)
+        except FileNotFoundError:
+            return
+        print(f"Journal does not match {self.json_file}, moved aside to {stale_file}")
+
+    def index(self):
+        """Return the date-sorted order index, building it on first use."""
+        data = self.load()
+        if self._index is None:
+            self._index = OrderIndex.build(data)
+        return self._index
+
+    def mark_changed(self, version, order, temp_types=None):
+        """Record a change to an order (or to some of its temperature blocks).
+
+        Keeps the order index current and queues the change for the next save().
+        """
+        self._revision += 1
+        key = (version, order)
+        self._order_revisions[key] = self._revision
+        if temp_types is None or (key in self._dirty and self._dirty[key] is None):
+            self._dirty[key] = None
+        else:
+            self._dirty.setdefault(key, set()).update(temp_types)
+
+        if self._search is not None:
+            self._search.mark_stale(version, order)
+        if self._index is None:
+            return
+        details = self._data.get(version, {}).get(order)
+        if details is None:
+            self._index.remove(version, order)
+        else:
+            test_date = details.get("metadata", {}).get("test_date", "0000-00-00")
+            self._index.add(version, order, test_date)
+
+    def search(self, text, limit=None):
+        """Prefix search over order, lot, test and inflator numbers.
+
+        Returns (term, field, version, order, temp_type) entries; the search
+        index is built on first use and then kept current by mark_changed.
+        """
+        data = self.load()
+        if self._search is None:
+            self._search = SearchIndex.build(
+                ((version, order) for version in data for order in data[version]),
+                self.get_test_summary,
+            )
+        self._search.refresh(self.get_test_summary)
+        return self._search.search(text, limit)
+
+    def has_order(self, version, order):
+        return order in self.load().get(version, {})
+
+    def versions(self):
+        return self.index().versions()
+
+    def select_orders(self, version=None, start_date=None, end_date=None):
+        """Orders matching a version and date range, most recent first."""
+        return self.index().select(version, start_date, end_date)
+
+    def get_order(self, version, order):
+        """Return the details dict of an order, or None if absent."""
+        return self.load().get(version, {}).get(order)
+
+    def get_temperature(self, version, order, temp_type):
+        """Return one temperature block of an order, or None if absent."""
+        details = self.get_order(version, order)
+        if details is None:
+            return None
+        return details.get("temperatures", {}).get(temp_type)
+
+    def get_test_summary(self, version, order):
+        """Return an order's tests without its curves, or None if absent.
+
+        {"metadata": ..., "temperatures": {temp_type: {"temperature_c",
+        "tests", "pressure_inflators"}}}, where pressure_inflators is the set
+        of inflator numbers that have pressure data.
+        """
+        details = self.get_order(version, order)
+        if details is None:
+            return None
+        temperatures = {}
+        for temp_type, temp_data in details.get("temperatures", {}).items():
+            temperatures[temp_type] = {
+                "temperature_c": temp_data.get("temperature_c", "N/A"),
+                "tests": temp_data.get("tests", []),
+                "pressure_inflators": {
+                    item["inflator_no"]
+                    for item in temp_data.get("pressure_data", [])
+                    if item["pressures"]
+                },
+            }
+        return {"metadata": details.get("metadata", {}), "temperatures": temperatures}
+
+    def merge(self, partial):
+        """Merge a partial dict from parse_excel; see merge_partial."""
+        merged = merge_partial(self.load(), partial)
+        for version, order, temp_types in merged:
+            self.mark_changed(version, order, temp_types)
+        return merged
+
+    def remove_orders(self, orders_to_remove):
+        """Remove orders by number from every version; returns the removed numbers."""
+        data = self.load()
+        removed = []
+        for version in list(data.keys()):
+            for order in list(data[version].keys()):
+                if order in orders_to_remove:
+                    del data[version][order]
+                    removed.append(order)
+                    self.mark_changed(version, order)
+                    if not data[version]:
+                        del data[version]
+        return removed
+
+    def snapshot_file(self):
+        """Return a self-contained file with the current state, e.g. for backups."""
+        if os.path.exists(self.journal_file):
+            self.compact()
+        return self.json_file
+
+    def get_curves(self, version, order, temp_type):
+        """Return the CurveBlock of one temperature block, or None if absent."""
+        temp_data = self.get_temperature(version, order, temp_type)
+        if temp_data is None:
+            return None
+        return self.curves.get(version, order, temp_type, temp_data)
+
+    def _update_curves(self):
+        for (version, order), temp_types in self._dirty.items():
+            details = self._data.get(version, {}).get(order)
+            if details is None:
+                self.curves.remove_order(version, order)
+            else:
+                self.curves.write_order(version, order, details, temp_types)
+
+    def _pending_ops(self):
+        ops = []
+        for (version, order), temp_types in self._dirty.items():
+            details = self._data.get(version, {}).get(order)
+            if details is None:
+                ops.append({"op": "remove_order", "version": version, "order": order})
+            elif temp_types is None:
+                ops.append(
+                    {
+                        "op": "put_order",
+                        "version": version,
+                        "order": order,
+                        "value": details,
+                    }
+                )
+            else:
+                for temp_type in sorted(temp_types):
+                    ops.append(
+                        {
+                            "op": "put_temperature",
+                            "version": version,
+                            "order": order,
+                            "temp": temp_type,
+                            "value": details["temperatures"][temp_type],
+                        }
+                    )
+        return ops
+
+    def save(self):
+        """Persist queued changes, as journal entries or as a full snapshot."""
+        self._update_curves()
+        if (
+            not config.JOURNAL_ENABLED
+            or not self.exists()
+            or self._journal_size() >= config.JOURNAL_COMPACT_BYTES
+        ):
+            self.compact()
             return
 
-        base_dir = os.path.dirname(json_file) or "."
-        backup_dir = os.path.join(base_dir, "Backup")
+        ops = self._pending_ops()
+        if ops:
+            self._move_stale_journal()
+            if self._journal_valid_bytes is not None:
+                with open(self.journal_file, "r+b") as f:
+                    f.truncate(self._journal_valid_bytes)
+                self._journal_valid_bytes = None
+            if self._journal_size() == 0:
+                # A new journal starts by naming the snapshot it applies to
+                ops.insert(0, self._snapshot_header())
+            with open(self.journal_file, "a", encoding="utf-8") as f:
+                for op in ops:
+                    f.write(json.dumps(op, ensure_ascii=False, separators=(",", ":")))
+                    f.write("\n")
+                f.flush()
+                os.fsync(f.fileno())
+        self._dirty = {}
+        self._signature = self._file_signature()
+
+    def _journal_size(self):
+        try:
+            return os.path.getsize(self.journal_file)
+        except OSError:
+            return 0
+
+    def compact(self):
+        """Write the full database as a new snapshot and clear the journal."""
+        data = self.load()
+        write_json_atomic(self.json_file, data, indent=2)
+        self._snapshot_digest = file_digest(self.json_file)
+        # Its changes are not in `data`
+        self._move_stale_journal()
+        # A crash between these steps leaves a journal that no longer matches
+        # the snapshot; it is ignored, and the snapshot already holds its changes
+        try:
+            os.remove(self.journal_file)
+        except FileNotFoundError:
+            # No journal yet, or another process compacted at the same time
+            pass
+        self._dirty = {}
+        self._journal_valid_bytes = None
+        self._signature = self._file_signature()
+
+    def invalidate(self):
+        """Drop the in-memory copy so the next access re-reads the file."""
+        self._data = None
+        self._signature = None
+        self._index = None
+        self._search = None
+        self._dirty = {}
+        self._revision += 1
+        self._order_revisions = {}
+        self._base_revision = self._revision
+        self.curves.clear_cache()
+
+
+def apply_journal_op(data, op):
+    """Apply one journal operation to a database tree."""
+    version, order = op["version"], op["order"]
+    if op["op"] == "put_order":
+        data.setdefault(version, {})[order] = op["value"]
+    elif op["op"] == "put_temperature":
+        details = data.setdefault(version, {}).setdefault(
+            order, {"metadata": {}, "temperatures": {}}
+        )
+        details["temperatures"][op["temp"]] = op["value"]
+    elif op["op"] == "remove_order":
+        if version in data:
+            data[version].pop(order, None)
+            if not data[version]:
+                del data[version]
+    else:
+        raise ValueError(f"Unknown journal operation: {op['op']}")
 
-        if not os.path.exists(backup_dir):
-            os.makedirs(backup_dir)
-            print(f"Created Backup directory: {backup_dir}")
 
-        current_date = datetime.now().strftime("%Y%m%d")
-        backup_pattern = os.path.join(backup_dir, f"Data_{current_date}_*.json")
-        existing_backups = glob.glob(backup_pattern)
+_databases = {}
+_matrix_cache = OrderedDict()
 
-        if existing_backups:
-            print(f"Backup already exists for {current_date}: {existing_backups[0]}")
-            return
 
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_filename = f"Data_{timestamp}.json"
-        backup_path = os.path.join(backup_dir, backup_filename)
+def get_database(json_file):
+    """Return the shared database instance for a JSON file.
 
-        shutil.copy2(json_file, backup_path)
-        print(f"Backup created: {backup_path}")
-    except Exception as e:
-        print(f"Error creating backup: {str(e)}")
+    config.STORAGE_BACKEND selects the JSON file itself or the SQLite
+    database next to it (see sqlite_backend.py).
+    """
+    key = os.path.abspath(json_file)
+    if key not in _databases:
+        if config.STORAGE_BACKEND == "sqlite":
+            from sqlite_backend import SqliteDatabase
+
+            _databases[key] = SqliteDatabase(json_file)
+        else:
+            _databases[key] = Database(json_file)
+    return _databases[key]
+
+
+class IngestCancelled(Exception):
+    """Raised when an ingestion is cancelled before anything was merged."""
+
+
+def load_data(json_file):
+    """Return the full database tree (served from memory when unchanged)."""
+    db = get_database(json_file)
+    with db.lock:
+        return db.load()
+
+
+def database_exists(json_file):
+    db = get_database(json_file)
+    with db.lock:
+        return db.exists()
 
 
-def process_orders(orders_input, json_file, excel_folder):
-    """Process Excel files for given orders and update the JSON database."""
+def process_orders(
+    orders_input, json_file, excel_folder, workers=None, progress=None, cancel=None
+):
+    """Process Excel files for given orders and update the JSON database.
+
+    Workbooks are parsed in a process pool when `workers` (default
+    config.INGEST_WORKERS) is greater than 1; results are merged in file
+    order so the database matches a serial run. Files whose fingerprint
+    matches the ingest manifest are skipped.
+
+    `progress` and `cancel` are passed on to parse_excel_files, so the
+    function can run on a background thread (see ingest_job.py).
+    """
+    db = get_database(json_file)
     try:
         if not orders_input:
             return False, "Please enter the order numbers."
 
         orders = [order.strip() for order in orders_input.split(",")]
 
-        data = {}
-        if os.path.exists(json_file):
-            with open(json_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-        files_to_process = []
+        # One directory scan for all orders, then prefix lookups in the index
+        folder_index = get_folder_index(excel_folder)
+        folder_index.refresh()
+        entries = []
         for order in orders:
-            for file_name in os.listdir(excel_folder):
-                if file_name.startswith(order) and file_name.endswith(".xlsx"):
-                    files_to_process.append(os.path.join(excel_folder, file_name))
+            entries.extend(folder_index.find(order, ".xlsx"))
 
-        if not files_to_process:
+        if not entries:
             return False, "No Excel files found for the provided orders."
 
-        for file in files_to_process:
-            process_excel(file, data)
+        return ingest_files(db, entries, workers, progress, cancel)
+    except IngestCancelled:
+        return False, "Processing cancelled. No changes were saved."
+    except Exception as e:
+        # Discard any partially applied changes held in memory
+        db.invalidate()
+        return False, f"Error processing orders: {str(e)}"
+
 
-        with open(json_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+def sync_folder(json_file, excel_folder, workers=None, progress=None, cancel=None):
+    """Ingest every new or modified workbook of the Excel folder."""
+    db = get_database(json_file)
+    try:
+        folder_index = get_folder_index(excel_folder)
+        folder_index.refresh()
+        # Skip Excel lock files (~$name.xlsx) of workbooks open elsewhere
+        entries = [
+            entry
+            for entry in folder_index
+            if entry.name.endswith(".xlsx") and not entry.name.startswith("~$")
+        ]
+        if not entries:
+            return False, "No Excel files found in the Excel folder."
 
-        return True, "Excel files processed and JSON updated!"
+        return ingest_files(db, entries, workers, progress, cancel)
+    except IngestCancelled:
+        return False, "Synchronization cancelled. No changes were saved."
     except Exception as e:
-        return False, f"Error processing orders: {str(e)}"
+        db.invalidate()
+        return False, f"Error synchronizing folder: {str(e)}"
+
+
+def ingest_files(db, entries, workers=None, progress=None, cancel=None):
+    """Parse and merge the changed files among folder index entries.
+
+    Files are merged in `entries` order, so when several workbooks hold the
+    same order the later one wins, as in a run over every file. Unchanged
+    workbooks that share an order with an earlier changed one are therefore
+    parsed and merged again (see remerge_entries). When a changed workbook
+    turns out to hold new orders, those are found in a second pass whose
+    progress continues the counts of the first.
+
+    Files that fail to parse are reported and left out of the manifest, so
+    they are retried on the next run. Returns (success, message); raises
+    IngestCancelled if `cancel` is set while parsing.
+    """
+    manifest = IngestManifest.load(db.json_file)
+    # Hashing reads whole workbooks, so fingerprints are checked without the
+    # lock; it is only held to look the recorded orders up in the database
+    current = [entry for entry in entries if manifest.is_current(entry)]
+    with db.lock:
+        unchanged = {entry.path for entry in current if manifest.has_orders(entry, db)}
+    changed = [entry for entry in entries if entry.path not in unchanged]
+
+    if not changed:
+        manifest.save()
+        return (
+            True,
+            f"Database already up to date ({len(entries)} unchanged file(s) skipped).",
+        )
 
+    keys_of = {entry.path: manifest.orders_of(entry) for entry in changed}
+    selected = {entry.path for entry in changed}
+    selected.update(entry.path for entry in remerge_entries(entries, manifest, keys_of))
+    batch = [entry.path for entry in entries if entry.path in selected]
+    # Parsing runs without the lock so the UI can keep reading the database
+    partials, errors = parse_excel_files(batch, workers, progress, cancel)
+    if len(errors) == len(batch):
+        return False, format_ingest_errors("No Excel files could be processed.", errors)
+    parsed = dict(zip(batch, partials))
+    # A changed workbook may now also hold orders it did not hold before
+    for path in keys_of:
+        keys_of[path] |= partial_keys(parsed[path] or {})
+    extra = [
+        entry.path
+        for entry in remerge_entries(entries, manifest, keys_of)
+        if entry.path not in parsed
+    ]
+    if extra:
+        partials, extra_errors = parse_excel_files(
+            extra, workers, offset_progress(progress, len(batch)), cancel
+        )
+        errors += extra_errors
+        parsed.update(zip(extra, partials))
 
-def process_excel(file_path, data):
-    """Process an Excel file and update the data dictionary."""
-    wb = load_workbook(file_path, data_only=True)
-    current_version = None
-    current_order = None
-    for sheet_name in wb.sheetnames:
-        if "minus" in sheet_name.lower():
-            temp_type = "LT"
-        elif "rt" in sheet_name.lower():
-            temp_type = "RT"
-        elif "plus" in sheet_name.lower():
-            temp_type = "HT"
-        else:
+    merged = []
+    for entry in entries:
+        if entry.path not in parsed:
             continue
+        if parsed[entry.path] is not None:
+            # Hashed here rather than by record() under the lock
+            manifest.digest(entry)
+            merged.append(entry)
+        elif entry.path not in keys_of:
+            # An earlier file's data may now win over this unchanged one
+            manifest.forget(entry)
+    with db.lock:
+        for entry in merged:
+            keys = [
+                (version, order) for version, order, _ in db.merge(parsed[entry.path])
+            ]
+            manifest.record(entry, keys)
+        db.save()
+    manifest.save()
+
+    message = "Excel files processed and JSON updated!"
+    skipped = len(entries) - len(parsed)
+    if skipped:
+        message += f"\n{skipped} unchanged file(s) skipped."
+    return True, format_ingest_errors(message, errors)
+
+
+def offset_progress(progress, offset):
+    """Wrap a progress callback so a later parse continues an earlier count."""
+    if progress is None:
+        return None
+
+    def report(done, total, file_path, error):
+        progress(offset + done, offset + total, file_path, error)
+
+    return report
+
+
+def format_ingest_errors(message, errors):
+    """Append the files that failed to parse to a status message."""
+    if not errors:
+        return message
+    lines = [f"{os.path.basename(path)}: {error}" for path, error in errors]
+    return f"{message}\n{len(errors)} file(s) could not be processed:\n" + "\n".join(
+        lines
+    )
+
+
+def remerge_entries(entries, manifest, keys_of):
+    """Return the unchanged entries to merge again after the changed ones.
+
+    `keys_of` maps the path of every changed entry to the (version, order)
+    keys it holds. An unchanged workbook after a changed one that shares an
+    order with it (directly or through another such workbook) must be merged
+    again to keep winning over it.
+    """
+    remerged = []
+    touched = set()
+    for entry in entries:
+        if entry.path in keys_of:
+            touched |= keys_of[entry.path]
+        elif manifest.orders_of(entry) & touched:
+            remerged.append(entry)
+            touched |= manifest.orders_of(entry)
+    return remerged
+
+
+def partial_keys(partial):
+    """The (version, order) keys of a partial dict from parse_excel."""
+    return {(version, order) for version, orders in partial.items() for order in orders}
+
+
+def parse_excel(file_path):
+    """Parse one Excel file into a partial database dict (runs in worker processes)."""
+    partial = {}
+    process_excel(file_path, partial)
+    return partial
+
+
+def parse_excel_files(files, workers=None, progress=None, cancel=None):
+    """Parse Excel files, in parallel if configured.
+
+    Returns (partials, errors): partials are in file order with None for files
+    that failed, errors lists (file, message) pairs. After each file,
+    `progress(done, total, file, error)` is called if given; `cancel` is a
+    threading.Event checked between files that raises IngestCancelled.
+    """
+    if workers is None:
+        workers = config.INGEST_WORKERS
+    workers = min(workers, len(files))
+    partials = [None] * len(files)
+    errors = []
+
+    def finish(done, idx, error):
+        if error is not None:
+            errors.append((files[idx], error))
+        if progress is not None:
+            progress(done, len(files), files[idx], error)
+
+    if workers <= 1:
+        for idx, file in enumerate(files):
+            if cancel is not None and cancel.is_set():
+                raise IngestCancelled()
+            error = None
+            try:
+                partials[idx] = parse_excel(file)
+            except Exception as e:
+                error = str(e)
+            finish(idx + 1, idx, error)
+        return partials, errors
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(parse_excel, file): idx for idx, file in enumerate(files)
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            if cancel is not None and cancel.is_set():
+                # Drop queued files; only the ones already running are awaited
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise IngestCancelled()
+            idx = futures[future]
+            error = None
+            try:
+                partials[idx] = future.result()
+            except Exception as e:
+                error = str(e)
+            finish(done, idx, error)
+    # Report errors in file order, whatever order the workers finished in
+    errors.sort(key=lambda item: files.index(item[0]))
+    return partials, errors
+
+
+def merge_partial(data, partial):
+    """Merge a partial dict from parse_excel into the database.
+
+    Follows the same rules as processing the file directly into `data`:
+    existing order metadata and temperature_c are kept, while tests,
+    pressure_data and limits are replaced.
+
+    Returns (version, order, temp_types) per merged order, where temp_types
+    is None for a newly created order and otherwise lists the replaced blocks.
+    """
+    merged = []
+    for version, orders in partial.items():
+        version_data = data.setdefault(version, {})
+        for order, details in orders.items():
+            is_new = order not in version_data
+            if is_new:
+                version_data[order] = {
+                    "metadata": details["metadata"],
+                    "temperatures": {},
+                }
+            temperatures = version_data[order]["temperatures"]
+            for temp_type, temp_data in details["temperatures"].items():
+                if temp_type not in temperatures:
+                    temperatures[temp_type] = {
+                        "temperature_c": temp_data["temperature_c"],
+                        "tests": [],
+                    }
+                for key in ("tests", "pressure_data", "limits"):
+                    if key in temp_data:
+                        temperatures[temp_type][key] = temp_data[key]
+            temp_types = None if is_new else list(details["temperatures"])
+            merged.append((version, order, temp_types))
+    return merged
 
-        if "datenblatt" in sheet_name.lower():
-            current_version, current_order = process_datenblatt(
-                wb[sheet_name], temp_type, data
-            )
-        elif "grafik" in sheet_name.lower() and current_version and current_order:
-            process_grafik(
-                wb[sheet_name], temp_type, data, current_version, current_order
-            )
+
+def process_excel(file_path, data):
+    """Process an Excel file and update the data dictionary.
+
+    The workbook is opened in read-only mode and sheets are streamed row by
+    row, so memory stays flat regardless of the workbook size.
+    """
+    # Imported here so that opening the database does not load openpyxl
+    from openpyxl import load_workbook
+
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        current_version = None
+        current_order = None
+        for sheet_name in wb.sheetnames:
+            if "minus" in sheet_name.lower():
+                temp_type = "LT"
+            elif "rt" in sheet_name.lower():
+                temp_type = "RT"
+            elif "plus" in sheet_name.lower():
+                temp_type = "HT"
+            else:
+                continue
+
+            if "datenblatt" in sheet_name.lower():
+                current_version, current_order = process_datenblatt(
+                    wb[sheet_name], temp_type, data
+                )
+            elif "grafik" in sheet_name.lower() and current_version and current_order:
+                process_grafik(
+                    wb[sheet_name], temp_type, data, current_version, current_order
+                )
+    finally:
+        # Read-only workbooks keep the file handle open until closed
+        wb.close()
 
 
 def process_datenblatt(sheet, temp_type, data):
     """Extract metadata and test data from a Datenblatt sheet."""
-    inflator_type = clean_value(sheet["U1"].value)
+    # Single pass over columns A..U: header cells live in rows 1-10, tests from row 10
+    header_rows = {}
+    tests = []
+    seen_tests = set()
+    for row_idx, row in enumerate(
+        sheet.iter_rows(min_row=1, max_col=21, values_only=True), start=1
+    ):
+        if row_idx <= 10:
+            header_rows[row_idx] = row
+        if row_idx < 10:
+            continue
+        if row[0] and str(row[0]).strip().isdigit():
+            test_no = clean_value(row[0])
+            inflator_no = clean_value(row[1])
+            if test_no and inflator_no and test_no not in seen_tests:
+                tests.append({"test_no": int(test_no), "inflator_no": int(inflator_no)})
+                seen_tests.add(test_no)
+
+    def cell_value(row, column):
+        values = header_rows.get(row, ())
+        return values[column - 1] if column <= len(values) else None
+
+    inflator_type = clean_value(cell_value(1, 21))  # U1
     version = "V" + inflator_type.split("V")[-1]
 
-    test_order = clean_value(sheet["J4"].value)
-    production_order = clean_value(sheet["J3"].value)
-    propellant_lot_number = clean_value(sheet["S3"].value)
-    test_date = parse_date(sheet["C4"].value)
-    temperature_c = clean_value(sheet["C10"].value)
+    test_order = clean_value(cell_value(4, 10))  # J4
+    production_order = clean_value(cell_value(3, 10))  # J3
+    propellant_lot_number = clean_value(cell_value(3, 19))  # S3
+    test_date = parse_date(cell_value(4, 3))  # C4
+    temperature_c = clean_value(cell_value(10, 3))  # C10
 
     if version not in data:
         data[version] = {}
@@ -135,30 +823,36 @@ def process_datenblatt(sheet, temp_type, data):
             "tests": [],
         }
 
-    tests = []
-    seen_tests = set()
-    for row in sheet.iter_rows(min_row=10, values_only=True):
-        if row[0] and str(row[0]).strip().isdigit():
-            test_no = clean_value(row[0])
-            inflator_no = clean_value(row[1])
-            if test_no and inflator_no and test_no not in seen_tests:
-                tests.append({"test_no": int(test_no), "inflator_no": int(inflator_no)})
-                seen_tests.add(test_no)
-
     data[version][test_order]["temperatures"][temp_type]["tests"] = tests
     return version, test_order
 
 
 def process_grafik(sheet, temp_type, data, current_version, current_order):
     """Extract pressure data and limits from a Grafik sheet."""
-    valid_columns = []
+    # One streamed pass from the first limit row; columns MIN_COLUMN..MAX_COLUMN-1
+    rows = sheet.iter_rows(
+        min_row=config.MIN_LIMIT_ROW,
+        min_col=config.MIN_COLUMN,
+        max_col=config.MAX_COLUMN - 1,
+        values_only=True,
+    )
+    limit_rows = {}
+    for row_idx, row in zip(
+        range(config.MIN_LIMIT_ROW, config.PRESSURE_DATA_START_ROW), rows
+    ):
+        if row_idx in (config.MIN_LIMIT_ROW, config.MAX_LIMIT_ROW):
+            limit_rows[row_idx] = row
+
+    min_row = limit_rows.get(config.MIN_LIMIT_ROW, ())
+    max_row = limit_rows.get(config.MAX_LIMIT_ROW, ())
+    valid_offsets = []
     limits = {"maximums": {}, "minimums": {}}
-    for col in range(config.MIN_COLUMN, config.MAX_COLUMN):
-        min_val = clean_value(sheet.cell(row=config.MIN_LIMIT_ROW, column=col).value)
-        max_val = clean_value(sheet.cell(row=config.MAX_LIMIT_ROW, column=col).value)
+    for offset in range(config.MAX_COLUMN - config.MIN_COLUMN):
+        min_val = clean_value(min_row[offset]) if offset < len(min_row) else None
+        max_val = clean_value(max_row[offset]) if offset < len(max_row) else None
         if min_val or max_val:
-            valid_columns.append(col)
-            ms = col - 2
+            valid_offsets.append(offset)
+            ms = config.MIN_COLUMN + offset - 2
             if min_val is not None:
                 try:
                     limits["minimums"][str(ms)] = float(min_val)
@@ -179,16 +873,16 @@ def process_grafik(sheet, temp_type, data, current_version, current_order):
 
     pressure_data = []
     blank_line_count = 0
-    row_idx = config.PRESSURE_DATA_START_ROW
 
-    for inflator_no in inflator_nos:
+    # `rows` now continues at PRESSURE_DATA_START_ROW, one row per inflator
+    for inflator_no, row in zip(inflator_nos, rows):
         is_blank = True
         pressures = {}
-        for col in valid_columns:
-            pressure = clean_value(sheet.cell(row=row_idx, column=col).value)
+        for offset in valid_offsets:
+            pressure = clean_value(row[offset]) if offset < len(row) else None
             if pressure is not None:
                 try:
-                    pressures[str(col - 2)] = float(pressure)
+                    pressures[str(config.MIN_COLUMN + offset - 2)] = float(pressure)
                     is_blank = False
                 except ValueError:
                     continue
@@ -204,8 +898,6 @@ def process_grafik(sheet, temp_type, data, current_version, current_order):
                     {"inflator_no": inflator_no, "pressures": pressures}
                 )
 
-        row_idx += 1
-
     data[current_version][current_order]["temperatures"][temp_type][
         "pressure_data"
     ] = pressure_data
@@ -214,29 +906,20 @@ def process_grafik(sheet, temp_type, data, current_version, current_order):
 
 def remove_orders(orders_input, json_file):
     """Remove specified orders from the JSON database."""
+    db = get_database(json_file)
     try:
         if not orders_input:
             return False, "Please enter the order numbers."
 
         orders_to_remove = [order.strip() for order in orders_input.split(",")]
 
-        if not os.path.exists(json_file):
+        if not db.exists():
             return False, "No database found."
 
-        with open(json_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
-        removed = []
-        for version in list(data.keys()):
-            for order in list(data[version].keys()):
-                if order in orders_to_remove:
-                    del data[version][order]
-                    removed.append(order)
-                    if not data[version]:
-                        del data[version]
-
-        with open(json_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        with db.lock:
+            removed = db.remove_orders(orders_to_remove)
+            if removed:
+                db.save()
 
         if removed:
             msg = f"Orders removed successfully: {', '.join(removed)}"
@@ -244,77 +927,130 @@ def remove_orders(orders_input, json_file):
         else:
             return False, "No matching orders found."
     except Exception as e:
+        db.invalidate()
         return False, f"Error removing orders: {str(e)}"
 
 
 def get_orders_list(json_file, selected_version, start_date, end_date):
     """Retrieve a filtered list of orders from the JSON database."""
-    if not os.path.exists(json_file):
-        return [], [], "Database not found."
+    orders_page, _, versions, error = get_orders_page(
+        json_file, selected_version, start_date, end_date, 0, None
+    )
+    return orders_page, versions, error
 
-    try:
-        with open(json_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
-        versions = sorted(data.keys())
-        orders_list = []
-        for version, orders in data.items():
-            if (
-                selected_version
-                and selected_version.lower() != "all"
-                and version != selected_version
-            ):
-                continue
-            for order, details in orders.items():
-                test_date = details["metadata"].get("test_date", "0000-00-00")
-                if start_date:
-                    try:
-                        test_date_obj = datetime.strptime(test_date, "%Y-%m-%d").date()
-                        if not (start_date <= test_date_obj <= end_date):
-                            continue
-                    except ValueError:
-                        continue
-                orders_list.append((version, order, test_date))
 
-        def parse_date_safe(date_str):
-            try:
-                return datetime.strptime(date_str, "%Y-%m-%d")
-            except Exception:
-                return datetime.min
+def get_orders_page(json_file, selected_version, start_date, end_date, offset, limit):
+    """Retrieve one page of the filtered orders list, most recent first.
 
-        orders_list.sort(key=lambda x: parse_date_safe(x[2]), reverse=True)
-        return orders_list, versions, None
+    Returns (orders_page, total_orders, versions, error); only the requested
+    page is materialized, so the cost scales with the page size.
+    """
+    db = get_database(json_file)
+    if not db.exists():
+        return [], 0, [], "Database not found."
+
+    try:
+        with db.lock:
+            selection = db.select_orders(selected_version, start_date, end_date)
+            return selection.page(offset, limit), len(selection), db.versions(), None
     except Exception as e:
-        return [], [], f"Error loading orders: {str(e)}"
+        return [], 0, [], f"Error loading orders: {str(e)}"
 
 
 def get_metadata(json_file, version, order):
     """Retrieve metadata for a specific order and version."""
-    if not os.path.exists(json_file):
+    db = get_database(json_file)
+    if not db.exists():
         return None, "Database not found."
 
     try:
-        with open(json_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
-        if version not in data or order not in data[version]:
+        with db.lock:
+            details = db.get_order(version, order)
+        if details is None:
             return None, "Order not found in the database."
 
-        metadata = data[version][order].get("metadata", {})
-        temperatures = data[version][order].get("temperatures", {})
+        metadata = details.get("metadata", {})
+        temperatures = details.get("temperatures", {})
         return {"metadata": metadata, "temperatures": temperatures}, None
     except Exception as e:
         return None, f"Error retrieving metadata: {str(e)}"
 
 
+def search_orders(json_file, text, limit=None):
+    """Find the orders an inflator, test, production order or lot belongs to.
+
+    Returns (results, error); results are (term, field, version, order,
+    temp_type) tuples whose term starts with `text`.
+    """
+    db = get_database(json_file)
+    if not db.exists():
+        return [], "Database not found."
+
+    try:
+        with db.lock:
+            return db.search(text, limit), None
+    except Exception as e:
+        return [], f"Error searching orders: {str(e)}"
+
+
+def get_curves(json_file, version, order, temp_type):
+    """Retrieve the columnar pressure curves of one temperature block."""
+    db = get_database(json_file)
+    with db.lock:
+        return db.get_curves(version, order, temp_type)
+
+
+def get_pressure_matrix(json_file, records):
+    """Build the pressure matrix of workplace records: (ms_axis, matrix).
+
+    The matrix has one float64 row per record (NaN where there is no data) and
+    one column per time point with data. Results are cached per selection and
+    database revision, so the report and its exports build it only once; the
+    returned arrays are read-only because they are shared.
+    """
+    db = get_database(json_file)
+    with db.lock:
+        key = (
+            os.path.abspath(json_file),
+            db.revision(),
+            tuple(
+                (r["version"], r["order"], r["type"], r["inflator_no"]) for r in records
+            ),
+        )
+        if key in _matrix_cache:
+            _matrix_cache.move_to_end(key)
+            return _matrix_cache[key]
+        ms_axis, matrix = stack_curves(records, db.get_curves)
+    ms_axis.setflags(write=False)
+    matrix.setflags(write=False)
+    _matrix_cache[key] = (ms_axis, matrix)
+    while len(_matrix_cache) > config.PRESSURE_MATRIX_CACHE_SIZE:
+        _matrix_cache.popitem(last=False)
+    return ms_axis, matrix
+
+
+def get_limits(json_file, version, order, temp_type):
+    """Retrieve the pressure limits of one temperature block of an order."""
+    db = get_database(json_file)
+    with db.lock:
+        if db.get_order(version, order) is None:
+            raise KeyError(f"{version}/{order}")
+        temp_data = db.get_temperature(version, order, temp_type)
+    return (temp_data or {}).get("limits", {})
+
+
 def get_workplace_data(json_file, selected_orders):
-    """Retrieve data for selected orders to send to the workplace."""
+    """Retrieve data for selected orders to send to the workplace.
+
+    Records only flag whether pressure data exists (has_pressures); the
+    curves are loaded when a report or export needs them, through
+    get_pressure_matrix.
+    """
     try:
         if not selected_orders:
             return [], "No orders selected."
 
-        with open(json_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        db = get_database(json_file)
 
         versions = set(version for version, _ in selected_orders)
         if len(versions) > 1:
@@ -325,22 +1061,19 @@ def get_workplace_data(json_file, selected_orders):
         existing_keys = set()  # Track existing entries to avoid duplicates
 
         for version, order in selected_orders:
-            if version in data and order in data[version]:
-                details = data[version][order]
-                metadata = details.get("metadata", {})
+            with db.lock:
+                summary = db.get_test_summary(version, order)
+            if summary is not None:
+                metadata = summary["metadata"]
                 test_date = metadata.get("test_date", "0000-00-00")
-                temperatures = details.get("temperatures", {})
+                temperatures = summary["temperatures"]
                 for temp_type in ["RT", "LT", "HT"]:
                     if temp_type not in temperatures:
                         continue
                     temp_data = temperatures[temp_type]
-                    temperature_c = temp_data.get("temperature_c", "N/A")
-                    tests = temp_data.get("tests", [])
-                    pressure_data = temp_data.get("pressure_data", [])
-                    pressure_map = {
-                        item["inflator_no"]: item["pressures"] for item in pressure_data
-                    }
-                    for test in tests:
+                    temperature_c = temp_data["temperature_c"]
+                    pressure_inflators = temp_data["pressure_inflators"]
+                    for test in temp_data["tests"]:
                         test_no = test.get("test_no", "N/A")
                         inflator_no = test.get("inflator_no", "N/A")
                         key = (test_no, inflator_no, temp_type, version, order)
@@ -356,7 +1089,7 @@ def get_workplace_data(json_file, selected_orders):
                                 "version": version,
                                 "order": order,
                                 "test_date": test_date,
-                                "pressures": pressure_map.get(inflator_no, {}),
+                                "has_pressures": inflator_no in pressure_inflators,
                             }
                         )
                         existing_keys.add(key)
@@ -0,0 +1,432 @@
+"""
+Streaming Excel export of the whole database (Summary, Instructions and one
+sheet per version). Uses a write-only workbook: column widths are computed
+from the data before a sheet is written, cells share a handful of named
+styles, and rows are written to disk as they are generated, so time and
+memory grow linearly with the database.
+"""
+
+import warnings
+from copy import copy
+from datetime import datetime
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import NamedStyle
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.cell_range import MultiCellRange
+from openpyxl.worksheet.protection import SheetProtection
+from openpyxl.worksheet.table import Table, TableStyleInfo
+import config
+
+MAIN_HEADERS = [
+    "Order Number 📋",
+    "Production Order 🏭",
+    "Propellant Lot Number 🧪",
+    "Test Date 📅",
+    "Test Number 🔢",
+    "Inflator Number ⚙️",
+]
+INSTRUCTIONS = [
+    "Welcome to the Ballistic Tests Database Export!",
+    "This Excel file contains test data organized by version, with each version in a separate sheet.",
+    "",
+    "Key Features:",
+    "- The 'Summary' sheet provides an overview of total orders and tests.",
+    "- Each version sheet (e.g., V1, V2) contains detailed test data.",
+    "- Data is grouped by Order Number, sorted by test date (most recent first).",
+    "- Within each order, tests are ordered by temperature: RT (Room Temperature), LT (Low Temperature), HT (High Temperature).",
+    "- Pressure values are listed in milliseconds (ms) under each temperature.",
+    "- Headers are frozen for easy navigation (scroll while keeping headers visible).",
+    "- Filters are enabled for sorting and analyzing data.",
+    "",
+    "Color Coding:",
+    "- RT Headers: Light Green 🌡️",
+    "- LT Headers: Light Blue 🌡️",
+    "- HT Headers: Light Orange 🌡️",
+    "- Red cells indicate pressures above the maximum limit 🚨",
+    "- Blue cells indicate pressures below the minimum limit ❄️",
+    "- Alternating rows have a light gray background for readability.",
+    "",
+    "Tips:",
+    "- Use the 'Summary' sheet to get a quick overview.",
+    "- Apply filters to explore specific orders or tests.",
+    "- Protected sheets prevent accidental edits but allow filtering and sorting.",
+    "- Contact the Inflator Lab team for support if needed.",
+]
+VERSION_NOTES = [
+    "Notes:",
+    "- Values in red indicate pressures above the maximum limit.",
+    "- Values in blue indicate pressures below the minimum limit.",
+    "- Use filters to sort or analyze data.",
+]
+TITLE_ROW_HEIGHT = 18
+
+
+def add_named_styles(wb):
+    """Register the styles shared by every cell of the export.
+
+    Returns {name: style array} for cell_writer.
+    """
+    styles = [
+        ("title", config.TITLE_FONT, config.TITLE_FILL, config.THICK_BORDER),
+        ("total", config.METADATA_FONT, config.METADATA_FILL, config.THICK_BORDER),
+        ("metadata", config.METADATA_FONT, config.METADATA_FILL, config.THIN_BORDER),
+        ("header", config.HEADER_FONT, config.METADATA_FILL, config.THIN_BORDER),
+        ("RT", config.HEADER_FONT, config.RT_FILL, config.THIN_BORDER),
+        ("LT", config.HEADER_FONT, config.LT_FILL, config.THIN_BORDER),
+        ("HT", config.HEADER_FONT, config.HT_FILL, config.THIN_BORDER),
+        ("data", config.DATA_FONT, None, config.THIN_BORDER),
+        ("data_alt", config.DATA_FONT, config.ALT_FILL, config.THIN_BORDER),
+        ("warning", config.DATA_FONT, config.WARNING_FILL, config.THIN_BORDER),
+        ("low", config.DATA_FONT, config.LOW_FILL, config.THIN_BORDER),
+        ("note", config.NOTE_FONT, None, config.THIN_BORDER),
+        ("summary_note", config.NOTE_FONT, None, None),
+        ("text", config.DATA_FONT, None, config.THIN_BORDER),
+    ]
+    style_arrays = {}
+    for name, font, fill, border in styles:
+        style = NamedStyle(name=f"db_{name}")
+        style.font = font
+        if fill is not None:
+            style.fill = fill
+        if border is not None:
+            style.border = border
+        style.alignment = config.CENTER_ALIGNMENT
+        wb.add_named_style(style)
+        style_arrays[name] = style.as_tuple()
+    return style_arrays
+
+
+def cell_writer(ws, style_arrays):
+    """Return styled(value, style_name), making styled cells for `ws`."""
+
+    def styled(value, style):
+        cell = WriteOnlyCell(ws, value=value)
+        # What assigning cell.style does, minus the per-cell name lookup
+        cell._style = copy(style_arrays[style])
+        return cell
+
+    return styled
+
+
+def fit_width(length, max_width=30):
+    """Column width for the longest value (in characters) of a column."""
+    return min(max((length + 2) * 1.2, 10), max_width)
+
+
+def set_column_widths(ws, rows, max_width=30):
+    """Size the columns to the longest value of `rows` (lists of values).
+
+    Write-only sheets need their widths before the first row is written, so
+    callers pass the longest values of each column rather than every row.
+    """
+    lengths = {}
+    for row in rows:
+        for col_idx, value in enumerate(row, 1):
+            if value:
+                lengths[col_idx] = max(lengths.get(col_idx, 0), len(str(value)))
+    widths = {col: fit_width(length, max_width) for col, length in lengths.items()}
+    for col_idx, width in widths.items():
+        ws.column_dimensions[get_column_letter(col_idx)].width = width
+    return widths
+
+
+def summarize(data):
+    """Count orders and tests (per temperature) for the Summary sheet."""
+    stats = {
+        "total_orders": 0,
+        "total_tests": 0,
+        "tests_by_temp": {temp: 0 for temp in config.TEMPERATURE_TYPES},
+    }
+    for version in data:
+        stats["total_orders"] += len(data[version])
+        for order_data in data[version].values():
+            for temp_type, temp_data in order_data["temperatures"].items():
+                count = len(temp_data.get("tests", []))
+                stats["tests_by_temp"][temp_type] = (
+                    stats["tests_by_temp"].get(temp_type, 0) + count
+                )
+                stats["total_tests"] += count
+    return stats
+
+
+def write_summary_sheet(wb, styles, data, generated):
+    ws = wb.create_sheet(title="Summary")
+    styled = cell_writer(ws, styles)
+    stats = summarize(data)
+    rows = [
+        ["Ballistic Tests Database Summary"],
+        [f"Generated: {generated}"],
+        [],
+        ["Total Orders", stats["total_orders"]],
+        ["Total Tests", stats["total_tests"]],
+    ]
+    rows += [
+        [f"{temp} Tests", stats["tests_by_temp"][temp]]
+        for temp in config.TEMPERATURE_TYPES
+    ]
+    rows += [[], ["Note: Detailed data is available in version-specific sheets."]]
+    set_column_widths(ws, rows)
+
+    for row_idx, row in enumerate(rows, 1):
+        if row_idx <= 2:
+            style = "title"
+        elif 4 <= row_idx <= 8:
+            style = "metadata"
+        else:
+            style = "summary_note"
+        ws.append([styled(value, style) for value in row])
+
+
+def write_instructions_sheet(wb, styles):
+    ws = wb.create_sheet(title="Instructions")
+    styled = cell_writer(ws, styles)
+    rows = [["Instructions for Using the Ballistic Tests Database 📖"], []]
+    rows += [[line] for line in INSTRUCTIONS]
+    set_column_widths(ws, rows, max_width=100)
+    for row_idx, row in enumerate(rows, 1):
+        value = row[0] if row else None
+        ws.append([styled(value, "title" if row_idx == 1 else "text")])
+
+
+def collect_version_layout(orders):
+    """First pass over a version: ms points, limits and value lengths per column."""
+    ms_points_by_temp = {temp: set() for temp in config.TEMPERATURE_TYPES}
+    limits_by_temp = {temp: {"max": {}, "min": {}} for temp in config.TEMPERATURE_TYPES}
+    # Longest formatted pressure per (temp, ms) follows from the extremes
+    extremes = {}
+    for order_data in orders.values():
+        for temp_type, temp_data in order_data["temperatures"].items():
+            if temp_type not in ms_points_by_temp:
+                continue
+            for pressure_entry in temp_data.get("pressure_data", []):
+                for ms, value in pressure_entry["pressures"].items():
+                    ms_points_by_temp[temp_type].add(str(ms))
+                    if value is None or value != value:
+                        continue
+                    low, high = extremes.get((temp_type, str(ms)), (value, value))
+                    extremes[(temp_type, str(ms))] = (min(low, value), max(high, value))
+            limits = temp_data.get("limits", {})
+            limits_by_temp[temp_type]["max"].update(limits.get("maximums", {}))
+            limits_by_temp[temp_type]["min"].update(limits.get("minimums", {}))
+
+    for temp in ms_points_by_temp:
+        ms_points_by_temp[temp] = sorted(ms_points_by_temp[temp], key=int)
+    return ms_points_by_temp, limits_by_temp, extremes
+
+
+def order_sort_key(item):
+    test_date = item[1].get("metadata", {}).get("test_date", "0000-00-00")
+    if test_date == "0000-00-00":
+        return datetime.min
+    return datetime.strptime(test_date, "%Y-%m-%d")
+
+
+def version_rows(orders):
+    """Yield ([order, production order, lot, test date], tests) per order.
+
+    Orders come most recent first; tests are (temp_type, test_no,
+    inflator_no, pressures) in temperature order.
+    """
+    for order, order_data in sorted(orders.items(), key=order_sort_key, reverse=True):
+        tests = []
+        for temp_type in config.TEMPERATURE_TYPES:
+            temp_data = order_data["temperatures"].get(temp_type)
+            if temp_data is None:
+                continue
+            pressure_maps = {
+                entry["inflator_no"]: entry["pressures"]
+                for entry in temp_data.get("pressure_data", [])
+            }
+            for test in temp_data.get("tests", []):
+                inflator_no = test.get("inflator_no", "N/A")
+                tests.append(
+                    (
+                        temp_type,
+                        test.get("test_no", "N/A"),
+                        inflator_no,
+                        pressure_maps.get(inflator_no, {}),
+                    )
+                )
+        if tests:
+            metadata = order_data.get("metadata", {})
+            metadata_values = [
+                str(order),
+                str(metadata.get("production_order", "N/A")),
+                str(metadata.get("propellant_lot_number", "N/A")),
+                str(metadata.get("test_date", "N/A")),
+            ]
+            yield metadata_values, tests
+
+
+def write_version_sheet(wb, styles, version, orders, generated):
+    ws = wb.create_sheet(title=version)
+    styled = cell_writer(ws, styles)
+    ms_points_by_temp, limits_by_temp, extremes = collect_version_layout(orders)
+    temps = [temp for temp in config.TEMPERATURE_TYPES if ms_points_by_temp[temp]]
+    n_main = len(MAIN_HEADERS)
+    n_columns = n_main + sum(len(ms_points_by_temp[temp]) for temp in temps)
+
+    # Column limits as (max, min) floats, in sheet column order
+    column_limits = []
+    for temp in config.TEMPERATURE_TYPES:
+        for ms in ms_points_by_temp[temp]:
+            max_limit = limits_by_temp[temp]["max"].get(str(ms))
+            min_limit = limits_by_temp[temp]["min"].get(str(ms))
+            column_limits.append(
+                (
+                    None if max_limit is None else float(max_limit),
+                    None if min_limit is None else float(min_limit),
+                )
+            )
+
+    # Widths from the headers, the metadata values and the pressure extremes
+    title_row = [
+        "Ballistic Tests Database 🌐",
+        f"Version: {version}",
+        f"Generated: {generated}",
+        f"Total Orders: {len(orders)}",
+    ]
+    temp_row = [None] * n_main
+    ms_row = [None] * n_main
+    longest_values = [None] * n_main
+    for temp in temps:
+        for position, ms in enumerate(ms_points_by_temp[temp]):
+            temp_row.append(f"{temp} Data 🌡️" if position == 0 else None)
+            ms_row.append(f"{ms} ms ⏱️")
+            low, high = extremes.get((temp, str(ms)), (None, None))
+            longest_values.append(
+                None if low is None else max(f"{low:.2f}", f"{high:.2f}", key=len)
+            )
+    for metadata_values, tests in version_rows(orders):
+        for _, test_no, inflator_no, _ in tests:
+            for col, value in enumerate(
+                metadata_values + [str(test_no), str(inflator_no)]
+            ):
+                if longest_values[col] is None or len(value) > len(longest_values[col]):
+                    longest_values[col] = value
+    set_column_widths(
+        ws,
+        [title_row, MAIN_HEADERS, temp_row, ms_row, longest_values]
+        + [[note] for note in VERSION_NOTES],
+    )
+    ws.freeze_panes = "G5"
+    ws.row_dimensions[1].height = TITLE_ROW_HEIGHT
+
+    ws.append([styled(value, "title") for value in title_row])
+    ws.append([styled(value, "header") for value in MAIN_HEADERS])
+    # Merged ranges are only written after the rows; collecting them avoids
+    # the overlap check merged_cells.add does against every earlier range
+    merged = []
+    header_cells = [None] * n_main
+    ms_cells = [None] * n_main
+    col_idx = n_main + 1
+    for temp in temps:
+        ms_points = ms_points_by_temp[temp]
+        merged.append(
+            f"{get_column_letter(col_idx)}3:"
+            f"{get_column_letter(col_idx + len(ms_points) - 1)}3"
+        )
+        header_cells.append(styled(f"{temp} Data 🌡️", temp))
+        header_cells += [None] * (len(ms_points) - 1)
+        ms_cells += [styled(f"{ms} ms ⏱️", temp) for ms in ms_points]
+        col_idx += len(ms_points)
+    ws.append(header_cells)
+    ws.append(ms_cells)
+
+    # Data rows (row 5+), one per test, grouped by order
+    row_idx = 5
+    total_tests = 0
+    for metadata_values, tests in version_rows(orders):
+        start_row = row_idx
+        for temp_type, test_no, inflator_no, pressures in tests:
+            base_style = "data_alt" if row_idx % 2 == 0 else "data"
+            row = [
+                styled(value, base_style)
+                for value in metadata_values + [str(test_no), str(inflator_no)]
+            ]
+            column = 0
+            for temp in config.TEMPERATURE_TYPES:
+                for ms in ms_points_by_temp[temp]:
+                    if temp != temp_type:
+                        row.append(styled("", base_style))
+                        column += 1
+                        continue
+                    val = pressures.get(str(ms))
+                    if val is None or val != val:
+                        row.append(styled("-", base_style))
+                        column += 1
+                        continue
+                    max_limit, min_limit = column_limits[column]
+                    style = base_style
+                    if max_limit is not None and val > max_limit:
+                        style = "warning"
+                    elif min_limit is not None and val < min_limit:
+                        style = "low"
+                    row.append(styled(f"{val:.2f}", style))
+                    column += 1
+            ws.append(row)
+            total_tests += 1
+            row_idx += 1
+
+        if len(tests) > 1:
+            for col in range(1, 5):
+                letter = get_column_letter(col)
+                merged.append(f"{letter}{start_row}:{letter}{row_idx - 1}")
+
+    ws.merged_cells = MultiCellRange(merged)
+
+    # Total and notes
+    ws.append([])
+    total_text = f"Total Tests: {total_tests}"
+    ws.append([styled(total_text, "total")])
+    ws.append([])
+    for note in VERSION_NOTES:
+        ws.append([styled(note, "note")])
+
+    # Filters over the header and data rows
+    table = Table(
+        displayName=f"Table_{version}",
+        ref=f"A2:{get_column_letter(max(n_columns, 4))}{row_idx}",
+    )
+    table._initialise_columns()
+    names = MAIN_HEADERS + [
+        f"{temp} {ms} ms" for temp in temps for ms in ms_points_by_temp[temp]
+    ]
+    for column, name in zip(table.tableColumns, names):
+        column.name = name
+    table.tableStyleInfo = TableStyleInfo(
+        name="TableStyleMedium9",
+        showFirstColumn=False,
+        showLastColumn=False,
+        showRowStripes=True,
+        showColumnStripes=False,
+    )
+    with warnings.catch_warnings():
+        # add_table warns that write-only tables need their columns set by
+        # hand, which is done above
+        warnings.simplefilter("ignore")
+        ws.add_table(table)
+
+    ws.protection = SheetProtection(
+        sheet=True,
+        formatCells=False,
+        formatColumns=False,
+        formatRows=False,
+        insertRows=False,
+        insertColumns=False,
+        sort=True,
+        autoFilter=True,
+    )
+
+
+def write_database_workbook(data, filename):
+    """Write the full database export to `filename`."""
+    generated = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    wb = Workbook(write_only=True)
+    styles = add_named_styles(wb)
+    write_summary_sheet(wb, styles, data, generated)
+    write_instructions_sheet(wb, styles)
+    for version in sorted(data.keys()):
+        write_version_sheet(wb, styles, version, data[version], generated)
+    wb.save(filename)
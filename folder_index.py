@@ -0,0 +1,91 @@
+"""
+Cached index of the Excel evaluation folder.
+A single os.scandir pass records every file (name, path, mtime, size); order
+lookups are then prefix searches on a sorted name list instead of one
+directory listing per order.
+"""
+
+import bisect
+import os
+from collections import namedtuple
+
+FolderEntry = namedtuple("FolderEntry", ["name", "path", "mtime", "size"])
+
+
+class FolderIndex:
+    """Filename index of one directory, refreshed incrementally."""
+
+    def __init__(self, folder):
+        self.folder = folder
+        self._entries = {}
+        self._names = []
+
+    def refresh(self):
+        """Rescan the directory once, updating only entries that changed.
+
+        Returns the number of files added, modified or removed since the last scan.
+        """
+        seen = set()
+        changes = 0
+        names_changed = False
+        with os.scandir(self.folder) as it:
+            for dir_entry in it:
+                if not dir_entry.is_file():
+                    continue
+                stat = dir_entry.stat()
+                name = dir_entry.name
+                seen.add(name)
+                current = self._entries.get(name)
+                if current is None:
+                    names_changed = True
+                if (
+                    current is None
+                    or current.mtime != stat.st_mtime
+                    or current.size != stat.st_size
+                ):
+                    self._entries[name] = FolderEntry(
+                        name, dir_entry.path, stat.st_mtime, stat.st_size
+                    )
+                    changes += 1
+
+        removed = [name for name in self._entries if name not in seen]
+        for name in removed:
+            del self._entries[name]
+        changes += len(removed)
+
+        # Modified files keep their name, so the sorted list only changes on add/remove
+        if names_changed or removed:
+            self._names = sorted(self._entries)
+        return changes
+
+    def get(self, name):
+        return self._entries.get(name)
+
+    def find(self, prefix, suffix=""):
+        """Return entries whose name starts with `prefix` and ends with `suffix`."""
+        start = bisect.bisect_left(self._names, prefix)
+        matches = []
+        for name in self._names[start:]:
+            if not name.startswith(prefix):
+                break
+            if name.endswith(suffix):
+                matches.append(self._entries[name])
+        return matches
+
+    def __iter__(self):
+        for name in self._names:
+            yield self._entries[name]
+
+    def __len__(self):
+        return len(self._names)
+
+
+_indexes = {}
+
+
+def get_folder_index(folder):
+    """Return the shared FolderIndex for a directory."""
+    key = os.path.abspath(folder)
+    if key not in _indexes:
+        _indexes[key] = FolderIndex(folder)
+    return _indexes[key]
@@ -0,0 +1,77 @@
+"""
+Background ingestion for the Ballistic Tests Database application.
+Runs database.process_orders / database.sync_folder on a worker thread and
+passes per-file progress, errors and an ETA to the Tk main thread through a
+queue, which the UI drains with root.after (Tk is not thread-safe).
+"""
+
+import os
+import queue
+import threading
+import time
+
+
+def format_eta(seconds):
+    """Format a remaining time in seconds as '45 s' or '3 min 05 s'."""
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds} s"
+    return f"{seconds // 60} min {seconds % 60:02d} s"
+
+
+class IngestJob:
+    """One ingestion call running on a daemon thread.
+
+    `target` must accept `progress` and `cancel` keyword arguments and return
+    a (success, message) tuple. Messages queued for the UI are
+        ("progress", done, total, file_name, error, eta_seconds)
+        ("done", success, message)
+    """
+
+    def __init__(self, target, *args):
+        self.target = target
+        self.args = args
+        self.messages = queue.Queue()
+        self.cancel_event = threading.Event()
+        self._started = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._started = time.monotonic()
+        self._thread.start()
+
+    def cancel(self):
+        """Ask the job to stop; it finishes the files already being parsed."""
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def is_running(self):
+        return self._thread.is_alive()
+
+    def poll(self):
+        """Return the messages queued since the last poll."""
+        messages = []
+        while True:
+            try:
+                messages.append(self.messages.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def _progress(self, done, total, file_path, error):
+        elapsed = time.monotonic() - self._started
+        eta = elapsed / done * (total - done) if done else None
+        self.messages.put(
+            ("progress", done, total, os.path.basename(file_path), error, eta)
+        )
+
+    def _run(self):
+        try:
+            success, message = self.target(
+                *self.args, progress=self._progress, cancel=self.cancel_event
+            )
+        except Exception as e:
+            success, message = False, f"Error processing files: {str(e)}"
+        self.messages.put(("done", success, message))
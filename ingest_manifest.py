@@ -0,0 +1,103 @@
+"""
+Manifest of ingested Excel workbooks.
+Records a fingerprint (mtime, size, SHA-256) and the produced (version, order)
+keys for every processed file so unchanged workbooks can be skipped.
+"""
+
+import hashlib
+import json
+import os
+import config
+from utils import write_json_atomic
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    """Return the SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def manifest_path(json_file):
+    """Location of the manifest that belongs to a JSON database."""
+    base_dir = os.path.dirname(json_file) or "."
+    return os.path.join(base_dir, config.MANIFEST_FILE)
+
+
+class IngestManifest:
+    """Fingerprints of the workbooks already merged into the database."""
+
+    def __init__(self, path):
+        self.path = path
+        self._files = {}
+        self._digests = {}
+
+    @classmethod
+    def load(cls, json_file):
+        manifest = cls(manifest_path(json_file))
+        if os.path.exists(manifest.path):
+            try:
+                with open(manifest.path, "r", encoding="utf-8") as f:
+                    manifest._files = json.load(f)
+            except (OSError, ValueError) as e:
+                # A damaged manifest only costs a re-ingest, never data
+                print(f"Ignoring unreadable manifest {manifest.path}: {str(e)}")
+        return manifest
+
+    def save(self):
+        write_json_atomic(self.path, self._files, indent=2)
+
+    def digest(self, entry):
+        """SHA-256 of a folder entry, computed once per manifest.
+
+        Reads the whole workbook, so callers do this without the database lock.
+        """
+        if entry.path not in self._digests:
+            self._digests[entry.path] = file_digest(entry.path)
+        return self._digests[entry.path]
+
+    def orders_of(self, entry):
+        """The (version, order) keys a file produced when it was last ingested."""
+        record = self._files.get(entry.path, {})
+        return {tuple(key) for key in record.get("orders", [])}
+
+    def is_current(self, entry):
+        """Check whether a file still has the fingerprint recorded at ingest.
+
+        Same mtime and size, or same content hash if only the mtime moved.
+        May hash the file; does not touch the database.
+        """
+        record = self._files.get(entry.path)
+        if record is None or record["size"] != entry.size:
+            return False
+        if record["mtime"] == entry.mtime:
+            return True
+        if record.get("sha256") == self.digest(entry):
+            # Touched but identical content: remember the new mtime
+            record["mtime"] = entry.mtime
+            return True
+        return False
+
+    def has_orders(self, entry, db):
+        """Check that every order a file produced is still in the database.
+
+        Reads the database, so it is called with db.lock held.
+        """
+        return all(
+            db.has_order(version, order) for version, order in self.orders_of(entry)
+        )
+
+    def forget(self, entry):
+        """Drop a file from the manifest so the next run ingests it again."""
+        self._files.pop(entry.path, None)
+
+    def record(self, entry, keys):
+        """Store the fingerprint of an ingested file and the orders it produced."""
+        self._files[entry.path] = {
+            "mtime": entry.mtime,
+            "size": entry.size,
+            "sha256": self.digest(entry),
+            "orders": [list(key) for key in keys],
+        }
@@ -1,11 +1,34 @@
+import time
+
+STARTUP_BEGIN = time.perf_counter()
+
+import multiprocessing
 import tkinter as tk
 from tkinter import ttk, messagebox
+import backup
 import config
 import database
 from orders_manager import OrdersManager
 from workplace_manager import WorkplaceManager
 from tooltip import ToolTip
-from export_database import export_database_to_excel
+from ingest_job import IngestJob, format_eta
+
+# (step, time.perf_counter() at its end) since STARTUP_BEGIN
+startup_steps = [("Imports", time.perf_counter())]
+
+
+def startup_step(name):
+    startup_steps.append((name, time.perf_counter()))
+
+
+def print_startup_report():
+    """Print how long each startup step took, up to the first shown window."""
+    print("Startup timing:")
+    previous = STARTUP_BEGIN
+    for name, end in startup_steps:
+        print(f"  {name:<20} {end - previous:7.3f} s")
+        previous = end
+    print(f"  {'Total':<20} {previous - STARTUP_BEGIN:7.3f} s")
 
 
 class ExcelToJsonConverter:
@@ -66,7 +89,7 @@ class ExcelToJsonConverter:
         # Process and Remove Orders Buttons Side by Side
         btns_frame = ttk.Frame(self.frame_db)
         btns_frame.grid(row=3, column=0, sticky="ew", pady=5)
-        btns_frame.columnconfigure((0, 1), weight=1)
+        btns_frame.columnconfigure((0, 1, 2), weight=1)
 
         self.btn_process = ttk.Button(
             btns_frame,
@@ -85,38 +108,85 @@ class ExcelToJsonConverter:
             style="Action.TButton",
             width=15,
         )
-        self.btn_remove_orders.grid(row=0, column=1, sticky="ew", padx=(5, 0))
+        self.btn_remove_orders.grid(row=0, column=1, sticky="ew", padx=5)
         ToolTip(self.btn_remove_orders, "Remove specified orders from the database")
 
+        self.btn_sync_folder = ttk.Button(
+            btns_frame,
+            text="Sync Folder",
+            command=self.sync_folder,
+            style="Action.TButton",
+            width=15,
+        )
+        self.btn_sync_folder.grid(row=0, column=2, sticky="ew", padx=(5, 0))
+        ToolTip(
+            self.btn_sync_folder,
+            "Add new or modified Excel files from the evaluation folder",
+        )
+
+        # Ingestion progress (shown only while files are being processed)
+        self.progress_frame = ttk.Frame(btns_frame)
+        self.progress_frame.grid(
+            row=1, column=0, columnspan=3, sticky="ew", pady=(5, 0)
+        )
+        self.progress_frame.columnconfigure(0, weight=1)
+        self.progress_bar = ttk.Progressbar(self.progress_frame, mode="determinate")
+        self.progress_bar.grid(row=0, column=0, sticky="ew", padx=(0, 5))
+        self.btn_cancel_ingest = ttk.Button(
+            self.progress_frame,
+            text="Cancel",
+            command=self.cancel_ingest,
+            width=10,
+        )
+        self.btn_cancel_ingest.grid(row=0, column=1, sticky="e")
+        ToolTip(self.btn_cancel_ingest, "Stop processing; nothing is saved")
+        self.progress_frame.grid_remove()
+        self.ingest_job = None
+
         self.status_label = ttk.Label(
             self.frame_db, text="", anchor="w", foreground="green"
         )
         self.status_label.grid(row=4, column=0, sticky="ew", pady=(5, 10))
+        startup_step("Main window")
 
         # Initializations
         self.json_file = config.JSON_FILE
         self.excel_folder = config.EXCEL_FOLDER
-        database.create_daily_backup(self.json_file)
 
         # Instantiate Managers
         self.workplace_manager = WorkplaceManager(self.root, self.json_file)
         self.orders_manager = OrdersManager(
             self.frame_db, self.json_file, self.excel_folder, self.workplace_manager
         )
+        startup_step("Managers")
 
         self.orders_manager.update_orders_list()
+        startup_step("Orders list")
+        if config.STARTUP_TIMING_REPORT:
+            # Idle callbacks run once the window has been mapped and drawn
+            self.root.after_idle(self.report_startup)
+        # The daily backup runs on its own thread once the window is up
+        self.root.after(
+            config.BACKUP_DELAY_MS, lambda: backup.start_backup(self.json_file)
+        )
         self.root.mainloop()
 
+    def report_startup(self):
+        startup_step("First window shown")
+        print_startup_report()
+
     def process_orders(self):
-        """Process orders entered by the user."""
+        """Process orders entered by the user on a background thread."""
         orders_input = self.entry_orders.get().strip()
-        success, message = self.orders_manager.process_orders(orders_input)
-        if success:
-            self.entry_orders.delete(0, tk.END)
-            self.status_label.configure(text=message)
-            messagebox.showinfo("Success", message)
-        else:
-            messagebox.showerror("Error", message)
+        self.start_ingest(
+            IngestJob(
+                database.process_orders,
+                orders_input,
+                self.json_file,
+                self.excel_folder,
+            ),
+            clear_entry=True,
+        )
 
     def remove_orders_by_input(self):
         """Remove orders specified in the input field."""
@@ -129,10 +199,89 @@ class ExcelToJsonConverter:
         else:
             messagebox.showwarning("Warning", message)
 
+    def sync_folder(self):
+        """Ingest all new or modified workbooks of the Excel folder."""
+        self.start_ingest(
+            IngestJob(database.sync_folder, self.json_file, self.excel_folder)
+        )
+
+    def start_ingest(self, job, clear_entry=False):
+        """Run an ingestion job and follow its progress from the Tk event loop."""
+        if self.ingest_job is not None:
+            return
+        self.ingest_job = job
+        self.ingest_clear_entry = clear_entry
+        self.set_ingest_busy(True)
+        self.status_label.configure(text="Checking Excel files...")
+        job.start()
+        self.root.after(config.INGEST_POLL_MS, self.poll_ingest)
+
+    def poll_ingest(self):
+        """Apply queued progress messages; reschedules itself until the job ends."""
+        for message in self.ingest_job.poll():
+            if message[0] == "progress":
+                _, done, total, file_name, error, eta = message
+                self.progress_bar.configure(maximum=total, value=done)
+                text = f"Processed {done}/{total}: {file_name}"
+                if error is not None:
+                    text += " (failed)"
+                if eta is not None and done < total:
+                    text += f" - about {format_eta(eta)} left"
+                self.status_label.configure(text=text)
+            else:
+                _, success, result = message
+                self.finish_ingest(success, result)
+                return
+        self.root.after(config.INGEST_POLL_MS, self.poll_ingest)
+
+    def finish_ingest(self, success, message):
+        job = self.ingest_job
+        self.ingest_job = None
+        self.set_ingest_busy(False)
+        if success:
+            if self.ingest_clear_entry:
+                self.entry_orders.delete(0, tk.END)
+            self.orders_manager.update_orders_list()
+            self.status_label.configure(text=message)
+            messagebox.showinfo("Success", message)
+        elif job.cancelled:
+            self.status_label.configure(text=message)
+            messagebox.showwarning("Cancelled", message)
+        else:
+            self.status_label.configure(text="")
+            messagebox.showerror("Error", message)
+
+    def cancel_ingest(self):
+        if self.ingest_job is not None:
+            self.ingest_job.cancel()
+            self.btn_cancel_ingest.configure(state="disabled")
+            self.status_label.configure(text="Cancelling...")
+
+    def set_ingest_busy(self, busy):
+        """Lock the buttons that write to the database while a job is running."""
+        state = "disabled" if busy else "normal"
+        for button in (
+            self.btn_process,
+            self.btn_remove_orders,
+            self.btn_sync_folder,
+            self.btn_export_db,
+        ):
+            button.configure(state=state)
+        if busy:
+            self.progress_bar.configure(value=0, maximum=1)
+            self.btn_cancel_ingest.configure(state="normal")
+            self.progress_frame.grid()
+        else:
+            self.progress_frame.grid_remove()
+
     def export_database(self):
         """Export the database to Excel."""
+        from export_database import export_database_to_excel
+
         export_database_to_excel(self)
 
 
 if __name__ == "__main__":
+    # Required for the ingestion process pool in the frozen (PyInstaller) build
+    multiprocessing.freeze_support()
     ExcelToJsonConverter()
@@ -0,0 +1,113 @@
+"""
+Sorted index of orders by test date for the Orders Manager.
+Keeps (version, order, test_date) entries ordered most recent first so that
+date-range filters use binary search and pages are sliced directly.
+"""
+
+import bisect
+from datetime import datetime
+
+# Orders without a valid test date sort last, like datetime.min did before
+UNDATED_ORDINAL = datetime.min.toordinal()
+
+
+def date_ordinal(test_date):
+    """Convert a YYYY-MM-DD string to a proleptic ordinal, or None if invalid."""
+    try:
+        return datetime.strptime(test_date, "%Y-%m-%d").toordinal()
+    except (TypeError, ValueError):
+        return None
+
+
+class OrderSelection:
+    """A contiguous run of index entries matching a version/date filter."""
+
+    def __init__(self, entries, start, stop):
+        self._entries = entries
+        self._start = start
+        self._stop = stop
+
+    def __len__(self):
+        return self._stop - self._start
+
+    def __iter__(self):
+        for idx in range(self._start, self._stop):
+            yield self._entries[idx][1:]
+
+    def page(self, offset, limit):
+        """Return up to `limit` (version, order, test_date) tuples from `offset`."""
+        start = self._start + max(0, offset)
+        stop = self._stop if limit is None else min(self._stop, start + limit)
+        return [entry[1:] for entry in self._entries[start:stop]]
+
+
+class OrderIndex:
+    """Orders of the database sorted by descending test date."""
+
+    def __init__(self):
+        # Entries are (-ordinal, version, order, test_date) in ascending order
+        self._all = []
+        self._by_version = {}
+        self._entries = {}
+
+    @classmethod
+    def build(cls, data):
+        index = cls()
+        for version, orders in data.items():
+            for order, details in orders.items():
+                test_date = details.get("metadata", {}).get("test_date", "0000-00-00")
+                index._entries[(version, order)] = cls._make_entry(
+                    version, order, test_date
+                )
+        index._all = sorted(index._entries.values())
+        for entry in index._all:
+            index._by_version.setdefault(entry[1], []).append(entry)
+        return index
+
+    @staticmethod
+    def _make_entry(version, order, test_date):
+        ordinal = date_ordinal(test_date)
+        if ordinal is None:
+            ordinal = UNDATED_ORDINAL
+        return (-ordinal, version, order, test_date)
+
+    def __len__(self):
+        return len(self._all)
+
+    def versions(self):
+        return sorted(self._by_version.keys())
+
+    def add(self, version, order, test_date):
+        """Insert or update an order, keeping the index sorted."""
+        self.remove(version, order)
+        entry = self._make_entry(version, order, test_date)
+        self._entries[(version, order)] = entry
+        bisect.insort(self._all, entry)
+        bisect.insort(self._by_version.setdefault(version, []), entry)
+
+    def remove(self, version, order):
+        """Remove an order from the index if present."""
+        entry = self._entries.pop((version, order), None)
+        if entry is None:
+            return
+        for entries in (self._all, self._by_version[version]):
+            pos = bisect.bisect_left(entries, entry)
+            if pos < len(entries) and entries[pos] == entry:
+                del entries[pos]
+        if not self._by_version[version]:
+            del self._by_version[version]
+
+    def select(self, version=None, start_date=None, end_date=None):
+        """Return the orders matching a version and an inclusive date range."""
+        if version and version.lower() != "all":
+            entries = self._by_version.get(version, [])
+        else:
+            entries = self._all
+        if start_date is None:
+            return OrderSelection(entries, 0, len(entries))
+        # Keys are negated ordinals, so the most recent date comes first
+        lo = 0
+        if end_date is not None:
+            lo = bisect.bisect_left(entries, (-end_date.toordinal(),))
+        hi = bisect.bisect_left(entries, (-start_date.toordinal() + 1,))
+        return OrderSelection(entries, lo, max(lo, hi))
@@ -1,10 +1,37 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from tkcalendar import DateEntry
 from datetime import datetime, timedelta
+import config
 import database
 from tooltip import ToolTip
 
+UNCHECKED = "☐"
+CHECKED = "☑"
+# (column, heading, width, anchor) of the orders list
+ORDER_COLUMNS = [
+    ("selected", "✓", 30, "center"),
+    ("index", "#", 50, "e"),
+    ("version", "Version", 80, "center"),
+    ("order", "Order", 120, "w"),
+    ("date", "Date", 100, "center"),
+    ("view", "👁️", 40, "center"),
+]
+# (column, heading, width) of the search results
+SEARCH_COLUMNS = [
+    ("field", "Found In", 110),
+    ("value", "Value", 120),
+    ("version", "Version", 70),
+    ("order", "Order", 90),
+    ("temperature", "Temp", 50),
+]
+SEARCH_FIELD_LABELS = {
+    "order": "Order",
+    "production_order": "Production Order",
+    "propellant_lot_number": "Propellant Lot",
+    "test_no": "Test",
+    "inflator_no": "Inflator",
+}
+
 
 class OrdersManager:
     def __init__(self, parent, json_file, excel_folder, workplace_manager):
@@ -48,6 +75,15 @@ class OrdersManager:
         ttk.Label(
             title_orders_frame, text="Orders Manager", font=("Helvetica", 12, "bold")
         ).grid(row=0, column=0, sticky="w")
+        self.btn_trends = ttk.Button(
+            title_orders_frame,
+            text="Trends",
+            command=self.show_trends,
+            style="Action.TButton",
+            width=10,
+        )
+        self.btn_trends.grid(row=0, column=1, sticky="e")
+        ToolTip(self.btn_trends, "Compare all orders of a version over time")
 
         # Filters Frame
         filters_frame = ttk.Frame(
@@ -124,6 +160,61 @@ class OrdersManager:
         self.end_date_btn.grid(row=0, column=5, sticky="w", padx=2)
         self.custom_dates_frame.grid_remove()
 
+        # Search (prefix match on order, lot, test and inflator numbers)
+        search_frame = ttk.Frame(filters_frame, style="Filters.TFrame")
+        search_frame.grid(row=2, column=0, columnspan=4, sticky="ew", pady=(5, 0))
+        search_frame.columnconfigure(1, weight=1)
+        ttk.Label(search_frame, text="Search:", style="Filters.TLabel").grid(
+            row=0, column=0, sticky="w", padx=(0, 5)
+        )
+        self.search_var = tk.StringVar()
+        self.search_entry = ttk.Entry(search_frame, textvariable=self.search_var)
+        self.search_entry.grid(row=0, column=1, sticky="ew")
+        self.search_entry.bind("<KeyRelease>", self.on_search_changed)
+        self.search_entry.bind("<Return>", lambda e: self.run_search())
+        self.search_entry.bind("<Escape>", lambda e: self.search_var.set(""))
+        ToolTip(
+            self.search_entry,
+            "Find orders by order, production order, lot, test or inflator number",
+        )
+        self.btn_select_found = ttk.Button(
+            search_frame,
+            text="Select",
+            command=self.select_search_results,
+            style="Action.TButton",
+            width=8,
+        )
+        self.btn_select_found.grid(row=0, column=2, sticky="e", padx=(5, 0))
+        ToolTip(self.btn_select_found, "Select the orders of the highlighted results")
+
+        self.search_results_frame = ttk.Frame(filters_frame)
+        self.search_results_frame.grid(
+            row=3, column=0, columnspan=4, sticky="ew", pady=(5, 0)
+        )
+        self.search_results_frame.columnconfigure(0, weight=1)
+        self.search_results = ttk.Treeview(
+            self.search_results_frame,
+            columns=[column for column, _, _ in SEARCH_COLUMNS],
+            show="headings",
+            selectmode="extended",
+            height=5,
+        )
+        for column, heading, width in SEARCH_COLUMNS:
+            self.search_results.heading(column, text=heading)
+            self.search_results.column(column, width=width, anchor="center")
+        self.search_results.grid(row=0, column=0, sticky="ew")
+        search_scrollbar = ttk.Scrollbar(
+            self.search_results_frame,
+            orient=tk.VERTICAL,
+            command=self.search_results.yview,
+        )
+        search_scrollbar.grid(row=0, column=1, sticky="ns")
+        self.search_results.configure(yscrollcommand=search_scrollbar.set)
+        self.search_results.bind("<Double-1>", self.on_search_double_click)
+        self.search_results_frame.grid_remove()
+        self.search_matches = []
+        self._search_job = None
+
         # Pagination Frame
         pagination_frame = ttk.Frame(self.frame_orders_manager)
         pagination_frame.grid(row=2, column=0, sticky="ew", pady=5)
@@ -133,7 +224,10 @@ class OrdersManager:
             row=0, column=0, sticky="w", padx=(0, 5)
         )
         self.page_selector = ttk.Combobox(
-            pagination_frame, values=[5, 10, 15, 20, 25, 30], width=5, state="readonly"
+            pagination_frame,
+            values=[5, 10, 15, 20, 25, 30, 50, 100, "All"],
+            width=5,
+            state="readonly",
         )
         self.page_selector.set(self.orders_per_page)
         self.page_selector.grid(row=0, column=1, sticky="w")
@@ -174,39 +268,38 @@ class OrdersManager:
         )
         self.next_btn.pack(side="left", padx=(5, 0))
 
-        # Canvas and Scrollbar for Orders
-        self.orders_canvas = tk.Canvas(self.frame_orders_manager)
-        self.orders_canvas.grid(row=3, column=0, sticky="nsew", padx=5, pady=5)
+        # Orders list: one Treeview row per order, so only the visible rows
+        # are drawn no matter how many orders the page holds
+        self.orders_tree = ttk.Treeview(
+            self.frame_orders_manager,
+            columns=[column for column, _, _, _ in ORDER_COLUMNS],
+            show="headings",
+            selectmode="browse",
+            height=10,
+        )
+        for column, heading, width, anchor in ORDER_COLUMNS:
+            self.orders_tree.heading(column, text=heading)
+            self.orders_tree.column(
+                column, width=width, anchor=anchor, stretch=column == "order"
+            )
+        self.orders_tree.grid(row=3, column=0, sticky="nsew", padx=5, pady=5)
         self.orders_scrollbar = ttk.Scrollbar(
             self.frame_orders_manager,
             orient=tk.VERTICAL,
-            command=self.orders_canvas.yview,
+            command=self.orders_tree.yview,
         )
         self.orders_scrollbar.grid(row=3, column=1, sticky="ns", pady=5)
-        self.orders_canvas.configure(yscrollcommand=self.orders_scrollbar.set)
-
-        self.orders_inner_frame = ttk.Frame(self.orders_canvas)
-        self.orders_canvas.create_window(
-            (0, 0), window=self.orders_inner_frame, anchor="nw"
-        )
-
-        self.orders_inner_frame.bind(
-            "<Configure>",
-            lambda e: self.orders_canvas.configure(
-                scrollregion=self.orders_canvas.bbox("all")
-            ),
-        )
-        self.orders_canvas.yview_moveto(0)
-        self.orders_canvas.bind(
-            "<Enter>",
-            lambda e: self.orders_canvas.bind_all("<MouseWheel>", self._on_mousewheel),
-        )
-        self.orders_canvas.bind(
-            "<Leave>", lambda e: self.orders_canvas.unbind_all("<MouseWheel>")
+        self.orders_tree.configure(yscrollcommand=self.orders_scrollbar.set)
+        self.orders_tree.bind("<Button-1>", self.on_orders_click)
+        self.orders_tree.bind("<Double-1>", self.on_orders_double_click)
+        self.orders_tree.bind("<space>", self.on_orders_space)
+        ToolTip(
+            self.orders_tree,
+            "Click the box to select an order, double-click or 👁️ for metadata",
         )
 
-        self.order_vars = {}
-        self.order_checkbuttons = {}
+        self.selected_orders = set()
+        self.current_page_orders = []
 
         # Action Buttons Frame
         action_btn_frame = ttk.Frame(
@@ -247,11 +340,133 @@ class OrdersManager:
         self.btn_clear_workplace.grid(row=0, column=2, sticky="ew", padx=5)
         ToolTip(self.btn_clear_workplace, "Clear all tests from workplace")
 
-    def _on_mousewheel(self, event):
-        self.orders_canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
+    def show_trends(self):
+        # Loaded on first use: the trend window pulls in matplotlib
+        from trend_window import show_trends
+
+        show_trends(self)
+
+    def _order_row(self, iid):
+        """Return the (version, order) shown in a row of the orders list."""
+        return self.current_page_orders[int(iid)]
+
+    def _set_order_selected(self, iid, state):
+        key = self._order_row(iid)
+        if state:
+            self.selected_orders.add(key)
+        else:
+            self.selected_orders.discard(key)
+        self.orders_tree.set(iid, "selected", CHECKED if state else UNCHECKED)
+
+    def toggle_order(self, iid):
+        """Toggle the selection of one row of the orders list."""
+        self._set_order_selected(iid, self._order_row(iid) not in self.selected_orders)
+        self.select_all_var.set(
+            all(key in self.selected_orders for key in self.current_page_orders)
+        )
+
+    def on_orders_click(self, event):
+        """Toggle the order when its box is clicked, show metadata on the eye."""
+        if self.orders_tree.identify_region(event.x, event.y) != "cell":
+            return
+        iid = self.orders_tree.identify_row(event.y)
+        if not iid:
+            return
+        column = self.orders_tree.identify_column(event.x)
+        if column == "#1":
+            self.toggle_order(iid)
+        elif column == f"#{len(ORDER_COLUMNS)}":
+            self.show_metadata_popup(*self._order_row(iid))
+
+    def on_orders_double_click(self, event):
+        iid = self.orders_tree.identify_row(event.y)
+        column = self.orders_tree.identify_column(event.x)
+        if iid and column not in ("#1", f"#{len(ORDER_COLUMNS)}"):
+            self.show_metadata_popup(*self._order_row(iid))
+
+    def on_orders_space(self, event):
+        iid = self.orders_tree.focus()
+        if iid:
+            self.toggle_order(iid)
+        return "break"
+
+    def on_search_changed(self, event=None):
+        """Search again once typing pauses."""
+        if self._search_job is not None:
+            self.parent.after_cancel(self._search_job)
+        self._search_job = self.parent.after(config.SEARCH_DELAY_MS, self.run_search)
+
+    def run_search(self):
+        """Show the index entries whose value starts with the search text."""
+        if self._search_job is not None:
+            self.parent.after_cancel(self._search_job)
+            self._search_job = None
+        text = self.search_var.get().strip()
+        self.search_results.delete(*self.search_results.get_children())
+        self.search_matches = []
+        if not text:
+            self.search_results_frame.grid_remove()
+            return
+
+        results, error = database.search_orders(
+            self.json_file, text, config.SEARCH_MAX_RESULTS
+        )
+        if error:
+            messagebox.showerror("Error", error)
+            return
+        self.search_matches = results
+        for row, (term, field, version, order, temp_type) in enumerate(results):
+            self.search_results.insert(
+                "",
+                "end",
+                iid=str(row),
+                values=(
+                    SEARCH_FIELD_LABELS.get(field, field),
+                    term,
+                    version,
+                    order,
+                    temp_type or "-",
+                ),
+            )
+        if not results:
+            self.search_results.insert(
+                "", "end", values=("", f"No match for '{text}'", "", "", "")
+            )
+        self.search_results_frame.grid()
+
+    def _search_result_order(self, iid):
+        if not iid.isdigit():
+            return None
+        _, _, version, order, _ = self.search_matches[int(iid)]
+        return version, order
+
+    def on_search_double_click(self, event):
+        key = self._search_result_order(self.search_results.identify_row(event.y))
+        if key is not None:
+            self.show_metadata_popup(*key)
+
+    def select_search_results(self):
+        """Select the orders of the highlighted (or all) search results."""
+        iids = self.search_results.selection() or self.search_results.get_children()
+        keys = {self._search_result_order(iid) for iid in iids} - {None}
+        if not keys:
+            messagebox.showwarning("Warning", "No search results to select.")
+            return
+        self.selected_orders.update(keys)
+        self.update_orders_list()
+        # The refresh drops orders that the version or date filter hides
+        hidden = keys - self.selected_orders
+        if hidden:
+            messagebox.showwarning(
+                "Warning",
+                f"{len(hidden)} found order(s) are hidden by the current version "
+                "or date filter and were not selected.",
+            )
 
     def pick_date(self, entry):
         """Open a DateEntry calendar to pick a date and insert it into the entry."""
+        from tkcalendar import DateEntry
+
         popup = tk.Toplevel(self.parent)
         popup.title("Select Date")
         popup.geometry("250x250")
@@ -281,26 +496,12 @@ class OrdersManager:
         else:
             self.custom_dates_frame.grid_remove()
         self.current_page = 1
-        for var in self.order_vars.values():
-            var.set(False)
+        self.selected_orders.clear()
         self.select_all_var.set(False)
         self.update_orders_list()
 
-    def process_orders(self, orders_input):
-        """Process orders entered by the user."""
-        success, message = database.process_orders(
-            orders_input, self.json_file, self.excel_folder
-        )
-        if success:
-            self.update_orders_list()
-        return success, message
-
     def update_orders_list(self):
         """Update the orders list UI with filtered data."""
-        for widget in self.orders_inner_frame.winfo_children():
-            widget.destroy()
-        self.order_checkbuttons.clear()
-
         # Get date range filter
         date_range = self.date_range_var.get()
         today = datetime.now().date()
@@ -332,8 +533,16 @@ class OrdersManager:
                 return
 
         selected_version = self.version_combobox.get()
-        orders_list, versions, error = database.get_orders_list(
-            self.json_file, selected_version, start_date, end_date
+        # "All" shows every order on a single page
+        page_size = self.orders_per_page
+        start_idx = (self.current_page - 1) * (page_size or 0)
+        paginated_orders, total_orders, versions, error = database.get_orders_page(
+            self.json_file,
+            selected_version,
+            start_date,
+            end_date,
+            start_idx,
+            page_size,
         )
 
         if error:
@@ -345,47 +554,42 @@ class OrdersManager:
         if current not in self.version_combobox["values"]:
             self.version_combobox.set("All")
 
-        total_orders = len(orders_list)
-        self.total_pages = max(
-            1, (total_orders + self.orders_per_page - 1) // self.orders_per_page
-        )
+        if page_size:
+            self.total_pages = max(1, (total_orders + page_size - 1) // page_size)
+        else:
+            self.total_pages = 1
         if self.current_page > self.total_pages:
             self.current_page = self.total_pages
-
-        start_idx = (self.current_page - 1) * self.orders_per_page
-        end_idx = start_idx + self.orders_per_page
-        paginated_orders = orders_list[start_idx:end_idx]
-
-        for idx, (version, order, test_date) in enumerate(
-            paginated_orders, start=start_idx + 1
-        ):
-            key = (version, order)
-            if key not in self.order_vars:
-                self.order_vars[key] = tk.BooleanVar()
-            var = self.order_vars[key]
-            display_text = (
-                f"{idx}. Version: {version}, Order: {order}, Date: {test_date}"
+            start_idx = (self.current_page - 1) * page_size
+            paginated_orders, _, _, _ = database.get_orders_page(
+                self.json_file,
+                selected_version,
+                start_date,
+                end_date,
+                start_idx,
+                page_size,
             )
 
-            row_frame = ttk.Frame(self.orders_inner_frame)
-            row_frame.grid(row=idx - start_idx, column=0, sticky="w", padx=5, pady=2)
-
-            chk = ttk.Checkbutton(row_frame, text=display_text, variable=var, width=40)
-            chk.pack(side=tk.LEFT)
-
-            btn_view = ttk.Button(
-                row_frame,
-                text=" 👁️",
-                width=3,
-                command=lambda v=version, o=order: self.show_metadata_popup(v, o),
-                style="Action.TButton",
+        if self.selected_orders:
+            # Drop checked orders that were removed or no longer match the filter
+            matching, _, _, _ = database.get_orders_page(
+                self.json_file, selected_version, start_date, end_date, 0, None
             )
-            btn_view.pack(side=tk.LEFT, padx=(10, 0))
+            self.selected_orders &= {(version, order) for version, order, _ in matching}
 
-            self.order_checkbuttons[key] = chk
-
-        self.orders_canvas.configure(scrollregion=self.orders_canvas.bbox("all"))
-        self.orders_canvas.yview_moveto(0)
+        self.current_page_orders = [
+            (version, order) for version, order, _ in paginated_orders
+        ]
+        self.orders_tree.delete(*self.orders_tree.get_children())
+        for row, (version, order, test_date) in enumerate(paginated_orders):
+            mark = CHECKED if (version, order) in self.selected_orders else UNCHECKED
+            self.orders_tree.insert(
+                "",
+                "end",
+                iid=str(row),
+                values=(mark, start_idx + row + 1, version, order, test_date, "👁️"),
+            )
+        self.orders_tree.yview_moveto(0)
 
         self.page_info.configure(text=f"Page {self.current_page}/{self.total_pages}")
 
@@ -394,14 +598,10 @@ class OrdersManager:
             state="normal" if self.current_page < self.total_pages else "disabled"
         )
 
-        current_page_orders = [
-            (version, order) for version, order, _ in paginated_orders
-        ]
-        all_selected = all(
-            self.order_vars.get(key, tk.BooleanVar(value=False)).get()
-            for key in current_page_orders
+        self.select_all_var.set(
+            bool(self.current_page_orders)
+            and all(key in self.selected_orders for key in self.current_page_orders)
         )
-        self.select_all_var.set(all_selected)
 
     def show_metadata_popup(self, version, order):
         """Show metadata for a specific order in a popup."""
@@ -436,10 +636,14 @@ class OrdersManager:
 
     def on_items_per_page_changed(self, event=None):
         """Handle changes to items per page."""
-        try:
-            self.orders_per_page = int(self.page_selector.get())
-        except:
-            self.orders_per_page = 10
+        selected = self.page_selector.get()
+        if selected == "All":
+            self.orders_per_page = None
+        else:
+            try:
+                self.orders_per_page = int(selected)
+            except:
+                self.orders_per_page = 10
         self.current_page = 1
         self.update_orders_list()
 
@@ -453,24 +657,13 @@ class OrdersManager:
     def toggle_select_all(self):
         """Toggle selection of all orders on the current page."""
         state = self.select_all_var.get()
-        start_idx = (self.current_page - 1) * self.orders_per_page
-        end_idx = start_idx + self.orders_per_page
-
-        orders_list, _, _ = database.get_orders_list(
-            self.json_file, self.version_combobox.get(), None, None
-        )
-        paginated_orders = orders_list[start_idx:end_idx]
-
-        for version, order, _ in paginated_orders:
-            key = (version, order)
-            if key in self.order_vars:
-                self.order_vars[key].set(state)
+        for iid in self.orders_tree.get_children():
+            self._set_order_selected(iid, state)
 
     def on_version_filter(self, event=None):
         """Handle version filter changes."""
         self.current_page = 1
-        for var in self.order_vars.values():
-            var.set(False)
+        self.selected_orders.clear()
         self.select_all_var.set(False)
         self.update_orders_list()
 
@@ -483,11 +676,7 @@ class OrdersManager:
 
     def send_to_workplace(self):
         """Send selected orders to the workplace, preventing duplicates."""
-        selected_orders = [
-            (version, order)
-            for (version, order), var in self.order_vars.items()
-            if var.get()
-        ]
+        selected_orders = sorted(self.selected_orders)
         if not selected_orders:
             messagebox.showwarning(
                 "Warning", "No orders selected to send to workplace."
@@ -541,11 +730,7 @@ class OrdersManager:
 
     def remove_workplace_orders_selected(self):
         """Remove selected orders from the workplace."""
-        selected_orders = {
-            (version, order)
-            for (version, order), var in self.order_vars.items()
-            if var.get()
-        }
+        selected_orders = set(self.selected_orders)
         if not selected_orders:
             messagebox.showwarning(
                 "Warning", "No orders selected to remove from Workplace."
@@ -0,0 +1,87 @@
+"""
+Pressure curve plotting shared by the report window and the PDF export.
+All inflator curves of a temperature are drawn as a single LineCollection
+instead of one Line2D per inflator, with the limit and mean lines on top.
+"""
+
+import numpy as np
+from matplotlib.collections import LineCollection
+
+CURVE_COLOR = "#444444"
+MAX_LIMIT_COLOR = "#d62728"
+MIN_LIMIT_COLOR = "#1f77b4"
+MEAN_COLOR = "#7CE04A"
+
+
+def curve_segments(ms_points, pressure_matrix):
+    """Convert a pressure matrix (inflators x ms) into LineCollection segments.
+
+    Like ax.plot, a curve is broken where a value is NaN, so a row may give
+    several segments; isolated single points are not drawn.
+    """
+    x = np.asarray(ms_points, dtype=np.float64)
+    matrix = np.asarray(pressure_matrix, dtype=np.float64)
+    if np.isfinite(matrix).all():
+        # Common case: one (n_ms, 2) polyline per inflator, built in one go
+        return np.stack((np.broadcast_to(x, matrix.shape), matrix), axis=-1)
+
+    segments = []
+    for row in matrix:
+        points = np.flatnonzero(np.isfinite(row))
+        runs = np.split(points, np.flatnonzero(np.diff(points) > 1) + 1)
+        for run in runs:
+            if len(run) > 1:
+                segments.append(np.column_stack((x[run], row[run])))
+    return segments
+
+
+def plot_pressure_curves(
+    ax,
+    ms_points,
+    pressure_matrix,
+    limits_max,
+    limits_min,
+    mean,
+    limit_width=2,
+    mean_width=2.5,
+    rasterized=False,
+):
+    """Draw the inflator curves, the limit lines and the mean curve on `ax`.
+
+    With `rasterized`, vector backends (PDF) embed the curves as one image,
+    so the file size no longer grows with the number of inflators.
+    """
+    curves = LineCollection(
+        curve_segments(ms_points, pressure_matrix),
+        colors=CURVE_COLOR,
+        linewidths=1,
+        alpha=0.5,
+        rasterized=rasterized,
+    )
+    ax.add_collection(curves)
+    ax.plot(
+        ms_points,
+        limits_max,
+        color=MAX_LIMIT_COLOR,
+        linewidth=limit_width,
+        label="Maximum Limit",
+        linestyle="--",
+    )
+    ax.plot(
+        ms_points,
+        limits_min,
+        color=MIN_LIMIT_COLOR,
+        linewidth=limit_width,
+        label="Minimum Limit",
+        linestyle="--",
+    )
+    ax.plot(
+        ms_points,
+        mean,
+        color=MEAN_COLOR,
+        linewidth=mean_width,
+        label="Mean",
+        linestyle="-",
+    )
+    ax.autoscale_view()
+    return curves
@@ -2,13 +2,33 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import numpy as np
-import json
 from datetime import datetime
+import config
 from export_utils import export_to_excel, export_to_pdf
+from plotting import plot_pressure_curves
+from report_data import group_by_temperature, temperature_data
 from tooltip import ToolTip
 
 
+def debounce_resize(canvas_fig, event, pending):
+    """Resize a report figure once the window has stopped changing size.
+
+    FigureCanvasTkAgg re-renders the figure on every <Configure> event of its
+    widget, i.e. on every mouse move while a window edge is dragged. Only the
+    last event of a burst is passed on; the plotted artists are kept as-is.
+    """
+    widget = canvas_fig.get_tk_widget()
+    if pending.get(canvas_fig) is not None:
+        widget.after_cancel(pending[canvas_fig])
+
+    def resize():
+        pending[canvas_fig] = None
+        if widget.winfo_exists():
+            canvas_fig.resize(event)
+
+    pending[canvas_fig] = widget.after(config.REPORT_RESIZE_DEBOUNCE_MS, resize)
+
+
 def show_report(self):
     try:
         # Use filtered data if available, otherwise use all workplace data
@@ -25,23 +45,7 @@ def show_report(self):
             )
             return
 
-        # Group data by temperature
-        data_by_temp = {}
-        for reg in data_to_use:
-            temp = reg["type"]
-            if temp not in data_by_temp:
-                data_by_temp[temp] = []
-            data_by_temp[temp].append(reg)
-
-        # Define available temperatures, sorted to prioritize RT, LT, HT
-        available_temps = sorted(
-            [temp for temp in data_by_temp if data_by_temp[temp]],
-            key=lambda x: (
-                ["RT", "LT", "HT"].index(x)
-                if x in ["RT", "LT", "HT"]
-                else len(["RT", "LT", "HT"])
-            ),
-        )
+        data_by_temp, available_temps = group_by_temperature(data_to_use)
         if not available_temps:
             messagebox.showwarning("Warning", "No valid temperature data to report.")
             return
@@ -108,7 +112,9 @@ def show_report(self):
         btn_export_excel = ttk.Button(
             btn_frame,
             text="Export to Excel",
-            command=lambda: export_to_excel(data_by_temp, table_data, ms_points_dict),
+            command=lambda: export_to_excel(
+                data_by_temp, table_data, ms_points_dict, self.json_file
+            ),
             style="Export.TButton",
         )
         btn_export_excel.pack(side=tk.RIGHT, padx=(5, 5))
@@ -175,11 +181,9 @@ def show_report(self):
         container.bind("<Configure>", update_canvas_width)
 
         # Store table data and ms_points for export
-        table_data = [[] for _ in range(3)]  # [RT, LT, HT]
+        table_data = [[] for _ in config.TEMPERATURE_TYPES]  # [RT, LT, HT]
         ms_points_dict = {}
-
-        # Fixed pressure points
-        pressure_points = ["PK 10%", "PK 25%", "PK 50%", "PK 75%", "PK 90%", "PK MAX"]
+        pending_resizes = {}
 
         # For each temperature, plot graph and table
         for temp in available_temps:
@@ -197,13 +201,11 @@ def show_report(self):
             temp_frame.columnconfigure(0, weight=1)
             temp_frame.rowconfigure(1, weight=1)
 
-            ms_points = set()
-            for r in records:
-                if r["pressures"]:
-                    ms_points.update(r["pressures"].keys())
-            ms_points = sorted(int(ms) for ms in ms_points)
-            ms_points_str = [str(ms) for ms in ms_points]
-            ms_points_dict[temp] = ms_points_str
+            # Built once per selection and shared with the exports
+            data = temperature_data(self.json_file, temp, records)
+            ms_points = data.ms_points
+            ms_points_dict[temp] = [str(ms) for ms in ms_points]
+            table_data[config.TEMPERATURE_TYPES.index(temp)] = data.table_rows
 
             if not ms_points:
                 ttk.Label(
@@ -211,94 +213,27 @@ def show_report(self):
                     text="No pressure data available for this temperature.",
                     font=("Helvetica", 10),
                 ).pack(pady=10, fill=tk.BOTH, expand=True)
-                table_data[["RT", "LT", "HT"].index(temp)] = []
                 continue
 
-            pressure_matrix = []
-            for r in records:
-                p = []
-                if r["pressures"]:
-                    for ms in ms_points_str:
-                        val = r["pressures"].get(ms, np.nan)
-                        p.append(val)
-                else:
-                    p = [np.nan] * len(ms_points)
-                pressure_matrix.append(p)
-            pressure_matrix = np.array(pressure_matrix, dtype=np.float64)
-
-            if pressure_matrix.size == 0:
+            if data.pressure_matrix.size == 0:
                 ttk.Label(
                     temp_frame,
                     text="No valid pressure data available for this temperature.",
                     font=("Helvetica", 10),
                 ).pack(pady=10, fill=tk.BOTH, expand=True)
-                table_data[["RT", "LT", "HT"].index(temp)] = []
                 continue
 
-            limits_max = []
-            limits_min = []
-            try:
-                with open(self.json_file, "r", encoding="utf-8") as f:
-                    data_json = json.load(f)
-                sample_order = records[0]["order"]
-                limits = data_json[version][sample_order]["temperatures"][temp][
-                    "limits"
-                ]
-                max_dict = limits.get("maximums", {})
-                min_dict = limits.get("minimums", {})
-                limits_max = [max_dict.get(str(ms), np.nan) for ms in ms_points]
-                limits_min = [min_dict.get(str(ms), np.nan) for ms in ms_points]
-            except Exception as e:
-                limits_max = [np.nan] * len(ms_points)
-                limits_min = [np.nan] * len(ms_points)
-
-            mean = np.nanmean(pressure_matrix, axis=0)
-
-            # Align ms_points_str with pressure_points
-            if len(ms_points_str) > len(pressure_points):
-                ms_points_str = ms_points_str[: len(pressure_points)]
-            elif len(ms_points_str) < len(pressure_points):
-                ms_points_str.extend(
-                    ["-"] * (len(pressure_points) - len(ms_points_str))
-                )
-
-            # Initial figure
             fig, ax = plt.subplots(figsize=(8, 4))
             fig.patch.set_facecolor("#fafafa")
             ax.set_facecolor("#fafafa")
 
-            # Initial plot
-            for p in pressure_matrix:
-                ax.plot(
-                    ms_points,
-                    p,
-                    color="#444444",
-                    linewidth=1,
-                    alpha=0.5,
-                )
-            ax.plot(
-                ms_points,
-                limits_max,
-                color="#d62728",
-                linewidth=2,
-                label="Maximum Limit",
-                linestyle="--",
-            )
-            ax.plot(
-                ms_points,
-                limits_min,
-                color="#1f77b4",
-                linewidth=2,
-                label="Minimum Limit",
-                linestyle="--",
-            )
-            ax.plot(
+            plot_pressure_curves(
+                ax,
                 ms_points,
-                mean,
-                color="#7CE04A",
-                linewidth=2.5,
-                label="Mean",
-                linestyle="-",
+                data.pressure_matrix,
+                data.limits_max,
+                data.limits_min,
+                data.mean,
             )
             ax.set_title(f"Pressure Curves - Temperature {temp}", fontsize=12, pad=10)
             ax.set_xlabel("Time (ms)", fontsize=10)
@@ -308,110 +243,49 @@ def show_report(self):
             ax.minorticks_on()
             ax.grid(True, which="minor", color="#e0e0e0", linestyle=":", linewidth=0.5)
 
-            def update_graph(event=None):
-                if not temp_frame.winfo_exists():
-                    return
-                frame_width = temp_frame.winfo_width()
-                frame_height = temp_frame.winfo_height()
-                fig_width = max(4, frame_width / 100 * 0.98)
-                fig_height = max(2, frame_height / 100 * 0.6)
-                fig.set_size_inches(fig_width, fig_height)
-                ax.clear()
-                ax.set_facecolor("#fafafa")
-                for p in pressure_matrix:
-                    ax.plot(
-                        ms_points,
-                        p,
-                        color="#444444",
-                        linewidth=1,
-                        alpha=0.5,
-                    )
-                ax.plot(
-                    ms_points,
-                    limits_max,
-                    color="#d62728",
-                    linewidth=2,
-                    label="Maximum Limit",
-                    linestyle="--",
-                )
-                ax.plot(
-                    ms_points,
-                    limits_min,
-                    color="#1f77b4",
-                    linewidth=2,
-                    label="Minimum Limit",
-                    linestyle="--",
-                )
-                ax.plot(
-                    ms_points,
-                    mean,
-                    color="#7CE04A",
-                    linewidth=2.5,
-                    label="Mean",
-                    linestyle="-",
-                )
-                ax.set_title(
-                    f"Pressure Curves - Temperature {temp}", fontsize=12, pad=10
-                )
-                ax.set_xlabel("Time (ms)", fontsize=10)
-                ax.set_ylabel("Pressure (bar)", fontsize=10)
-                ax.legend(loc="lower right", fontsize=8)
-                ax.grid(True, color="#cccccc", linestyle="--", linewidth=0.7)
-                ax.minorticks_on()
-                ax.grid(
-                    True, which="minor", color="#e0e0e0", linestyle=":", linewidth=0.5
-                )
-                canvas_fig.draw()
-                canvas_fig.get_tk_widget().update()
-
-            temp_frame.bind("<Configure>", update_graph)
-
+            # The figure follows its widget's size; replace the canvas' own
+            # per-event resize handler with a debounced one
             canvas_fig = FigureCanvasTkAgg(fig, master=temp_frame)
-            canvas_fig.get_tk_widget().grid(row=0, column=0, sticky="nsew", pady=5)
+            graph_widget = canvas_fig.get_tk_widget()
+            graph_widget.bind(
+                "<Configure>",
+                lambda e, cf=canvas_fig: debounce_resize(cf, e, pending_resizes),
+            )
+            graph_widget.grid(row=0, column=0, sticky="nsew", pady=5)
             temp_frame.rowconfigure(0, weight=3)
             temp_frame.rowconfigure(1, weight=1)
 
             # Combined Table with Label column
-            table_columns = ["Label"] + pressure_points
+            table_columns = ["Label"] + config.PRESSURE_POINTS
             table = ttk.Treeview(
                 temp_frame,
                 columns=table_columns,
                 show="headings",
-                height=4,
+                height=len(data.table_rows),
             )
             table.heading("Label", text="")
-            for pk in pressure_points:
+            for pk in config.PRESSURE_POINTS:
                 table.heading(pk, text=pk)
                 table.column(pk, anchor="center", stretch=True)
             table.column("Label", anchor="center", stretch=True)
 
-            def format_row(row):
-                return [f"{v:.2f}" if not np.isnan(v) else "-" for v in row]
-
             # Insert rows with labels
-            table.insert(
-                "", "end", values=["Time (ms)"] + ms_points_str, tags=("time",)
-            )
-            table.insert(
-                "",
-                "end",
-                values=["Maximum (bar)"] + format_row(limits_max),
-                tags=("max",),
-            )
-            table.insert(
-                "", "end", values=["Mean (bar)"] + format_row(mean), tags=("mean",)
-            )
-            table.insert(
-                "",
-                "end",
-                values=["Minimum (bar)"] + format_row(limits_min),
-                tags=("min",),
-            )
+            row_tags = {
+                "Time (ms)": "time",
+                "Maximum (bar)": "max",
+                "Mean (bar)": "mean",
+                "Minimum (bar)": "min",
+            }
+            for label, row_values in data.table_rows:
+                table.insert(
+                    "", "end", values=row_values, tags=(row_tags.get(label, "stats"),)
+                )
 
             table.tag_configure("time", background="#f0f0f0")
             table.tag_configure("max", background="#ffcccc")
             table.tag_configure("mean", background="#7CE04A")
             table.tag_configure("min", background="#cce6ff")
+            table.tag_configure("stats", background="#fafafa")
 
             style = ttk.Style()
             style.configure("Treeview", font=("Helvetica", 6), rowheight=20)
@@ -447,14 +321,6 @@ def show_report(self):
 
             table.grid(row=1, column=0, sticky="nsew", padx=(5, 15), pady=5)
 
-            # Update table_data for export
-            table_data[["RT", "LT", "HT"].index(temp)] = [
-                ("Time (ms)", ["Time (ms)"] + ms_points_str),
-                ("Maximum (bar)", ["Maximum (bar)"] + format_row(limits_max)),
-                ("Mean (bar)", ["Mean (bar)"] + format_row(mean)),
-                ("Minimum (bar)", ["Minimum (bar)"] + format_row(limits_min)),
-            ]
-
         report_win.mainloop()
     except Exception as e:
         messagebox.showerror("Error", f"Error generating report: {str(e)}")
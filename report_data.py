@@ -0,0 +1,106 @@
+"""
+Report data of a workplace selection, shared by the report window and the
+batch reports: the records grouped by temperature and, per temperature, the
+pressure matrix, limits, mean and capability statistics behind the graph and
+the summary table rows that the PDF and Excel exports write.
+"""
+
+from collections import namedtuple
+import warnings
+import numpy as np
+import config
+import database
+from cpk import capability_stats, capability_rows
+
+TemperatureData = namedtuple(
+    "TemperatureData",
+    "ms_points pressure_matrix limits_max limits_min mean table_rows",
+)
+
+
+def group_by_temperature(records):
+    """Return (data_by_temp, available_temps), RT, LT and HT first."""
+    data_by_temp = {}
+    for reg in records:
+        data_by_temp.setdefault(reg["type"], []).append(reg)
+    available_temps = sorted(
+        data_by_temp,
+        key=lambda x: (
+            config.TEMPERATURE_TYPES.index(x)
+            if x in config.TEMPERATURE_TYPES
+            else len(config.TEMPERATURE_TYPES)
+        ),
+    )
+    return data_by_temp, available_temps
+
+
+def format_row(row):
+    """One cell per pressure point, "-" where there is no value."""
+    cells = [f"{v:.2f}" if not np.isnan(v) else "-" for v in row]
+    cells = cells[: len(config.PRESSURE_POINTS)]
+    return cells + ["-"] * (len(config.PRESSURE_POINTS) - len(cells))
+
+
+def temperature_data(json_file, temp, records):
+    """Compute the graph and summary table data of one temperature.
+
+    table_rows is empty when the records have no pressure data.
+    """
+    ms_axis, pressure_matrix = database.get_pressure_matrix(json_file, records)
+    ms_points = ms_axis.tolist()
+    if not ms_points or pressure_matrix.size == 0:
+        return TemperatureData(ms_points, pressure_matrix, [], [], [], [])
+
+    try:
+        limits = database.get_limits(
+            json_file, records[0]["version"], records[0]["order"], temp
+        )
+        max_dict = limits.get("maximums", {})
+        min_dict = limits.get("minimums", {})
+        limits_max = [max_dict.get(str(ms), np.nan) for ms in ms_points]
+        limits_min = [min_dict.get(str(ms), np.nan) for ms in ms_points]
+    except Exception:
+        limits_max = [np.nan] * len(ms_points)
+        limits_min = [np.nan] * len(ms_points)
+
+    with warnings.catch_warnings():
+        # Time points without any value give NaN
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mean = np.nanmean(pressure_matrix, axis=0)
+    # Cp/Cpk use the within-order sigma, so rows are grouped by order
+    stats = capability_stats(
+        pressure_matrix,
+        limits_max,
+        limits_min,
+        groups=[(r["version"], r["order"]) for r in records],
+    )
+    stat_rows = capability_rows(stats, len(config.PRESSURE_POINTS))
+
+    # Align the time points with the pressure point columns
+    ms_cells = [str(ms) for ms in ms_points[: len(config.PRESSURE_POINTS)]]
+    ms_cells += ["-"] * (len(config.PRESSURE_POINTS) - len(ms_cells))
+    table_rows = [
+        ("Time (ms)", ["Time (ms)"] + ms_cells),
+        ("Maximum (bar)", ["Maximum (bar)"] + format_row(limits_max)),
+        ("Mean (bar)", ["Mean (bar)"] + format_row(mean)),
+        ("Minimum (bar)", ["Minimum (bar)"] + format_row(limits_min)),
+    ] + stat_rows
+    return TemperatureData(
+        ms_points, pressure_matrix, limits_max, limits_min, mean, table_rows
+    )
+
+
+def build_report_data(json_file, records):
+    """Return the (data_by_temp, table_data, ms_points_dict) the exports take.
+
+    table_data holds the [RT, LT, HT] summary table rows.
+    """
+    data_by_temp, available_temps = group_by_temperature(records)
+    table_data = [[] for _ in config.TEMPERATURE_TYPES]
+    ms_points_dict = {}
+    for temp in available_temps:
+        data = temperature_data(json_file, temp, data_by_temp[temp])
+        ms_points_dict[temp] = [str(ms) for ms in data.ms_points]
+        if temp in config.TEMPERATURE_TYPES:
+            table_data[config.TEMPERATURE_TYPES.index(temp)] = data.table_rows
+    return data_by_temp, table_data, ms_points_dict
@@ -0,0 +1,309 @@
+"""
+PDF report of a selection, written page by page with PdfPages: a cover page
+with the orders, one page per temperature (curves and summary table) and an
+appendix with the curves and inflator values of every order. Each page is its
+own Figure that is saved and dropped before the next one is drawn, so memory
+stays bounded and the export time grows linearly with the report.
+"""
+
+from datetime import datetime
+import warnings
+import numpy as np
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+import config
+import database
+from plotting import plot_pressure_curves
+
+A4_PORTRAIT = (8.27, 11.69)
+PAGE_COLOR = "#fafafa"
+# Background of the summary table rows by label
+ROW_COLORS = {
+    "Time (ms)": "#f0f0f0",
+    "Maximum (bar)": "#ffcccc",
+    "Mean (bar)": "#7CE04A",
+    "Minimum (bar)": "#cce6ff",
+}
+HEADER_COLOR = "#dddddd"
+
+
+def format_value(value):
+    return "-" if value is None or np.isnan(value) else f"{value:.2f}"
+
+
+def chunks(rows, size):
+    """Split `rows` into lists of at most `size` rows (at least one list)."""
+    return [rows[i : i + size] for i in range(0, len(rows), size)] or [[]]
+
+
+def version_label(records):
+    versions = sorted(set(r["version"] for r in records))
+    return ", ".join(versions)
+
+
+def mean_curve(pressure_matrix):
+    """Mean of each column; columns without values give NaN without a warning."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanmean(pressure_matrix, axis=0)
+
+
+def limit_curves(json_file, records, temp, ms_points):
+    """Maximum and minimum limit curves of the first record's order."""
+    try:
+        limits = database.get_limits(
+            json_file, records[0]["version"], records[0]["order"], temp
+        )
+    except KeyError:
+        limits = {}
+    max_dict = limits.get("maximums", {})
+    min_dict = limits.get("minimums", {})
+    return (
+        [max_dict.get(str(ms), np.nan) for ms in ms_points],
+        [min_dict.get(str(ms), np.nan) for ms in ms_points],
+    )
+
+
+def draw_table(ax, header, rows, colors=None, fontsize=7, rows_per_page=None):
+    """Draw a table at the top of `ax`; row height is fixed by rows_per_page."""
+    ax.axis("off")
+    if not rows:
+        return
+    height = 1.0
+    if rows_per_page:
+        height = min(1.0, (len(rows) + 1) / (rows_per_page + 1))
+    table = ax.table(
+        cellText=rows,
+        colLabels=header,
+        cellColours=colors,
+        colColours=[HEADER_COLOR] * len(header),
+        cellLoc="center",
+        loc="upper center",
+        bbox=[0, 1 - height, 1, height],
+    )
+    table.auto_set_font_size(False)
+    table.set_fontsize(fontsize)
+
+
+def style_curve_axes(ax, title, fontsize=7, minor_grid=True):
+    ax.set_facecolor(PAGE_COLOR)
+    ax.set_title(title, fontsize=fontsize + 2, pad=5)
+    ax.set_xlabel("Time (ms)", fontsize=fontsize)
+    ax.set_ylabel("Pressure (bar)", fontsize=fontsize)
+    ax.legend(loc="lower right", fontsize=fontsize - 1)
+    ax.grid(True, color="#cccccc", linestyle="--", linewidth=0.5)
+    if minor_grid:
+        ax.minorticks_on()
+        ax.grid(True, which="minor", color="#e0e0e0", linestyle=":", linewidth=0.3)
+    ax.tick_params(axis="both", which="major", labelsize=fontsize - 1)
+
+
+class ReportPdf:
+    """Writes the report pages one at a time to a PdfPages file."""
+
+    def __init__(self, pdf, title):
+        self.pdf = pdf
+        self.title = title
+        self.generated = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.page_count = 0
+
+    def new_page(self, heading):
+        """Return a fresh A4 page with the report header and footer."""
+        self.page_count += 1
+        fig = Figure(figsize=A4_PORTRAIT, facecolor=PAGE_COLOR)
+        fig.text(0.5, 0.965, self.title, fontsize=12, ha="center", weight="bold")
+        fig.text(0.5, 0.945, heading, fontsize=9, ha="center")
+        fig.text(0.08, 0.025, f"Generated: {self.generated}", fontsize=7)
+        fig.text(0.92, 0.025, f"Page {self.page_count}", fontsize=7, ha="right")
+        return fig
+
+    def save(self, fig):
+        # Rasterized curve collections are embedded at this resolution
+        self.pdf.savefig(fig, dpi=config.PDF_RASTER_DPI)
+        fig.clear()
+
+
+def write_cover_pages(report, data_by_temp, orders):
+    records = [
+        r for temp in config.TEMPERATURE_TYPES for r in data_by_temp.get(temp, [])
+    ]
+    counts = {
+        temp: len(data_by_temp.get(temp, [])) for temp in config.TEMPERATURE_TYPES
+    }
+    summary = (
+        f"Version(s): {version_label(records)} | Total Inflators: {len(records)} | "
+        + ", ".join(f"{temp}={counts[temp]}" for temp in config.TEMPERATURE_TYPES)
+    )
+    rows = [
+        [order, version, test_date]
+        + [str(per_temp.get(temp, 0)) for temp in config.TEMPERATURE_TYPES]
+        for (version, order), (test_date, per_temp) in orders.items()
+    ]
+    rows_per_page = config.PDF_TABLE_ROWS_PER_PAGE
+    for page_rows in chunks(rows, rows_per_page):
+        fig = report.new_page(summary)
+        ax = fig.add_axes([0.08, 0.07, 0.84, 0.84])
+        draw_table(
+            ax,
+            ["Order", "Version", "Test Date"] + config.TEMPERATURE_TYPES,
+            page_rows,
+            fontsize=8,
+            rows_per_page=rows_per_page,
+        )
+        report.save(fig)
+
+
+def write_temperature_page(report, temp, records, table_rows, json_file):
+    ms_axis, pressure_matrix = database.get_pressure_matrix(json_file, records)
+    ms_points = ms_axis.tolist()
+    fig = report.new_page(
+        f"Temperature {temp} | Version: {version_label(records)} | "
+        f"Inflators: {len(records)}"
+    )
+    ax_graph = fig.add_axes([0.1, 0.5, 0.82, 0.4])
+    ax_table = fig.add_axes([0.1, 0.07, 0.82, 0.36])
+    if ms_points and pressure_matrix.size:
+        limits_max, limits_min = limit_curves(json_file, records, temp, ms_points)
+        plot_pressure_curves(
+            ax_graph,
+            ms_points,
+            pressure_matrix,
+            limits_max,
+            limits_min,
+            mean_curve(pressure_matrix),
+            limit_width=1.5,
+            mean_width=2,
+            rasterized=len(pressure_matrix) > config.PDF_VECTOR_CURVES_MAX,
+        )
+        style_curve_axes(ax_graph, f"Pressure Curves - Temperature {temp}", 8)
+    else:
+        ax_graph.axis("off")
+        ax_graph.text(
+            0.5, 0.5, "No pressure data available for this temperature.", ha="center"
+        )
+
+    rows = [values for _, values in table_rows]
+    colors = [
+        [ROW_COLORS.get(label, PAGE_COLOR)] * len(values)
+        for label, values in table_rows
+    ]
+    draw_table(ax_table, [""] + config.PRESSURE_POINTS, rows, colors, fontsize=8)
+    report.save(fig)
+
+
+def write_order_pages(report, version, order, test_date, blocks, ms_points_dict):
+    """Appendix pages of one order: its curves per temperature and inflator values.
+
+    `blocks` maps temperatures to (records, ms_points, pressure_matrix, limits).
+    """
+    heading = f"Appendix | Order {order} | Version: {version} | Test Date: {test_date}"
+    rows = []
+    for temp, (records, ms_points, matrix, _) in blocks.items():
+        column_of = {str(ms): col for col, ms in enumerate(ms_points)}
+        columns = [
+            column_of.get(ms)
+            for ms in ms_points_dict.get(temp, [])[: len(config.PRESSURE_POINTS)]
+        ]
+        for record, values in zip(records, matrix):
+            cells = [
+                format_value(None if col is None else values[col]) for col in columns
+            ]
+            cells += ["-"] * (len(config.PRESSURE_POINTS) - len(cells))
+            rows.append(
+                [temp, str(record["test_no"]), str(record["inflator_no"])] + cells
+            )
+
+    header = ["Temp", "Test No", "Inflator No"] + config.PRESSURE_POINTS
+    rows_per_page = config.PDF_TABLE_ROWS_PER_PAGE
+    # The first page shares its space with the graphs
+    first_rows = rows_per_page // 2
+    pages = [rows[:first_rows]] + chunks(rows[first_rows:], rows_per_page)
+    for page_no, page_rows in enumerate(pages):
+        if page_no and not page_rows:
+            break
+        fig = report.new_page(heading if page_no == 0 else f"{heading} (cont.)")
+        if page_no == 0:
+            n_graphs = max(1, len(blocks))
+            width = 0.84 / n_graphs
+            for position, (temp, block) in enumerate(blocks.items()):
+                records, ms_points, matrix, (limits_max, limits_min) = block
+                ax = fig.add_axes(
+                    [0.08 + position * width + 0.02, 0.6, width - 0.05, 0.3]
+                )
+                plot_pressure_curves(
+                    ax,
+                    ms_points,
+                    matrix,
+                    limits_max,
+                    limits_min,
+                    mean_curve(matrix),
+                    limit_width=1,
+                    mean_width=1.5,
+                    rasterized=len(matrix) > config.PDF_VECTOR_CURVES_MAX,
+                )
+                style_curve_axes(ax, f"{temp} | Inflators: {len(records)}", 5, False)
+            ax_table = fig.add_axes([0.08, 0.07, 0.84, 0.45])
+            draw_table(
+                ax_table, header, page_rows, fontsize=6, rows_per_page=first_rows
+            )
+        else:
+            ax_table = fig.add_axes([0.08, 0.07, 0.84, 0.84])
+            draw_table(
+                ax_table, header, page_rows, fontsize=6, rows_per_page=rows_per_page
+            )
+        report.save(fig)
+
+
+def write_report_pdf(data_by_temp, table_data, ms_points_dict, json_file, filename):
+    """Write the PDF report of the selected records to `filename`.
+
+    Takes the data_by_temp/table_data/ms_points_dict built by the report
+    window; table_data holds the [RT, LT, HT] summary table rows.
+    """
+    available_temps = [
+        temp for temp in config.TEMPERATURE_TYPES if data_by_temp.get(temp)
+    ]
+    if not available_temps:
+        raise ValueError("No temperature data to export")
+
+    # Orders in report order, with their inflator count per temperature and
+    # the positions of their records in each temperature's pressure matrix
+    orders = {}
+    positions = {}
+    for temp in available_temps:
+        for position, record in enumerate(data_by_temp[temp]):
+            key = (record["version"], record["order"])
+            test_date, per_temp = orders.setdefault(
+                key, (record.get("test_date", "N/A"), {})
+            )
+            per_temp[temp] = per_temp.get(temp, 0) + 1
+            positions.setdefault(key, {}).setdefault(temp, []).append(position)
+
+    with PdfPages(filename) as pdf:
+        report = ReportPdf(pdf, "Ballistic Tests Report")
+        write_cover_pages(report, data_by_temp, orders)
+        for temp in available_temps:
+            table_rows = table_data[config.TEMPERATURE_TYPES.index(temp)]
+            write_temperature_page(
+                report, temp, data_by_temp[temp], table_rows, json_file
+            )
+
+        if not config.PDF_ORDER_APPENDIX:
+            return
+        matrices = {
+            temp: database.get_pressure_matrix(json_file, data_by_temp[temp])
+            for temp in available_temps
+        }
+        for (version, order), (test_date, _) in orders.items():
+            blocks = {}
+            for temp, rows in positions[(version, order)].items():
+                records = [data_by_temp[temp][position] for position in rows]
+                ms_axis, matrix = matrices[temp]
+                ms_points = ms_axis.tolist()
+                blocks[temp] = (
+                    records,
+                    ms_points,
+                    matrix[rows],
+                    limit_curves(json_file, records, temp, ms_points),
+                )
+            write_order_pages(report, version, order, test_date, blocks, ms_points_dict)
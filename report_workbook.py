@@ -0,0 +1,182 @@
+"""
+Excel workbook of a report (one sheet per temperature with the summary table
+and the raw inflator values). Written through a write-only workbook with
+named styles and precomputed column widths; pressures are stored as numbers
+with a two-decimal format so the sheets stay usable for further analysis.
+"""
+
+import numpy as np
+from openpyxl import Workbook
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.styles.fonts import DEFAULT_FONT
+from openpyxl.utils import get_column_letter
+import config
+import database
+from database_workbook import cell_writer
+
+NUMBER_FORMAT = "0.00"
+MAX_COLUMN_WIDTH = 50
+# Fill of the summary table rows by label; other rows have none
+ROW_FILLS = {
+    "Time (ms)": "F0F0F0",
+    "Maximum (bar)": "FFCCCC",
+    "Mean (bar)": "7CE04A",
+    "Minimum (bar)": "CCE6FF",
+}
+
+
+def add_report_styles(wb):
+    """Register the report styles; returns {name: style array} for cell_writer.
+
+    Every cell style has a "<name>_number" twin with the two-decimal format.
+    """
+    alignment = Alignment(horizontal="center", vertical="center")
+    side = Side(style="thin")
+    border = Border(left=side, right=side, top=side, bottom=side)
+    fills = {"cell": None}
+    for label, color in ROW_FILLS.items():
+        fills[label] = PatternFill(
+            start_color=color, end_color=color, fill_type="solid"
+        )
+
+    specs = [("bold", Font(bold=True), None)]
+    specs += [(name, DEFAULT_FONT, fill) for name, fill in fills.items()]
+    style_arrays = {}
+    for name, font, fill in specs:
+        for suffix, number_format in (("", "General"), ("_number", NUMBER_FORMAT)):
+            style = NamedStyle(name=f"report_{name}{suffix}")
+            style.font = font
+            if fill is not None:
+                style.fill = fill
+            style.border = border
+            style.alignment = alignment
+            style.number_format = number_format
+            wb.add_named_style(style)
+            style_arrays[f"{name}{suffix}"] = style.as_tuple()
+    return style_arrays
+
+
+def to_number(text):
+    """Turn a report table string ("12", "1.23") into a number; "-" stays text."""
+    try:
+        return int(text)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return text
+
+
+def display_length(value):
+    """Characters a value takes in the sheet (floats shown with two decimals)."""
+    if isinstance(value, float):
+        return len(f"{value:.2f}")
+    return len(str(value))
+
+
+def write_temperature_sheet(
+    wb, styles, temp, records, table_rows, ms_points, json_file
+):
+    ws = wb.create_sheet(title=temp)
+    styled = cell_writer(ws, styles)
+
+    def number_cell(value, style):
+        if isinstance(value, float):
+            return styled(value, f"{style}_number")
+        return styled(value, style)
+
+    versions = set(r["version"] for r in records)
+    version = ", ".join(versions) if len(versions) > 1 else list(versions)[0]
+    info_rows = [
+        ["Temperature", temp],
+        ["Version", version],
+        ["Total Inflators", len(records)],
+    ]
+    table_rows = [
+        (label, [row[0]] + [to_number(value) for value in row[1:]])
+        for label, row in table_rows
+    ]
+
+    # Same cached matrix as the report window; "-" columns have no data
+    ms_axis, pressure_matrix = database.get_pressure_matrix(json_file, records)
+    column_of = {str(ms): col for col, ms in enumerate(ms_axis.tolist())}
+    columns = [column_of.get(ms) for ms in ms_points[: len(config.PRESSURE_POINTS)]]
+    has_data = ~np.all(np.isnan(pressure_matrix), axis=1)
+    values = np.full((len(pressure_matrix), len(columns)), np.nan)
+    for position, col in enumerate(columns):
+        if col is not None:
+            values[:, position] = pressure_matrix[:, col]
+    inflator_rows = [
+        (str(r["inflator_no"]), row)
+        for r, row, row_has_data in zip(records, values.tolist(), has_data)
+        if row_has_data
+    ]
+
+    # Column widths, as the longest displayed value of each column
+    lengths = {}
+    layout_rows = info_rows + [
+        [""] + config.PRESSURE_POINTS,
+        ["Inflator No"] + config.PRESSURE_POINTS,
+    ]
+    layout_rows += [row for _, row in table_rows] + [["Inflator Data"]]
+    if inflator_rows:
+        layout_rows.append([max((no for no, _ in inflator_rows), key=len)])
+        with np.errstate(all="ignore"):
+            for extreme in (np.nanmax(values, axis=0), np.nanmin(values, axis=0)):
+                layout_rows.append([""] + [float(v) for v in extreme])
+    for row in layout_rows:
+        for col_idx, value in enumerate(row, 1):
+            if value != "" and not (isinstance(value, float) and np.isnan(value)):
+                lengths[col_idx] = max(lengths.get(col_idx, 0), display_length(value))
+    for col_idx, length in lengths.items():
+        ws.column_dimensions[get_column_letter(col_idx)].width = min(
+            length * 1.2, MAX_COLUMN_WIDTH
+        )
+
+    for row in info_rows:
+        ws.append([styled(value, "bold") for value in row])
+    ws.append([])
+    ws.append([styled(value, "bold") for value in [""] + config.PRESSURE_POINTS])
+    for label, row in table_rows:
+        style = label if label in ROW_FILLS else "cell"
+        ws.append([number_cell(value, style) for value in row])
+
+    ws.append([])
+    ws.append(["Inflator Data"])
+    ws.append(
+        [styled(value, "bold") for value in ["Inflator No"] + config.PRESSURE_POINTS]
+    )
+    for inflator_no, row in inflator_rows:
+        ws.append(
+            [styled(inflator_no, "cell")]
+            + [
+                styled("-", "cell") if np.isnan(v) else styled(v, "cell_number")
+                for v in row
+            ]
+        )
+
+
+def write_report_workbook(
+    data_by_temp, table_data, ms_points_dict, json_file, filename
+):
+    """Write the report of the selected records to `filename`.
+
+    Takes the data_by_temp/table_data/ms_points_dict built by the report
+    window; table_data holds the [RT, LT, HT] summary table rows.
+    """
+    wb = Workbook(write_only=True)
+    styles = add_report_styles(wb)
+    for idx, temp in enumerate(config.TEMPERATURE_TYPES):
+        if temp not in data_by_temp:
+            continue
+        write_temperature_sheet(
+            wb,
+            styles,
+            temp,
+            data_by_temp[temp],
+            table_data[idx],
+            ms_points_dict.get(temp, []),
+            json_file,
+        )
+    wb.save(filename)
@@ -0,0 +1,123 @@
+"""
+Inverted index for the Orders Manager search box.
+Maps order numbers, production orders, propellant lots, test numbers and
+inflator numbers to the (version, order, temperature) they belong to. Terms
+are kept sorted, so a prefix search is a binary search plus a short scan;
+orders that changed are re-indexed on the next search instead of rebuilding.
+"""
+
+import bisect
+import heapq
+
+# Changes touching fewer entries than this are applied with insort/delete;
+# larger batches (e.g. a folder sync) rebuild the list with one merge
+INSORT_MAX_ENTRIES = 2000
+
+
+def normalize_term(value):
+    """Return the searchable form of a value, or None if it is empty."""
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    term = str(value).strip().casefold()
+    return term or None
+
+
+def order_entries(version, order, summary):
+    """Return the sorted (term, field, version, order, temp_type) entries of an order.
+
+    `summary` is the dict from the database's get_test_summary; metadata
+    entries have an empty temp_type.
+    """
+    entries = set()
+
+    def add(field, value, temp_type=""):
+        term = normalize_term(value)
+        if term is not None:
+            entries.add((term, field, version, order, temp_type))
+
+    add("order", order)
+    metadata = summary.get("metadata", {})
+    add("production_order", metadata.get("production_order"))
+    add("propellant_lot_number", metadata.get("propellant_lot_number"))
+    for temp_type, temp_data in summary.get("temperatures", {}).items():
+        for test in temp_data.get("tests", []):
+            add("test_no", test.get("test_no"), temp_type)
+            add("inflator_no", test.get("inflator_no"), temp_type)
+        for inflator_no in temp_data.get("pressure_inflators", ()):
+            add("inflator_no", inflator_no, temp_type)
+    return sorted(entries)
+
+
+class SearchIndex:
+    """Sorted term entries of every order, with lazy per-order updates."""
+
+    def __init__(self):
+        self._entries = []
+        self._by_order = {}
+        self._stale = set()
+
+    @classmethod
+    def build(cls, orders, get_summary):
+        """Index the (version, order) keys in `orders` using get_summary."""
+        index = cls()
+        for version, order in orders:
+            summary = get_summary(version, order)
+            if summary is not None:
+                index._by_order[(version, order)] = order_entries(
+                    version, order, summary
+                )
+        index._entries = sorted(
+            entry for entries in index._by_order.values() for entry in entries
+        )
+        return index
+
+    def __len__(self):
+        return len(self._entries)
+
+    def mark_stale(self, version, order):
+        """Re-index this order (or drop it, if removed) before the next search."""
+        self._stale.add((version, order))
+
+    def refresh(self, get_summary):
+        """Re-index the orders marked stale since the last refresh."""
+        if not self._stale:
+            return
+        stale, self._stale = self._stale, set()
+        removed = []
+        added = []
+        for key in stale:
+            removed.extend(self._by_order.pop(key, []))
+            summary = get_summary(*key)
+            if summary is not None:
+                entries = order_entries(key[0], key[1], summary)
+                self._by_order[key] = entries
+                added.extend(entries)
+
+        if len(removed) + len(added) <= INSORT_MAX_ENTRIES:
+            for entry in removed:
+                pos = bisect.bisect_left(self._entries, entry)
+                if pos < len(self._entries) and self._entries[pos] == entry:
+                    del self._entries[pos]
+            for entry in added:
+                bisect.insort(self._entries, entry)
+        else:
+            kept = [
+                entry for entry in self._entries if (entry[2], entry[3]) not in stale
+            ]
+            self._entries = list(heapq.merge(kept, sorted(added)))
+
+    def search(self, text, limit=None):
+        """Return the entries whose term starts with `text`, in term order."""
+        prefix = normalize_term(text)
+        if prefix is None:
+            return []
+        results = []
+        pos = bisect.bisect_left(self._entries, (prefix,))
+        while pos < len(self._entries) and self._entries[pos][0].startswith(prefix):
+            results.append(self._entries[pos])
+            if limit is not None and len(results) >= limit:
+                break
+            pos += 1
+        return results
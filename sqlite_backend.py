@@ -0,0 +1,529 @@
+"""
+SQLite storage backend for the Ballistic Tests Database application.
+Stores the version -> order -> temperature -> tests/pressure_data/limits tree
+in indexed relational tables and implements the same interface as
+database.Database, so it can be selected with config.STORAGE_BACKEND.
+
+Run this module directly to migrate Data.json into Data.sqlite:
+    python sqlite_backend.py [Data.json] [Data.sqlite]
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+import numpy as np
+import config
+from curve_store import CurveBlock
+from order_index import UNDATED_ORDINAL, date_ordinal
+from search_index import SearchIndex
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    id INTEGER PRIMARY KEY,
+    version TEXT NOT NULL,
+    order_no TEXT NOT NULL,
+    production_order TEXT,
+    propellant_lot_number TEXT,
+    test_date TEXT,
+    date_ordinal INTEGER NOT NULL,
+    UNIQUE (version, order_no)
+);
+CREATE INDEX IF NOT EXISTS idx_orders_date ON orders (date_ordinal, version, order_no);
+CREATE INDEX IF NOT EXISTS idx_orders_version_date
+    ON orders (version, date_ordinal, order_no);
+CREATE INDEX IF NOT EXISTS idx_orders_order_no ON orders (order_no);
+
+CREATE TABLE IF NOT EXISTS temperatures (
+    id INTEGER PRIMARY KEY,
+    order_id INTEGER NOT NULL REFERENCES orders (id) ON DELETE CASCADE,
+    temp_type TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    temperature_c REAL,
+    has_pressure_data INTEGER NOT NULL DEFAULT 0,
+    has_limits INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (order_id, temp_type)
+);
+
+CREATE TABLE IF NOT EXISTS tests (
+    temperature_id INTEGER NOT NULL REFERENCES temperatures (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    test_no INTEGER,
+    inflator_no INTEGER,
+    PRIMARY KEY (temperature_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_tests_test_no ON tests (test_no);
+CREATE INDEX IF NOT EXISTS idx_tests_inflator_no ON tests (inflator_no);
+
+CREATE TABLE IF NOT EXISTS limits (
+    temperature_id INTEGER NOT NULL REFERENCES temperatures (id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    ms INTEGER NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (temperature_id, kind, ms)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS pressure_samples (
+    temperature_id INTEGER NOT NULL REFERENCES temperatures (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    inflator_no INTEGER,
+    ms INTEGER NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (temperature_id, position, ms)
+) WITHOUT ROWID;
+"""
+
+LIMIT_KINDS = {"maximums": "max", "minimums": "min"}
+
+ORDER_SORT = "date_ordinal DESC, version, order_no"
+
+
+def sqlite_path(json_file):
+    """Location of the SQLite database that replaces a JSON database."""
+    base_dir = os.path.dirname(json_file) or "."
+    return os.path.join(base_dir, config.SQLITE_FILE)
+
+
+class SqlOrderSelection:
+    """Orders matching a filter, counted and paged with indexed queries."""
+
+    def __init__(self, conn, where, params):
+        self._conn = conn
+        self._where = where
+        self._params = params
+
+    def __len__(self):
+        query = f"SELECT COUNT(*) FROM orders {self._where}"
+        return self._conn.execute(query, self._params).fetchone()[0]
+
+    def __iter__(self):
+        return iter(self.page(0, None))
+
+    def page(self, offset, limit):
+        query = (
+            f"SELECT version, order_no, test_date FROM orders {self._where} "
+            f"ORDER BY {ORDER_SORT} LIMIT ? OFFSET ?"
+        )
+        params = list(self._params) + [-1 if limit is None else limit, max(0, offset)]
+        return [tuple(row) for row in self._conn.execute(query, params)]
+
+
+class SqliteDatabase:
+    """Database backend storing the data model in SQLite tables.
+
+    Writes happen inside a transaction that save() commits and invalidate()
+    rolls back, mirroring how database.Database persists or discards its
+    in-memory changes.
+    """
+
+    def __init__(self, json_file, sqlite_file=None, auto_migrate=True):
+        self.json_file = json_file
+        self.storage_file = sqlite_file or sqlite_path(json_file)
+        is_new = not os.path.exists(self.storage_file)
+        self.lock = threading.RLock()
+        # Shared with the ingestion thread; callers serialize access with `lock`
+        self.conn = sqlite3.connect(self.storage_file, check_same_thread=False)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA)
+        self._curves = {}
+        self._tree = None
+        self._search = None
+        self._revision = 0
+        self._order_revisions = {}
+        self._base_revision = 0
+        self._data_version = None
+        if auto_migrate and is_new and os.path.exists(json_file):
+            migrate_json_to_sqlite(json_file, self)
+
+    # Queries
+
+    def exists(self):
+        return os.path.exists(self.storage_file)
+
+    def _order_id(self, version, order):
+        row = self.conn.execute(
+            "SELECT id FROM orders WHERE version = ? AND order_no = ?",
+            (version, order),
+        ).fetchone()
+        return row[0] if row else None
+
+    def has_order(self, version, order):
+        return self._order_id(version, order) is not None
+
+    def versions(self):
+        rows = self.conn.execute("SELECT DISTINCT version FROM orders ORDER BY version")
+        return [row[0] for row in rows]
+
+    def select_orders(self, version=None, start_date=None, end_date=None):
+        clauses = []
+        params = []
+        if version and version.lower() != "all":
+            clauses.append("version = ?")
+            params.append(version)
+        if start_date is not None:
+            clauses.append("date_ordinal >= ?")
+            params.append(start_date.toordinal())
+            if end_date is not None:
+                clauses.append("date_ordinal <= ?")
+                params.append(end_date.toordinal())
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return SqlOrderSelection(self.conn, where, params)
+
+    def get_order(self, version, order):
+        row = self.conn.execute(
+            "SELECT id, production_order, propellant_lot_number, test_date "
+            "FROM orders WHERE version = ? AND order_no = ?",
+            (version, order),
+        ).fetchone()
+        if row is None:
+            return None
+        order_id, production_order, propellant_lot_number, test_date = row
+        temperatures = {}
+        for temp_row in self.conn.execute(
+            "SELECT id, temp_type, temperature_c, has_pressure_data, has_limits "
+            "FROM temperatures WHERE order_id = ? ORDER BY position",
+            (order_id,),
+        ).fetchall():
+            temperatures[temp_row[1]] = self._temperature_dict(
+                *temp_row[:1], *temp_row[2:]
+            )
+        return {
+            "metadata": {
+                "production_order": production_order,
+                "propellant_lot_number": propellant_lot_number,
+                "test_date": test_date,
+            },
+            "temperatures": temperatures,
+        }
+
+    def search(self, text, limit=None):
+        """Prefix search over order, lot, test and inflator numbers."""
+        self._check_external_changes()
+        if self._search is None:
+            self._search = SearchIndex.build(
+                self.conn.execute("SELECT version, order_no FROM orders").fetchall(),
+                self.get_test_summary,
+            )
+        self._search.refresh(self.get_test_summary)
+        return self._search.search(text, limit)
+
+    def get_test_summary(self, version, order):
+        """Return an order's tests without its curves (see Database)."""
+        row = self.conn.execute(
+            "SELECT id, production_order, propellant_lot_number, test_date "
+            "FROM orders WHERE version = ? AND order_no = ?",
+            (version, order),
+        ).fetchone()
+        if row is None:
+            return None
+        temperatures = {}
+        for temp_id, temp_type, temperature_c in self.conn.execute(
+            "SELECT id, temp_type, temperature_c FROM temperatures "
+            "WHERE order_id = ? ORDER BY position",
+            (row[0],),
+        ).fetchall():
+            temperatures[temp_type] = {
+                "temperature_c": temperature_c,
+                "tests": [
+                    {"test_no": test_no, "inflator_no": inflator_no}
+                    for test_no, inflator_no in self.conn.execute(
+                        "SELECT test_no, inflator_no FROM tests "
+                        "WHERE temperature_id = ? ORDER BY position",
+                        (temp_id,),
+                    )
+                ],
+                "pressure_inflators": {
+                    inflator_no
+                    for (inflator_no,) in self.conn.execute(
+                        "SELECT DISTINCT inflator_no FROM pressure_samples "
+                        "WHERE temperature_id = ?",
+                        (temp_id,),
+                    )
+                },
+            }
+        return {
+            "metadata": {
+                "production_order": row[1],
+                "propellant_lot_number": row[2],
+                "test_date": row[3],
+            },
+            "temperatures": temperatures,
+        }
+
+    def _temperature_dict(self, temp_id, temperature_c, has_pressure_data, has_limits):
+        temp_data = {
+            "temperature_c": temperature_c,
+            "tests": [
+                {"test_no": test_no, "inflator_no": inflator_no}
+                for test_no, inflator_no in self.conn.execute(
+                    "SELECT test_no, inflator_no FROM tests "
+                    "WHERE temperature_id = ? ORDER BY position",
+                    (temp_id,),
+                )
+            ],
+        }
+        if has_pressure_data:
+            pressure_data = []
+            current = None
+            for position, inflator_no, ms, value in self.conn.execute(
+                "SELECT position, inflator_no, ms, value FROM pressure_samples "
+                "WHERE temperature_id = ? ORDER BY position, ms",
+                (temp_id,),
+            ):
+                if current is None or current[0] != position:
+                    current = (position, {"inflator_no": inflator_no, "pressures": {}})
+                    pressure_data.append(current[1])
+                current[1]["pressures"][str(ms)] = value
+            temp_data["pressure_data"] = pressure_data
+        if has_limits:
+            limits = {"maximums": {}, "minimums": {}}
+            kind_names = {kind: name for name, kind in LIMIT_KINDS.items()}
+            for kind, ms, value in self.conn.execute(
+                "SELECT kind, ms, value FROM limits WHERE temperature_id = ? "
+                "ORDER BY kind, ms",
+                (temp_id,),
+            ):
+                limits[kind_names[kind]][str(ms)] = value
+            temp_data["limits"] = limits
+        return temp_data
+
+    def _temperature_row(self, version, order, temp_type):
+        return self.conn.execute(
+            "SELECT t.id, t.temperature_c, t.has_pressure_data, t.has_limits "
+            "FROM temperatures t JOIN orders o ON o.id = t.order_id "
+            "WHERE o.version = ? AND o.order_no = ? AND t.temp_type = ?",
+            (version, order, temp_type),
+        ).fetchone()
+
+    def get_temperature(self, version, order, temp_type):
+        row = self._temperature_row(version, order, temp_type)
+        if row is None:
+            return None
+        return self._temperature_dict(*row)
+
+    def get_curves(self, version, order, temp_type):
+        """Return the CurveBlock of one temperature block, or None if absent."""
+        self._check_external_changes()
+        key = (version, order, temp_type)
+        if key in self._curves:
+            return self._curves[key]
+        row = self._temperature_row(version, order, temp_type)
+        if row is None:
+            return None
+        samples = self.conn.execute(
+            "SELECT position, inflator_no, ms, value FROM pressure_samples "
+            "WHERE temperature_id = ? ORDER BY position, ms",
+            (row[0],),
+        ).fetchall()
+        if samples:
+            columns = np.array(samples, dtype=np.float64)
+            positions, rows = np.unique(columns[:, 0], return_inverse=True)
+            ms_axis, cols = np.unique(
+                columns[:, 2].astype(np.int32), return_inverse=True
+            )
+            matrix = np.full((len(positions), len(ms_axis)), np.nan, dtype=np.float64)
+            matrix[rows, cols] = columns[:, 3]
+            first = np.searchsorted(columns[:, 0], positions)
+            inflator_nos = np.array([samples[i][1] for i in first], dtype=np.int64)
+        else:
+            ms_axis = np.array([], dtype=np.int32)
+            inflator_nos = np.array([], dtype=np.int64)
+            matrix = np.empty((0, 0), dtype=np.float64)
+        block = CurveBlock(ms_axis, inflator_nos, matrix)
+        self._curves[key] = block
+        return block
+
+    def load(self):
+        """Return the whole database as a nested dict (used by full exports)."""
+        self._check_external_changes()
+        if self._tree is None:
+            tree = {}
+            for version, order in self.conn.execute(
+                "SELECT version, order_no FROM orders ORDER BY version, id"
+            ).fetchall():
+                tree.setdefault(version, {})[order] = self.get_order(version, order)
+            self._tree = tree
+        return self._tree
+
+    # Mutations
+
+    def _check_external_changes(self):
+        # PRAGMA data_version only moves on commits by other connections
+        data_version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version != self._data_version:
+            self._data_version = data_version
+            self._changed()
+
+    def revision(self):
+        """Return a counter that changes whenever the data changes."""
+        self._check_external_changes()
+        return self._revision
+
+    def order_revision(self, version, order):
+        """Like revision(), but only changes when this order changes."""
+        self._check_external_changes()
+        return self._order_revisions.get((version, order), self._base_revision)
+
+    def _changed(self, keys=None):
+        """Drop cached results; `keys` limits the change to some orders."""
+        self._revision += 1
+        if keys is None:
+            self._order_revisions = {}
+            self._base_revision = self._revision
+            self._search = None
+        else:
+            for key in keys:
+                self._order_revisions[key] = self._revision
+                if self._search is not None:
+                    self._search.mark_stale(*key)
+        self._tree = None
+        self._curves = {}
+
+    def merge(self, partial):
+        """Merge a partial dict from parse_excel (same rules as merge_partial)."""
+        merged = []
+        for version, orders in partial.items():
+            for order, details in orders.items():
+                order_id = self._order_id(version, order)
+                is_new = order_id is None
+                if is_new:
+                    metadata = details["metadata"]
+                    test_date = metadata.get("test_date", "0000-00-00")
+                    ordinal = date_ordinal(test_date) or UNDATED_ORDINAL
+                    order_id = self.conn.execute(
+                        "INSERT INTO orders (version, order_no, production_order, "
+                        "propellant_lot_number, test_date, date_ordinal) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (
+                            version,
+                            order,
+                            metadata.get("production_order"),
+                            metadata.get("propellant_lot_number"),
+                            test_date,
+                            ordinal,
+                        ),
+                    ).lastrowid
+                for temp_type, temp_data in details["temperatures"].items():
+                    self._merge_temperature(order_id, temp_type, temp_data)
+                temp_types = None if is_new else list(details["temperatures"])
+                merged.append((version, order, temp_types))
+        self._changed([(version, order) for version, order, _ in merged])
+        return merged
+
+    def _merge_temperature(self, order_id, temp_type, temp_data):
+        row = self.conn.execute(
+            "SELECT id FROM temperatures WHERE order_id = ? AND temp_type = ?",
+            (order_id, temp_type),
+        ).fetchone()
+        if row is None:
+            position = self.conn.execute(
+                "SELECT COUNT(*) FROM temperatures WHERE order_id = ?", (order_id,)
+            ).fetchone()[0]
+            temp_id = self.conn.execute(
+                "INSERT INTO temperatures (order_id, temp_type, position, temperature_c) "
+                "VALUES (?, ?, ?, ?)",
+                (order_id, temp_type, position, temp_data["temperature_c"]),
+            ).lastrowid
+        else:
+            temp_id = row[0]
+
+        if "tests" in temp_data:
+            self.conn.execute("DELETE FROM tests WHERE temperature_id = ?", (temp_id,))
+            self.conn.executemany(
+                "INSERT INTO tests VALUES (?, ?, ?, ?)",
+                [
+                    (temp_id, position, test["test_no"], test["inflator_no"])
+                    for position, test in enumerate(temp_data["tests"])
+                ],
+            )
+        if "pressure_data" in temp_data:
+            self.conn.execute(
+                "DELETE FROM pressure_samples WHERE temperature_id = ?", (temp_id,)
+            )
+            self.conn.executemany(
+                "INSERT INTO pressure_samples VALUES (?, ?, ?, ?, ?)",
+                [
+                    (temp_id, position, item["inflator_no"], int(ms), value)
+                    for position, item in enumerate(temp_data["pressure_data"])
+                    for ms, value in item["pressures"].items()
+                ],
+            )
+            self.conn.execute(
+                "UPDATE temperatures SET has_pressure_data = 1 WHERE id = ?", (temp_id,)
+            )
+        if "limits" in temp_data:
+            self.conn.execute("DELETE FROM limits WHERE temperature_id = ?", (temp_id,))
+            self.conn.executemany(
+                "INSERT INTO limits VALUES (?, ?, ?, ?)",
+                [
+                    (temp_id, kind, int(ms), value)
+                    for name, kind in LIMIT_KINDS.items()
+                    for ms, value in temp_data["limits"].get(name, {}).items()
+                ],
+            )
+            self.conn.execute(
+                "UPDATE temperatures SET has_limits = 1 WHERE id = ?", (temp_id,)
+            )
+
+    def remove_orders(self, orders_to_remove):
+        """Remove orders by number from every version; returns the removed numbers."""
+        placeholders = ", ".join("?" for _ in orders_to_remove)
+        rows = self.conn.execute(
+            f"SELECT id, version, order_no FROM orders "
+            f"WHERE order_no IN ({placeholders}) ORDER BY version, id",
+            list(orders_to_remove),
+        ).fetchall()
+        self.conn.executemany(
+            "DELETE FROM orders WHERE id = ?", [(row[0],) for row in rows]
+        )
+        self._changed([(row[1], row[2]) for row in rows])
+        return [row[2] for row in rows]
+
+    def save(self):
+        """Commit the pending transaction."""
+        self.conn.commit()
+
+    def invalidate(self):
+        """Roll back uncommitted changes and drop cached results."""
+        self.conn.rollback()
+        self._changed()
+
+    def compact(self):
+        self.conn.commit()
+        self.conn.execute("VACUUM")
+
+    def snapshot_file(self):
+        self.conn.commit()
+        return self.storage_file
+
+
+def migrate_json_to_sqlite(json_file, target):
+    """One-shot import of a JSON database into a SQLite backend.
+
+    `target` is a SqliteDatabase or the path of the SQLite file to create.
+    Returns the number of migrated orders.
+    """
+    # Imported here because database imports this module to select the backend
+    from database import Database
+
+    if not isinstance(target, SqliteDatabase):
+        target = SqliteDatabase(json_file, target, auto_migrate=False)
+    # Database.load() also replays pending journal entries
+    data = Database(json_file).load()
+
+    count = 0
+    for version, orders in data.items():
+        for order, details in orders.items():
+            if target.has_order(version, order):
+                continue
+            target.merge({version: {order: details}})
+            count += 1
+    target.save()
+    print(f"Migrated {count} orders from {json_file} to {target.storage_file}")
+    return count
+
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else config.JSON_FILE
+    destination = sys.argv[2] if len(sys.argv) > 2 else sqlite_path(source)
+    migrate_json_to_sqlite(source, destination)
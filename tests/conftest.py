@@ -0,0 +1,53 @@
+import os
+import random
+import sys
+from datetime import datetime
+import pytest
+
+# The application modules live at the top level of the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Time points (ms) of the generated Grafik sheets
+GRAFIK_MS = [3, 6, 10, 16, 24, 57]
+
+
+def write_workbook(path, order, version="V124", inflators=6, seed=0):
+    """Write an evaluation workbook in the layout process_excel reads.
+
+    One Datenblatt and one Grafik sheet per temperature; `seed` varies the
+    test numbers and pressures, so two seeds give different content.
+    """
+    from openpyxl import Workbook
+
+    rnd = random.Random(seed)
+    wb = Workbook()
+    wb.remove(wb.active)
+    for label, temperature in (("RT", 23.0), ("minus", -35.0), ("plus", 85.0)):
+        datenblatt = wb.create_sheet(f"Datenblatt {label}")
+        datenblatt["U1"] = f"GGX {version}"
+        datenblatt["J3"] = "1000018000"
+        datenblatt["J4"] = order
+        datenblatt["S3"] = "0741429701"
+        datenblatt["C4"] = datetime(2025, 5, 1)
+        datenblatt["C10"] = temperature
+        for row in range(inflators):
+            datenblatt.cell(
+                row=11 + row, column=1, value=202381000000 + seed * 100 + row
+            )
+            datenblatt.cell(
+                row=11 + row, column=2, value=233249200000 + seed * 100 + row
+            )
+        grafik = wb.create_sheet(f"Grafik {label}")
+        for ms in GRAFIK_MS:
+            grafik.cell(row=51, column=ms + 2, value=ms * 0.03)
+            grafik.cell(row=55, column=ms + 2, value=ms * 0.06 + 0.3)
+            for row in range(inflators):
+                value = ms * 0.045 + rnd.gauss(0, 0.05)
+                grafik.cell(row=60 + row, column=ms + 2, value=value)
+    wb.save(path)
+    return path
+
+
+@pytest.fixture
+def make_workbook():
+    return write_workbook
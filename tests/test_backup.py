@@ -0,0 +1,195 @@
+import json
+import os
+from datetime import datetime, timedelta
+import pytest
+import backup
+import config
+import database
+
+
+def touch_backups(folder, timestamps, incremental=()):
+    for timestamp in timestamps:
+        suffix = ".incr.json.gz" if timestamp in incremental else ".json.gz"
+        name = f"Data_{timestamp:%Y%m%d_%H%M%S}{suffix}"
+        with open(os.path.join(folder, name), "wb"):
+            pass
+
+
+def names(folder):
+    return [name for _, _, name in backup.list_backups(folder)]
+
+
+@pytest.fixture
+def retention(monkeypatch):
+    def set_retention(daily, weekly, monthly):
+        monkeypatch.setattr(config, "BACKUP_KEEP_DAILY", daily)
+        monkeypatch.setattr(config, "BACKUP_KEEP_WEEKLY", weekly)
+        monkeypatch.setattr(config, "BACKUP_KEEP_MONTHLY", monthly)
+
+    return set_retention
+
+
+def test_list_backups_sorts_and_skips_other_files(tmp_path):
+    for name in [
+        "Data_20250102_080000.json.gz",
+        "Data_20250101_080000.incr.json.gz",
+        "Data_20250715_104720.json",
+        "Data_20250103_080000.sqlite.gz",
+        "Data_20250104_080000.json.gz.tmp",
+        "Backup_Manifest.json",
+    ]:
+        (tmp_path / name).touch()
+    assert backup.list_backups(str(tmp_path)) == [
+        (datetime(2025, 1, 1, 8), True, "Data_20250101_080000.incr.json.gz"),
+        (datetime(2025, 1, 2, 8), False, "Data_20250102_080000.json.gz"),
+        (datetime(2025, 1, 3, 8), False, "Data_20250103_080000.sqlite.gz"),
+        (datetime(2025, 7, 15, 10, 47, 20), False, "Data_20250715_104720.json"),
+    ]
+
+
+def test_rotation_keeps_the_newest_daily_backups(tmp_path, retention):
+    retention(3, 0, 0)
+    start = datetime(2025, 3, 1, 9)
+    touch_backups(str(tmp_path), [start + timedelta(days=day) for day in range(10)])
+    removed = backup.rotate_backups(str(tmp_path))
+    assert len(removed) == 7
+    assert names(str(tmp_path)) == [
+        "Data_20250308_090000.json.gz",
+        "Data_20250309_090000.json.gz",
+        "Data_20250310_090000.json.gz",
+    ]
+
+
+def test_rotation_keeps_daily_weekly_and_monthly_backups(tmp_path, retention):
+    retention(7, 4, 12)
+    start = datetime(2024, 1, 1, 9)
+    timestamps = [start + timedelta(days=day) for day in range(500)]
+    # Two backups on some days: only the later one counts for that day
+    timestamps += [start + timedelta(days=day, hours=5) for day in range(0, 500, 9)]
+    touch_backups(str(tmp_path), timestamps)
+    backup.rotate_backups(str(tmp_path))
+
+    newest = {}
+    for timestamp in sorted(timestamps):
+        for period in (
+            ("day", timestamp.date()),
+            ("week", timestamp.isocalendar()[:2]),
+            ("month", (timestamp.year, timestamp.month)),
+        ):
+            newest[period] = timestamp
+    expected = set()
+    for kind, count in (("day", 7), ("week", 4), ("month", 12)):
+        periods = sorted(period for period in newest if period[0] == kind)
+        expected.update(newest[period] for period in periods[-count:])
+    assert names(str(tmp_path)) == [
+        f"Data_{timestamp:%Y%m%d_%H%M%S}.json.gz" for timestamp in sorted(expected)
+    ]
+    # Reruns leave the retained backups alone
+    assert backup.rotate_backups(str(tmp_path)) == []
+
+
+def test_backup_chains():
+    backups = [
+        (datetime(2025, 1, 1), True, "orphan"),
+        (datetime(2025, 1, 2), False, "full1"),
+        (datetime(2025, 1, 3), True, "incr1"),
+        (datetime(2025, 1, 4), True, "incr2"),
+        (datetime(2025, 1, 5), False, "full2"),
+        (datetime(2025, 1, 6), True, "incr3"),
+    ]
+    chains = backup.backup_chains(backups)
+    assert chains["orphan"] == ["orphan"]
+    assert chains["incr2"] == ["full1", "incr1", "incr2"]
+    assert chains["full2"] == ["full2"]
+    assert chains["incr3"] == ["full2", "incr3"]
+
+
+def test_rotation_keeps_the_chain_of_a_retained_incremental(tmp_path, retention):
+    retention(2, 0, 0)
+    start = datetime(2025, 3, 1, 9)
+    timestamps = [start + timedelta(days=day) for day in range(6)]
+    fulls = [timestamps[0], timestamps[3]]
+    touch_backups(str(tmp_path), timestamps, [t for t in timestamps if t not in fulls])
+    backup.rotate_backups(str(tmp_path))
+    # The two newest days are incremental: their full backup stays as well
+    assert names(str(tmp_path)) == [
+        "Data_20250304_090000.json.gz",
+        "Data_20250305_090000.incr.json.gz",
+        "Data_20250306_090000.incr.json.gz",
+    ]
+
+
+def test_needs_full_backup(monkeypatch):
+    monkeypatch.setattr(config, "BACKUP_FULL_INTERVAL_DAYS", 7)
+    base = "Data_20250301_090000.json.gz"
+    last = "Data_20250303_090000.incr.json.gz"
+    backups = [
+        (datetime(2025, 3, 1, 9), False, base),
+        (datetime(2025, 3, 3, 9), True, last),
+    ]
+    manifest = {"base": base, "last": last}
+    assert not backup.needs_full_backup(manifest, backups, datetime(2025, 3, 7, 9))
+    assert backup.needs_full_backup(manifest, backups, datetime(2025, 3, 8, 9))
+    assert backup.needs_full_backup({}, backups, datetime(2025, 3, 4, 9))
+    # The last incremental backup was rotated out or deleted
+    assert backup.needs_full_backup(manifest, backups[:1], datetime(2025, 3, 4, 9))
+
+
+def order(test_date, inflators):
+    return {
+        "metadata": {"test_date": test_date, "production_order": "1000018000"},
+        "temperatures": {
+            "RT": {
+                "temperature_c": 23.0,
+                "tests": [
+                    {"test_no": 202381000000 + n, "inflator_no": n} for n in inflators
+                ],
+            }
+        },
+    }
+
+
+def test_incremental_backup_restores_the_current_database(tmp_path):
+    json_file = str(tmp_path / "Data.json")
+    with open(json_file, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "V124": {
+                    "700001": order("2025-03-01", [1, 2]),
+                    "700002": order("2025-03-02", [3]),
+                },
+                "V125": {"710000": order("2025-03-03", [4])},
+            },
+            f,
+        )
+    db = database.get_database(json_file)
+    folder = str(tmp_path / "Backup")
+    os.makedirs(folder)
+
+    before = backup.order_fingerprints(db)
+    full = backup.write_full_backup(db, folder, "20250301_090000")
+    with db.lock:
+        db.merge({"V124": {"700001": order("2025-03-01", [1, 2, 5])}})
+        db.merge({"V124": {"700003": order("2025-03-04", [6])}})
+        db.remove_orders(["710000"])
+        db.save()
+    after = backup.order_fingerprints(db)
+
+    path, count = backup.write_incremental_backup(
+        db, folder, "20250302_090000", before, after
+    )
+    assert count == 3
+    changes = backup.read_backup(path)
+    assert sorted(changes["orders"]["V124"]) == ["700001", "700003"]
+    assert changes["removed"] == [["V125", "710000"]]
+
+    with db.lock:
+        current = json.loads(json.dumps(db.load()))
+    assert backup.load_backup(path) == current
+    assert backup.read_backup(full) != current
+
+    target = str(tmp_path / "Restored.json")
+    success, _ = backup.restore_backup(path, target)
+    assert success
+    with open(target, encoding="utf-8") as f:
+        assert json.load(f) == current
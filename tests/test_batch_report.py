@@ -0,0 +1,56 @@
+import json
+from datetime import date
+import pytest
+import config
+import database
+from batch_report import select_records
+
+# (order, test date, workbook seed)
+ORDERS = [
+    ("700001", "2025-05-01", 1),
+    ("700002", "2025-03-15", 2),
+    ("700003", "0000-00-00", 3),
+]
+
+
+@pytest.fixture
+def json_file(tmp_path, monkeypatch, make_workbook):
+    monkeypatch.setattr(config, "CURVE_STORE_ENABLED", False)
+    data = {"V124": {}}
+    for order, test_date, seed in ORDERS:
+        path = make_workbook(tmp_path / f"{order}.xlsx", order, seed=seed)
+        partial = database.parse_excel(str(path))
+        partial["V124"][order]["metadata"]["test_date"] = test_date
+        data["V124"].update(partial["V124"])
+    path = tmp_path / "Data.json"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return str(path)
+
+
+def selected_orders(records):
+    return sorted({record["order"] for record in records})
+
+
+def test_select_records_by_date_range(json_file):
+    records, error = select_records(json_file, "V124")
+    assert error is None
+    assert selected_orders(records) == ["700001", "700002", "700003"]
+
+    records, _ = select_records(
+        json_file, "V124", start_date=date(2025, 4, 1), end_date=date(2025, 5, 1)
+    )
+    assert selected_orders(records) == ["700001"]
+
+
+def test_end_only_range_leaves_out_undated_orders(json_file):
+    records, error = select_records(json_file, "V124", end_date=date(2025, 4, 1))
+    assert error is None
+    assert selected_orders(records) == ["700002"]
+
+
+def test_select_records_by_order_and_temperature(json_file):
+    records, _ = select_records(
+        json_file, "V124", orders=["700002", "799999"], temperatures=["LT"]
+    )
+    assert selected_orders(records) == ["700002"]
+    assert {record["type"] for record in records} == {"LT"}
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+from cpk import capability_rows, capability_stats, pooled_sigma
+
+
+def naive_pooled_sigma(matrix, groups):
+    """Pooled within-group sigma, one column and one group at a time."""
+    sigmas = []
+    for col in range(matrix.shape[1]):
+        squares = 0.0
+        dof = 0
+        for group in sorted(set(groups)):
+            values = [
+                matrix[row, col]
+                for row in range(len(groups))
+                if groups[row] == group and not np.isnan(matrix[row, col])
+            ]
+            if len(values) > 1:
+                squares += np.var(values, ddof=1) * (len(values) - 1)
+                dof += len(values) - 1
+        sigmas.append(np.sqrt(squares / dof) if dof else np.nan)
+    return np.array(sigmas)
+
+
+@pytest.fixture
+def sample():
+    rng = np.random.default_rng(7)
+    groups = [("V124", str(700000 + rng.integers(5))) for _ in range(60)]
+    offsets = np.array([int(order) - 700000 for _, order in groups]) * 0.3
+    matrix = 2.0 + offsets[:, None] + rng.normal(0, 0.05, (60, 8))
+    matrix[rng.random(matrix.shape) < 0.1] = np.nan
+    return matrix, groups
+
+
+def test_pooled_sigma_matches_naive_computation(sample):
+    matrix, groups = sample
+    codes = np.array([int(order) for _, order in groups])
+    np.testing.assert_allclose(
+        pooled_sigma(matrix, codes), naive_pooled_sigma(matrix, groups), rtol=1e-10
+    )
+
+
+def test_pooled_sigma_ignores_single_value_groups():
+    matrix = np.array([[1.0], [3.0], [10.0], [np.nan]])
+    codes = np.array([0, 0, 1, 2])
+    np.testing.assert_allclose(pooled_sigma(matrix, codes), [np.sqrt(2.0)])
+
+
+def test_pooled_sigma_without_degrees_of_freedom_is_nan():
+    matrix = np.array([[1.0, np.nan], [2.0, 5.0]])
+    codes = np.array([0, 1])
+    assert np.isnan(pooled_sigma(matrix, codes)).all()
+
+
+def test_capability_stats_within_and_overall_sigma(sample):
+    matrix, groups = sample
+    limits_max = np.full(matrix.shape[1], 4.0)
+    limits_min = np.full(matrix.shape[1], 1.5)
+    stats = capability_stats(matrix, limits_max, limits_min, groups=groups)
+
+    within = naive_pooled_sigma(matrix, groups)
+    overall = np.nanstd(matrix, axis=0, ddof=1)
+    mean = np.nanmean(matrix, axis=0)
+    np.testing.assert_allclose(stats["sigma_within"], within, rtol=1e-10)
+    np.testing.assert_allclose(stats["sigma_overall"], overall, rtol=1e-10)
+    np.testing.assert_allclose(stats["cp"], 2.5 / (6 * within), rtol=1e-10)
+    np.testing.assert_allclose(
+        stats["ppk"],
+        np.minimum(4.0 - mean, mean - 1.5) / (3 * overall),
+        rtol=1e-10,
+    )
+    # Orders sit at different levels, so the overall sigma is the larger one
+    assert (stats["sigma_overall"] > stats["sigma_within"]).all()
+
+
+def test_capability_stats_counts_out_of_limits_and_one_sided_limits():
+    matrix = np.array([[1.0, 5.0], [2.0, np.nan], [3.0, 7.0]])
+    stats = capability_stats(matrix, [2.5, np.nan], [1.5, 6.0])
+    assert stats["above_max"].tolist() == [1, 0]
+    assert stats["below_min"].tolist() == [1, 1]
+    # Only the minimum is defined for the second column
+    assert np.isnan(stats["cp"][1])
+    assert stats["cpk"][1] == pytest.approx((6.0 - 6.0) / (3 * np.sqrt(2.0)))
+
+
+def test_capability_rows_pad_missing_columns():
+    stats = capability_stats(np.array([[1.0], [1.2]]), [2.0], [0.0])
+    rows = dict(capability_rows(stats, 3))
+    assert rows["Cp"][1:] == [f"{2.0 / (6 * stats['sigma_within'][0]):.2f}", "-", "-"]
+    assert rows["Above Max"] == ["Above Max", "0", "-", "-"]
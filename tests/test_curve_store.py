@@ -0,0 +1,124 @@
+import json
+import os
+import numpy as np
+import pytest
+import config
+import curve_store
+from curve_store import CurveStore, block_from_temperature, stack_curves
+from database import Database
+
+
+def temperature(pressures_by_inflator):
+    return {
+        "pressure_data": [
+            {"inflator_no": no, "pressures": pressures}
+            for no, pressures in pressures_by_inflator.items()
+        ]
+    }
+
+
+def write_data(path, pressures_by_inflator):
+    data = {
+        "V124": {
+            "700001": {
+                "metadata": {"test_date": "2025-01-01"},
+                "temperatures": {"RT": temperature(pressures_by_inflator)},
+            }
+        }
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def block_path(json_file):
+    folder = os.path.join(os.path.dirname(json_file), config.CURVE_STORE_FOLDER)
+    return os.path.join(folder, "V124_700001_RT.npz")
+
+
+@pytest.fixture
+def json_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "CURVE_STORE_ENABLED", True)
+    monkeypatch.setattr(config, "JOURNAL_ENABLED", False)
+    path = str(tmp_path / "Data.json")
+    write_data(path, {1: {"3": 0.1, "6": 1.23456789012}, 2: {"6": 2.5}})
+    return path
+
+
+def test_block_keeps_the_stored_values():
+    block = block_from_temperature(
+        temperature({1: {"3": 0.1, "6": 1.23456789012}, 2: {"6": 2.5}})
+    )
+    assert block.ms_axis.tolist() == [3, 6]
+    assert block.inflator_nos.tolist() == [1, 2]
+    assert block.matrix.dtype == np.float64
+    assert block.matrix[0].tolist() == [0.1, 1.23456789012]
+    assert np.isnan(block.matrix[1, 0]) and block.matrix[1, 1] == 2.5
+
+
+def test_blocks_are_persisted_and_read_back(json_file, monkeypatch):
+    block = Database(json_file).get_curves("V124", "700001", "RT")
+    folder = os.path.join(os.path.dirname(json_file), config.CURVE_STORE_FOLDER)
+    assert os.listdir(folder) == ["V124_700001_RT.npz"]
+
+    def rebuild(temp_data):
+        raise AssertionError("the stored block should have been used")
+
+    monkeypatch.setattr(curve_store, "block_from_temperature", rebuild)
+    stored = Database(json_file).get_curves("V124", "700001", "RT")
+    np.testing.assert_array_equal(stored.matrix, block.matrix)
+
+
+def test_edited_pressures_rebuild_the_stored_block(json_file):
+    Database(json_file).get_curves("V124", "700001", "RT")
+    # Same inflators, other values: written by another tool or a restore
+    write_data(json_file, {1: {"3": 0.1, "6": 9.75}, 2: {"6": 2.5}})
+    block = Database(json_file).get_curves("V124", "700001", "RT")
+    assert block.matrix[0, 1] == 9.75
+    # The rebuilt file is current again for a fresh store
+    store = CurveStore(os.path.dirname(block_path(json_file)))
+    with open(json_file, encoding="utf-8") as f:
+        rt = json.load(f)["V124"]["700001"]["temperatures"]["RT"]
+    assert store._read(("V124", "700001", "RT"), rt) is not None
+
+
+def test_file_without_a_digest_is_rebuilt(json_file):
+    path = block_path(json_file)
+    os.makedirs(os.path.dirname(path))
+    with open(path, "wb") as f:
+        np.savez(
+            f,
+            ms_axis=np.array([3, 6], dtype=np.int32),
+            inflator_nos=np.array([1, 2], dtype=np.int64),
+            matrix=np.zeros((2, 2), dtype=np.float32),
+        )
+    block = Database(json_file).get_curves("V124", "700001", "RT")
+    assert block.matrix[0, 1] == 1.23456789012
+    with np.load(path) as npz:
+        assert "source_digest" in npz
+
+
+def test_saved_changes_update_the_stored_block(json_file):
+    db = Database(json_file)
+    db.get_curves("V124", "700001", "RT")
+    rt = db.load()["V124"]["700001"]["temperatures"]["RT"]
+    rt["pressure_data"][1]["pressures"]["3"] = 0.4
+    db.mark_changed("V124", "700001", ["RT"])
+    db.save()
+    assert db.get_curves("V124", "700001", "RT").matrix[1, 0] == 0.4
+    assert Database(json_file).get_curves("V124", "700001", "RT").matrix[1, 0] == 0.4
+
+
+def test_stack_curves_aligns_blocks_on_one_ms_axis():
+    blocks = {
+        ("V124", "1", "RT"): block_from_temperature(temperature({1: {"3": 1.0}})),
+        ("V124", "2", "RT"): block_from_temperature(temperature({5: {"6": 2.0}})),
+    }
+    records = [
+        {"version": "V124", "order": "2", "type": "RT", "inflator_no": 5},
+        {"version": "V124", "order": "1", "type": "RT", "inflator_no": 1},
+        {"version": "V124", "order": "1", "type": "RT", "inflator_no": 9},
+    ]
+    ms_axis, matrix = stack_curves(records, lambda *key: blocks.get(key))
+    assert ms_axis.tolist() == [3, 6]
+    assert matrix[0, 1] == 2.0 and matrix[1, 0] == 1.0
+    assert np.isnan(matrix[0, 0]) and np.isnan(matrix[2]).all()
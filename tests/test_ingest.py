@@ -0,0 +1,141 @@
+import json
+import os
+from collections import namedtuple
+import pytest
+import database
+from ingest_manifest import IngestManifest
+
+Entry = namedtuple("Entry", "path mtime size")
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    folder = tmp_path / "Excel"
+    folder.mkdir()
+    json_file = tmp_path / "Data.json"
+    json_file.write_text("{}", encoding="utf-8")
+    return str(json_file), str(folder)
+
+
+def rt_tests(json_file, version, order):
+    details = database.get_database(json_file).load()[version][order]
+    return details["temperatures"]["RT"]["tests"]
+
+
+def parsed_rt_tests(path, version, order):
+    partial = database.parse_excel(path)
+    return partial[version][order]["temperatures"]["RT"]["tests"]
+
+
+def rewrite(make_workbook, path, order, seed):
+    """Replace a workbook, making sure its mtime moves."""
+    stat = os.stat(path)
+    make_workbook(path, order, seed=seed)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_manifest_fingerprints(tmp_path):
+    path = tmp_path / "700001_eval.xlsx"
+    path.write_bytes(b"workbook")
+    stat = os.stat(path)
+    entry = Entry(str(path), stat.st_mtime, stat.st_size)
+    manifest = IngestManifest.load(str(tmp_path / "Data.json"))
+    assert not manifest.is_current(entry)
+
+    manifest.record(entry, [("V124", "700001")])
+    assert manifest.is_current(entry)
+    assert manifest.orders_of(entry) == {("V124", "700001")}
+    db = database.Database(str(tmp_path / "Data.json"))
+    db.load()["V124"] = {"700001": {}}
+    assert manifest.has_orders(entry, db)
+    del db.load()["V124"]["700001"]
+    assert not manifest.has_orders(entry, db)
+    # Touched but identical: the hash decides
+    assert manifest.is_current(entry._replace(mtime=entry.mtime + 5))
+    path.write_bytes(b"workbooK")
+    manifest = IngestManifest.load(str(tmp_path / "Data.json"))
+    assert not manifest.is_current(entry._replace(mtime=entry.mtime + 10))
+
+
+def test_manifest_ignores_a_damaged_file(tmp_path):
+    (tmp_path / "Ingest_Manifest.json").write_text("{not json", encoding="utf-8")
+    manifest = IngestManifest.load(str(tmp_path / "Data.json"))
+    assert manifest.orders_of(Entry("x.xlsx", 0, 0)) == set()
+
+
+def test_unchanged_workbooks_are_skipped(workspace, make_workbook):
+    json_file, folder = workspace
+    first = make_workbook(os.path.join(folder, "900001_eval.xlsx"), "900001", seed=1)
+    make_workbook(os.path.join(folder, "900002_eval.xlsx"), "900002", seed=2)
+
+    success, message = database.sync_folder(json_file, folder)
+    assert success and "skipped" not in message
+    success, message = database.sync_folder(json_file, folder)
+    assert success and "already up to date (2 unchanged" in message
+
+    stat = os.stat(first)
+    os.utime(first, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    success, message = database.sync_folder(json_file, folder)
+    assert "already up to date (2 unchanged" in message
+
+    rewrite(make_workbook, first, "900001", seed=3)
+    success, message = database.sync_folder(json_file, folder)
+    assert success and "1 unchanged file(s) skipped" in message
+    assert rt_tests(json_file, "V124", "900001") == parsed_rt_tests(
+        first, "V124", "900001"
+    )
+    with open(os.path.join(os.path.dirname(json_file), "Ingest_Manifest.json")) as f:
+        assert sorted(os.path.basename(path) for path in json.load(f)) == [
+            "900001_eval.xlsx",
+            "900002_eval.xlsx",
+        ]
+
+
+def test_removed_orders_are_ingested_again(workspace, make_workbook):
+    json_file, folder = workspace
+    make_workbook(os.path.join(folder, "900001_eval.xlsx"), "900001", seed=1)
+    database.sync_folder(json_file, folder)
+    database.remove_orders("900001", json_file)
+
+    success, message = database.sync_folder(json_file, folder)
+    assert success and "already up to date" not in message
+    assert database.get_database(json_file).load()["V124"]["900001"]
+
+
+def test_later_workbook_keeps_precedence(workspace, make_workbook):
+    json_file, folder = workspace
+    earlier = make_workbook(os.path.join(folder, "900001_a.xlsx"), "900001", seed=1)
+    later = make_workbook(os.path.join(folder, "900001_b.xlsx"), "900001", seed=2)
+    database.sync_folder(json_file, folder)
+    assert rt_tests(json_file, "V124", "900001") == parsed_rt_tests(
+        later, "V124", "900001"
+    )
+
+    # Only the earlier workbook changed: the later one is merged again
+    rewrite(make_workbook, earlier, "900001", seed=3)
+    success, message = database.sync_folder(json_file, folder)
+    assert success
+    assert rt_tests(json_file, "V124", "900001") == parsed_rt_tests(
+        later, "V124", "900001"
+    )
+
+    rewrite(make_workbook, later, "900001", seed=4)
+    database.sync_folder(json_file, folder)
+    assert rt_tests(json_file, "V124", "900001") == parsed_rt_tests(
+        later, "V124", "900001"
+    )
+
+
+def test_workbook_with_a_new_order_remerges_later_workbooks(workspace, make_workbook):
+    json_file, folder = workspace
+    earlier = make_workbook(os.path.join(folder, "900001_a.xlsx"), "900001", seed=1)
+    later = make_workbook(os.path.join(folder, "900002_b.xlsx"), "900002", seed=2)
+    database.sync_folder(json_file, folder)
+
+    # The manifest cannot know the new order before the file is parsed
+    rewrite(make_workbook, earlier, "900002", seed=3)
+    success, message = database.sync_folder(json_file, folder)
+    assert success and "skipped" not in message
+    assert rt_tests(json_file, "V124", "900002") == parsed_rt_tests(
+        later, "V124", "900002"
+    )
@@ -0,0 +1,130 @@
+import json
+import os
+import threading
+import time
+import pytest
+import database
+from ingest_job import IngestJob, format_eta
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    folder = tmp_path / "Excel"
+    folder.mkdir()
+    json_file = tmp_path / "Data.json"
+    json_file.write_text("{}", encoding="utf-8")
+    return str(json_file), str(folder)
+
+
+def run_job(job, timeout=30):
+    """Start a job and collect its messages until it is done."""
+    job.start()
+    messages = []
+    deadline = time.monotonic() + timeout
+    while not messages or messages[-1][0] != "done":
+        assert time.monotonic() < deadline, "ingestion job did not finish"
+        messages.extend(job.poll())
+        time.sleep(0.01)
+    return messages
+
+
+def test_format_eta():
+    assert format_eta(4.6) == "5 s"
+    assert format_eta(59) == "59 s"
+    assert format_eta(185) == "3 min 05 s"
+
+
+def test_job_reports_progress_and_result(workspace, make_workbook):
+    json_file, folder = workspace
+    for n in range(3):
+        make_workbook(os.path.join(folder, f"90000{n}_eval.xlsx"), f"90000{n}")
+
+    messages = run_job(IngestJob(database.sync_folder, json_file, folder, 1))
+    progress = [message for message in messages if message[0] == "progress"]
+    assert [message[1:3] for message in progress] == [(1, 3), (2, 3), (3, 3)]
+    assert all(message[4] is None for message in progress)
+    assert messages[-1][:2] == ("done", True)
+    assert database.get_database(json_file).has_order("V124", "900002")
+
+
+def test_cancelled_job_saves_nothing(workspace, make_workbook):
+    json_file, folder = workspace
+    make_workbook(os.path.join(folder, "900001_eval.xlsx"), "900001")
+
+    job = IngestJob(database.sync_folder, json_file, folder, 1)
+    job.cancel()
+    messages = run_job(job)
+    assert messages == [
+        ("done", False, "Synchronization cancelled. No changes were saved.")
+    ]
+    assert job.cancelled
+    assert not database.get_database(json_file).has_order("V124", "900001")
+
+
+def test_failed_files_are_reported_and_retried(workspace, make_workbook):
+    json_file, folder = workspace
+    make_workbook(os.path.join(folder, "900001_eval.xlsx"), "900001")
+    with open(os.path.join(folder, "900002_eval.xlsx"), "wb") as f:
+        f.write(b"not a workbook")
+
+    success, message = database.sync_folder(json_file, folder, 1)
+    assert success
+    assert "1 file(s) could not be processed:\n900002_eval.xlsx:" in message
+    assert database.get_database(json_file).has_order("V124", "900001")
+
+    # The broken file is not in the manifest, so the next run tries it again
+    success, message = database.sync_folder(json_file, folder, 1)
+    assert not success and "900002_eval.xlsx" in message
+
+
+def test_run_where_every_file_fails(workspace):
+    json_file, folder = workspace
+    with open(os.path.join(folder, "900001_eval.xlsx"), "wb") as f:
+        f.write(b"not a workbook")
+
+    success, message = database.sync_folder(json_file, folder, 1)
+    assert not success
+    assert message.startswith("No Excel files could be processed.")
+
+
+def test_second_pass_continues_the_progress_counts(workspace, make_workbook):
+    json_file, folder = workspace
+    earlier = make_workbook(os.path.join(folder, "900001_a.xlsx"), "900001", seed=1)
+    make_workbook(os.path.join(folder, "900002_b.xlsx"), "900002", seed=2)
+    database.sync_folder(json_file, folder, 1)
+
+    # Only parsing shows that the earlier workbook now holds the later one's order
+    stat = os.stat(earlier)
+    make_workbook(earlier, "900002", seed=3)
+    os.utime(earlier, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    calls = []
+    success, message = database.sync_folder(
+        json_file,
+        folder,
+        1,
+        progress=lambda *args: calls.append(args[:2]),
+        cancel=threading.Event(),
+    )
+    assert success
+    assert calls == [(1, 1), (2, 2)]
+
+
+def test_remerged_file_that_fails_is_retried(workspace, make_workbook):
+    json_file, folder = workspace
+    earlier = make_workbook(os.path.join(folder, "900001_a.xlsx"), "900001", seed=1)
+    later = make_workbook(os.path.join(folder, "900001_b.xlsx"), "900001", seed=2)
+    database.sync_folder(json_file, folder, 1)
+
+    # The later workbook keeps its fingerprint but can no longer be read
+    stat = os.stat(later)
+    with open(later, "wb") as f:
+        f.write(b"x" * stat.st_size)
+    os.utime(later, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    stat = os.stat(earlier)
+    make_workbook(earlier, "900001", seed=3)
+    os.utime(earlier, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    success, message = database.sync_folder(json_file, folder, 1)
+    assert success and "900001_b.xlsx" in message
+    with open(os.path.join(os.path.dirname(json_file), "Ingest_Manifest.json")) as f:
+        assert [os.path.basename(path) for path in json.load(f)] == ["900001_a.xlsx"]
@@ -0,0 +1,192 @@
+import json
+import os
+import pytest
+import config
+import database
+from database import Database
+
+
+def order(test_date, tests=()):
+    return {
+        "metadata": {"test_date": test_date},
+        "temperatures": {
+            "RT": {
+                "temperature_c": 23.0,
+                "tests": [{"test_no": n, "inflator_no": n} for n in tests],
+            }
+        },
+    }
+
+
+@pytest.fixture
+def json_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "JOURNAL_ENABLED", True)
+    path = tmp_path / "Data.json"
+    path.write_text(
+        json.dumps({"V124": {"700001": order("2025-01-01", [1])}}), encoding="utf-8"
+    )
+    return str(path)
+
+
+def put_order(db, version, number, details):
+    db.load().setdefault(version, {})[number] = details
+    db.mark_changed(version, number)
+    db.save()
+
+
+def read_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_changes_are_journaled_and_replayed(json_file):
+    with open(json_file, encoding="utf-8") as f:
+        snapshot = f.read()
+    db = Database(json_file)
+    put_order(db, "V124", "700002", order("2025-01-02", [2]))
+    put_order(db, "V124", "700003", order("2025-01-03", [3]))
+
+    # The snapshot is untouched; the journal names it on its first line
+    with open(json_file, encoding="utf-8") as f:
+        assert f.read() == snapshot
+    lines = read_lines(db.journal_file)
+    assert lines[0]["op"] == "snapshot"
+    assert [line["order"] for line in lines[1:]] == ["700002", "700003"]
+
+    assert Database(json_file).load() == db.load()
+    assert sorted(Database(json_file).load()["V124"]) == [
+        "700001",
+        "700002",
+        "700003",
+    ]
+
+
+def test_touching_the_snapshot_keeps_the_journal(json_file):
+    db = Database(json_file)
+    put_order(db, "V124", "700002", order("2025-01-02"))
+    stat = os.stat(json_file)
+    os.utime(json_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert "700002" in Database(json_file).load()["V124"]
+
+
+def test_torn_last_line_is_dropped_before_the_next_append(json_file):
+    db = Database(json_file)
+    put_order(db, "V124", "700002", order("2025-01-02"))
+    with open(db.journal_file, "a", encoding="utf-8") as f:
+        f.write('{"op":"put_order","version":"V124","ord')
+
+    reader = Database(json_file)
+    assert sorted(reader.load()["V124"]) == ["700001", "700002"]
+    put_order(reader, "V124", "700003", order("2025-01-03"))
+    assert [line["op"] for line in read_lines(db.journal_file)] == [
+        "snapshot",
+        "put_order",
+        "put_order",
+    ]
+    assert sorted(Database(json_file).load()["V124"]) == [
+        "700001",
+        "700002",
+        "700003",
+    ]
+
+
+def test_journal_of_another_snapshot_is_never_replayed(json_file):
+    db = Database(json_file)
+    put_order(db, "V124", "700002", order("2025-01-02"))
+    journal = read_lines(db.journal_file)
+    # Data.json restored by hand, without its journal
+    with open(json_file, "w", encoding="utf-8") as f:
+        json.dump({"V125": {"710000": order("2024-12-31")}}, f)
+
+    # Loading alone leaves the journal where it is
+    assert Database(json_file).load() == {"V125": {"710000": order("2024-12-31")}}
+    assert read_lines(db.journal_file) == journal
+
+    # The next write moves it aside and starts a new journal
+    writer = Database(json_file)
+    put_order(writer, "V125", "710001", order("2025-01-01"))
+    folder = os.path.dirname(json_file)
+    stale = [name for name in os.listdir(folder) if ".journal.stale_" in name]
+    assert len(stale) == 1
+    assert read_lines(os.path.join(folder, stale[0])) == journal
+    assert sorted(Database(json_file).load()) == ["V125"]
+    assert sorted(Database(json_file).load()["V125"]) == ["710000", "710001"]
+
+
+def test_compact_folds_the_journal_into_the_snapshot(json_file):
+    db = Database(json_file)
+    put_order(db, "V124", "700002", order("2025-01-02"))
+    db.compact()
+    assert not os.path.exists(db.journal_file)
+    with open(json_file, encoding="utf-8") as f:
+        assert sorted(json.load(f)["V124"]) == ["700001", "700002"]
+
+    # The next change starts a journal that matches the new snapshot
+    put_order(db, "V124", "700003", order("2025-01-03"))
+    assert sorted(Database(json_file).load()["V124"]) == [
+        "700001",
+        "700002",
+        "700003",
+    ]
+
+
+def test_compact_when_another_process_removes_the_journal(json_file, monkeypatch):
+    db = Database(json_file)
+    put_order(db, "V124", "700002", order("2025-01-02"))
+    write_json_atomic = database.write_json_atomic
+
+    def write_and_race(path, data, **kwargs):
+        write_json_atomic(path, data, **kwargs)
+        # Another process compacts at the same moment
+        os.remove(db.journal_file)
+
+    monkeypatch.setattr(database, "write_json_atomic", write_and_race)
+    db.compact()
+    assert not os.path.exists(db.journal_file)
+    with open(json_file, encoding="utf-8") as f:
+        assert sorted(json.load(f)["V124"]) == ["700001", "700002"]
+
+
+def test_large_journal_is_compacted_on_save(json_file, monkeypatch):
+    monkeypatch.setattr(config, "JOURNAL_COMPACT_BYTES", 1)
+    db = Database(json_file)
+    put_order(db, "V124", "700002", order("2025-01-02"))
+    put_order(db, "V124", "700003", order("2025-01-03"))
+    assert not os.path.exists(db.journal_file)
+    with open(json_file, encoding="utf-8") as f:
+        assert sorted(json.load(f)["V124"]) == ["700001", "700002", "700003"]
+
+
+def test_journal_disabled_writes_the_snapshot(json_file, monkeypatch):
+    monkeypatch.setattr(config, "JOURNAL_ENABLED", False)
+    db = Database(json_file)
+    put_order(db, "V124", "700002", order("2025-01-02"))
+    assert not os.path.exists(db.journal_file)
+    with open(json_file, encoding="utf-8") as f:
+        assert "700002" in json.load(f)["V124"]
+
+
+def test_remove_order_is_replayed(json_file):
+    db = Database(json_file)
+    put_order(db, "V124", "700002", order("2025-01-02"))
+    del db.load()["V124"]["700001"]
+    db.mark_changed("V124", "700001")
+    db.save()
+    assert sorted(Database(json_file).load()["V124"]) == ["700002"]
+
+
+def test_write_json_atomic_keeps_the_file_mode(tmp_path):
+    from utils import write_json_atomic
+
+    path = tmp_path / "Data.json"
+    path.write_text("{}", encoding="utf-8")
+    os.chmod(path, 0o640)
+    write_json_atomic(str(path), {"V124": {}})
+    assert os.stat(path).st_mode & 0o777 == 0o640
+    assert json.loads(path.read_text(encoding="utf-8")) == {"V124": {}}
+
+    new_path = tmp_path / "New.json"
+    write_json_atomic(str(new_path), {})
+    umask = os.umask(0)
+    os.umask(umask)
+    assert os.stat(new_path).st_mode & 0o777 == 0o666 & ~umask
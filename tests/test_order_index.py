@@ -0,0 +1,126 @@
+import random
+from datetime import date, timedelta
+import pytest
+from order_index import OrderIndex
+
+
+def make_data(count=300, seed=3):
+    rnd = random.Random(seed)
+    data = {}
+    for k in range(count):
+        version = rnd.choice(["V124", "V125", "V200"])
+        if rnd.random() < 0.05:
+            test_date = rnd.choice(["N/A", "", "2025-13-40"])
+        else:
+            test_date = (
+                date(2023, 1, 1) + timedelta(days=rnd.randrange(900))
+            ).isoformat()
+        data.setdefault(version, {})[str(700000 + k)] = {
+            "metadata": {"test_date": test_date}
+        }
+    return data
+
+
+def naive_select(data, version=None, start_date=None, end_date=None):
+    """Filter every order and sort most recent first, undated orders last."""
+    rows = []
+    for v, orders in data.items():
+        if version and version.lower() != "all" and v != version:
+            continue
+        for order, details in orders.items():
+            test_date = details["metadata"]["test_date"]
+            try:
+                day = date.fromisoformat(test_date)
+            except ValueError:
+                day = None
+            if start_date is not None:
+                if day is None or day < start_date:
+                    continue
+                if end_date is not None and day > end_date:
+                    continue
+            rows.append((v, order, test_date, day or date.min))
+    rows.sort(key=lambda row: (-row[3].toordinal(), row[0], row[1]))
+    return [row[:3] for row in rows]
+
+
+@pytest.fixture
+def data():
+    return make_data()
+
+
+@pytest.mark.parametrize("version", [None, "All", "V124", "V999"])
+@pytest.mark.parametrize(
+    "start_date, end_date",
+    [
+        (None, None),
+        (date(2023, 6, 1), None),
+        (date(2023, 6, 1), date(2024, 2, 29)),
+        (date(2024, 3, 15), date(2024, 3, 15)),
+        (date(2024, 5, 1), date(2024, 4, 1)),
+        (date(2030, 1, 1), None),
+    ],
+)
+def test_select_matches_naive_filter(data, version, start_date, end_date):
+    index = OrderIndex.build(data)
+    selection = index.select(version, start_date, end_date)
+    expected = naive_select(data, version, start_date, end_date)
+    assert list(selection) == expected
+    assert len(selection) == len(expected)
+
+
+def test_date_range_bounds_are_inclusive():
+    data = {
+        "V124": {
+            "1": {"metadata": {"test_date": "2024-01-01"}},
+            "2": {"metadata": {"test_date": "2024-01-31"}},
+            "3": {"metadata": {"test_date": "2024-02-01"}},
+            "4": {"metadata": {"test_date": "2023-12-31"}},
+        }
+    }
+    index = OrderIndex.build(data)
+    selection = index.select("V124", date(2024, 1, 1), date(2024, 1, 31))
+    assert [order for _, order, _ in selection] == ["2", "1"]
+
+
+def test_page_slices_the_selection(data):
+    index = OrderIndex.build(data)
+    selection = index.select(None, date(2023, 3, 1), date(2024, 12, 31))
+    expected = list(selection)
+    assert selection.page(0, 10) == expected[:10]
+    assert selection.page(25, 10) == expected[25:35]
+    assert selection.page(len(expected) - 3, 10) == expected[-3:]
+    assert selection.page(5, None) == expected[5:]
+
+
+def test_add_and_remove_keep_the_index_sorted(data):
+    index = OrderIndex.build(data)
+    index.add("V124", "800000", "2025-07-01")
+    index.add("V999", "800001", "2023-02-02")
+    # Updating an order moves it to its new date
+    first_order = next(iter(data["V125"]))
+    index.add("V125", first_order, "2022-01-01")
+    index.remove("V200", next(iter(data["V200"])))
+    index.remove("V124", "missing")
+
+    data["V124"]["800000"] = {"metadata": {"test_date": "2025-07-01"}}
+    data["V999"] = {"800001": {"metadata": {"test_date": "2023-02-02"}}}
+    data["V125"][first_order] = {"metadata": {"test_date": "2022-01-01"}}
+    del data["V200"][next(iter(data["V200"]))]
+
+    rebuilt = OrderIndex.build(data)
+    assert list(index.select()) == list(rebuilt.select())
+    assert index.versions() == rebuilt.versions() == ["V124", "V125", "V200", "V999"]
+    for start_date, end_date in [
+        (date(2022, 1, 1), None),
+        (date(2023, 1, 1), date(2023, 3, 1)),
+    ]:
+        assert list(index.select("V999", start_date, end_date)) == naive_select(
+            data, "V999", start_date, end_date
+        )
+
+
+def test_removing_the_last_order_drops_the_version():
+    index = OrderIndex.build({"V1": {"1": {"metadata": {"test_date": "2024-01-01"}}}})
+    index.remove("V1", "1")
+    assert index.versions() == []
+    assert len(index) == 0
@@ -0,0 +1,93 @@
+import pytest
+import search_index
+from search_index import SearchIndex, normalize_term, order_entries
+
+
+def summary(production_order, lot, tests, pressure_inflators=()):
+    return {
+        "metadata": {
+            "production_order": production_order,
+            "propellant_lot_number": lot,
+        },
+        "temperatures": {
+            "RT": {"tests": tests, "pressure_inflators": list(pressure_inflators)},
+        },
+    }
+
+
+@pytest.fixture
+def summaries():
+    return {
+        ("V124", "700010"): summary(
+            1000018000.0,
+            "0741429701",
+            [{"test_no": 202381000001, "inflator_no": 233249200001}],
+            [233249200009],
+        ),
+        ("V124", "700011"): summary(
+            "1000018001",
+            " LOT-A ",
+            [{"test_no": 202381000002, "inflator_no": None}],
+        ),
+        ("V125", "710000"): summary(None, "", []),
+    }
+
+
+def build(summaries):
+    return SearchIndex.build(list(summaries), lambda v, o: summaries.get((v, o)))
+
+
+def test_normalize_term():
+    assert normalize_term(1000018000.0) == "1000018000"
+    assert normalize_term(" LOT-A ") == "lot-a"
+    assert normalize_term("  ") is None
+    assert normalize_term(None) is None
+
+
+def test_order_entries_skip_empty_values(summaries):
+    entries = order_entries("V125", "710000", summaries[("V125", "710000")])
+    assert entries == [("710000", "order", "V125", "710000", "")]
+
+
+def test_prefix_search(summaries):
+    index = build(summaries)
+    assert [e[3] for e in index.search("7000")] == ["700010", "700011"]
+    assert index.search("100001800") == [
+        ("1000018000", "production_order", "V124", "700010", ""),
+        ("1000018001", "production_order", "V124", "700011", ""),
+    ]
+    assert index.search("lot-") == [
+        ("lot-a", "propellant_lot_number", "V124", "700011", "")
+    ]
+    assert index.search("2332492000") == [
+        ("233249200001", "inflator_no", "V124", "700010", "RT"),
+        ("233249200009", "inflator_no", "V124", "700010", "RT"),
+    ]
+    assert len(index.search("7", limit=2)) == 2
+    assert index.search("") == []
+    assert index.search("9") == []
+
+
+@pytest.mark.parametrize("insort_max", [search_index.INSORT_MAX_ENTRIES, 0])
+def test_refresh_matches_a_rebuild(summaries, monkeypatch, insort_max):
+    # 0 forces the merge path used for large batches
+    monkeypatch.setattr(search_index, "INSORT_MAX_ENTRIES", insort_max)
+    index = build(summaries)
+
+    summaries[("V124", "700010")] = summary(
+        "1000019999", "0741429701", [{"test_no": 202381000077, "inflator_no": 1}]
+    )
+    del summaries[("V124", "700011")]
+    summaries[("V200", "720000")] = summary("1000020000", "LOT-B", [])
+    for key in [("V124", "700010"), ("V124", "700011"), ("V200", "720000")]:
+        index.mark_stale(*key)
+    # Nothing changes until the next refresh
+    assert index.search("lot-a")
+
+    index.refresh(lambda v, o: summaries.get((v, o)))
+    rebuilt = build(summaries)
+    assert len(index) == len(rebuilt)
+    assert index._entries == rebuilt._entries
+    assert index.search("lot-a") == []
+    assert index.search("1000018000") == []
+    assert [e[3] for e in index.search("720")] == ["720000"]
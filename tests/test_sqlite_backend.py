@@ -0,0 +1,84 @@
+import json
+from datetime import date
+import numpy as np
+import pytest
+import config
+import database
+from database import Database
+from sqlite_backend import SqliteDatabase, migrate_json_to_sqlite
+
+# (version, order, test date, workbook seed)
+ORDERS = [
+    ("V124", "700001", "2025-05-01", 1),
+    ("V124", "700002", "2025-03-15", 2),
+    ("V124", "700003", "0000-00-00", 3),
+    ("V125", "700004", "2025-05-01", 4),
+    ("V125", "700005", "2024-12-31", 5),
+]
+
+
+@pytest.fixture
+def backends(tmp_path, monkeypatch, make_workbook):
+    monkeypatch.setattr(config, "CURVE_STORE_ENABLED", False)
+    data = {}
+    for version, order, test_date, seed in ORDERS:
+        path = make_workbook(tmp_path / f"{order}.xlsx", order, version, seed=seed)
+        partial = database.parse_excel(str(path))
+        partial[version][order]["metadata"]["test_date"] = test_date
+        data.setdefault(version, {}).update(partial[version])
+    json_file = tmp_path / "Data.json"
+    json_file.write_text(json.dumps(data), encoding="utf-8")
+
+    target = SqliteDatabase(str(json_file), str(tmp_path / "Data.sqlite"), False)
+    assert migrate_json_to_sqlite(str(json_file), target) == len(ORDERS)
+    yield Database(str(json_file)), target
+    target.conn.close()
+
+
+def test_migrated_orders_match_the_json_database(backends):
+    json_db, sqlite_db = backends
+    assert sqlite_db.versions() == json_db.versions()
+    for version, order, _, _ in ORDERS:
+        assert sqlite_db.has_order(version, order)
+        assert sqlite_db.get_order(version, order) == json_db.get_order(version, order)
+    assert sqlite_db.load() == json_db.load()
+    assert not sqlite_db.has_order("V124", "700004")
+
+
+@pytest.mark.parametrize(
+    "version, start_date, end_date",
+    [
+        (None, None, None),
+        ("V124", None, None),
+        ("All", date(2025, 3, 1), date(2025, 5, 1)),
+        ("V125", date(2025, 1, 1), None),
+        (None, date(2024, 12, 31), date(2024, 12, 31)),
+    ],
+)
+def test_migrated_selections_match_the_json_database(
+    backends, version, start_date, end_date
+):
+    json_db, sqlite_db = backends
+    expected = json_db.select_orders(version, start_date, end_date)
+    selection = sqlite_db.select_orders(version, start_date, end_date)
+    assert len(selection) == len(expected)
+    assert list(selection) == list(expected)
+    assert selection.page(1, 2) == expected.page(1, 2)
+
+
+def test_migrated_curves_match_the_json_database(backends):
+    json_db, sqlite_db = backends
+    for version, order, _, _ in ORDERS:
+        for temp_type in config.TEMPERATURE_TYPES:
+            expected = json_db.get_curves(version, order, temp_type)
+            block = sqlite_db.get_curves(version, order, temp_type)
+            np.testing.assert_array_equal(block.ms_axis, expected.ms_axis)
+            np.testing.assert_array_equal(block.inflator_nos, expected.inflator_nos)
+            assert block.matrix.dtype == np.float64
+            np.testing.assert_array_equal(block.matrix, expected.matrix)
+
+
+def test_migration_skips_orders_already_present(backends, tmp_path):
+    _, sqlite_db = backends
+    assert migrate_json_to_sqlite(str(tmp_path / "Data.json"), sqlite_db) == 0
+    assert len(sqlite_db.select_orders()) == len(ORDERS)
@@ -0,0 +1,216 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import config
+from report import debounce_resize
+from tooltip import ToolTip
+from trends import get_trend
+
+TABLE_COLUMNS = [
+    ("Order", 80),
+    ("Test Date", 90),
+    ("Inflators", 70),
+    ("Peak Mean", 80),
+    ("Peak Min", 80),
+    ("Peak Max", 80),
+    ("Min Cpk", 70),
+    ("Above Max", 80),
+    ("Below Min", 80),
+    ("Inflators Out", 90),
+]
+MAX_DATE_TICKS = 12
+
+
+def format_value(value):
+    return "-" if value is None else f"{value:.2f}"
+
+
+def show_trends(self):
+    """Open the trend window for the version selected in the Orders Manager."""
+    try:
+        versions = [v for v in self.version_combobox["values"] if v != "All"]
+        if not versions:
+            messagebox.showwarning("Warning", "No orders in the database.")
+            return
+        selected_version = self.version_var.get()
+        if selected_version not in versions:
+            selected_version = versions[0]
+
+        trend_win = tk.Toplevel(self.parent)
+        trend_win.title("Trend Analysis")
+        trend_win.geometry("1000x700")
+        trend_win.minsize(800, 600)
+        trend_win.focus_set()
+
+        # Controls
+        controls = ttk.Frame(trend_win, padding=5)
+        controls.pack(fill=tk.X)
+        ttk.Label(controls, text="Version:").pack(side=tk.LEFT, padx=(0, 5))
+        version_var = tk.StringVar(value=selected_version)
+        version_box = ttk.Combobox(
+            controls,
+            textvariable=version_var,
+            values=versions,
+            state="readonly",
+            width=10,
+        )
+        version_box.pack(side=tk.LEFT)
+        ttk.Label(controls, text="Temperature:").pack(side=tk.LEFT, padx=(10, 5))
+        temp_var = tk.StringVar(value=config.TEMPERATURE_TYPES[0])
+        temp_box = ttk.Combobox(
+            controls,
+            textvariable=temp_var,
+            values=config.TEMPERATURE_TYPES,
+            state="readonly",
+            width=5,
+        )
+        temp_box.pack(side=tk.LEFT)
+        summary_label = ttk.Label(controls, text="")
+        summary_label.pack(side=tk.LEFT, padx=10)
+        btn_close = ttk.Button(controls, text="Close", command=trend_win.destroy)
+        btn_close.pack(side=tk.RIGHT)
+        ToolTip(version_box, "Version whose orders are compared")
+        ToolTip(temp_box, "Temperature of the compared tests")
+
+        # Graphs: peak pressure band and Cpk at the PK points, one point per order
+        fig, (ax_peak, ax_cpk) = plt.subplots(2, 1, figsize=(9, 5), sharex=True)
+        fig.patch.set_facecolor("#fafafa")
+        canvas_fig = FigureCanvasTkAgg(fig, master=trend_win)
+        graph_widget = canvas_fig.get_tk_widget()
+        pending_resizes = {}
+        graph_widget.bind(
+            "<Configure>",
+            lambda e: debounce_resize(canvas_fig, e, pending_resizes),
+        )
+        graph_widget.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+        # Per-order table
+        table_frame = ttk.Frame(trend_win)
+        table_frame.pack(fill=tk.BOTH, padx=5, pady=5)
+        table = ttk.Treeview(
+            table_frame,
+            columns=[name for name, _ in TABLE_COLUMNS],
+            show="headings",
+            height=8,
+        )
+        for name, width in TABLE_COLUMNS:
+            table.heading(name, text=name)
+            table.column(name, width=width, anchor="center", stretch=True)
+        table_scroll = ttk.Scrollbar(
+            table_frame, orient=tk.VERTICAL, command=table.yview
+        )
+        table.configure(yscrollcommand=table_scroll.set)
+        table.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        table_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        table.tag_configure("warning", background="#ffcccc")
+
+        def refresh(event=None):
+            version = version_var.get()
+            temp = temp_var.get()
+            summaries = get_trend(self.json_file, version, temp)
+
+            ax_peak.clear()
+            ax_cpk.clear()
+            table.delete(*table.get_children())
+            summary_label.configure(
+                text=f"{len(summaries)} order(s) with {temp} pressure data"
+            )
+            if not summaries:
+                ax_peak.set_title(f"No {temp} pressure data for version {version}")
+                canvas_fig.draw_idle()
+                return
+
+            x = list(range(len(summaries)))
+            ax_peak.fill_between(
+                x,
+                [s["peak_min"] for s in summaries],
+                [s["peak_max"] for s in summaries],
+                color="#444444",
+                alpha=0.2,
+                label="Peak Min/Max",
+            )
+            ax_peak.plot(
+                x,
+                [s["peak_mean"] for s in summaries],
+                color="#7CE04A",
+                linewidth=2,
+                marker="o",
+                markersize=3,
+                label="Peak Mean",
+            )
+            ax_peak.set_title(
+                f"Version {version} | Temperature {temp}", fontsize=11, pad=8
+            )
+            ax_peak.set_ylabel("Peak Pressure (bar)", fontsize=9)
+            ax_peak.legend(loc="lower right", fontsize=7)
+            ax_peak.grid(True, color="#cccccc", linestyle="--", linewidth=0.7)
+
+            for point, label in enumerate(
+                config.PRESSURE_POINTS[: config.TREND_KEY_POINTS]
+            ):
+                values = [
+                    s["cpk"][point] if point < len(s["cpk"]) else None
+                    for s in summaries
+                ]
+                ax_cpk.plot(
+                    x,
+                    [float("nan") if v is None else v for v in values],
+                    linewidth=1,
+                    marker="o",
+                    markersize=2,
+                    label=label,
+                )
+            ax_cpk.axhline(
+                config.TREND_CPK_TARGET,
+                color="#d62728",
+                linestyle="--",
+                linewidth=1.5,
+                label=f"Cpk {config.TREND_CPK_TARGET}",
+            )
+            ax_cpk.set_ylabel("Cpk", fontsize=9)
+            ax_cpk.legend(loc="upper right", fontsize=6, ncol=4)
+            ax_cpk.grid(True, color="#cccccc", linestyle="--", linewidth=0.7)
+
+            step = max(1, len(summaries) // MAX_DATE_TICKS)
+            ax_cpk.set_xticks(x[::step])
+            ax_cpk.set_xticklabels(
+                [s["test_date"] for s in summaries[::step]], rotation=30, fontsize=7
+            )
+            fig.tight_layout()
+            canvas_fig.draw_idle()
+
+            # Table lists the most recent order first, like the Orders Manager
+            for s in reversed(summaries):
+                cpk_values = [v for v in s["cpk"] if v is not None]
+                min_cpk = min(cpk_values) if cpk_values else None
+                is_warning = s["inflators_out"] > 0 or (
+                    min_cpk is not None and min_cpk < config.TREND_CPK_TARGET
+                )
+                table.insert(
+                    "",
+                    "end",
+                    values=[
+                        s["order"],
+                        s["test_date"],
+                        s["inflators"],
+                        format_value(s["peak_mean"]),
+                        format_value(s["peak_min"]),
+                        format_value(s["peak_max"]),
+                        format_value(min_cpk),
+                        s["above_max"],
+                        s["below_min"],
+                        s["inflators_out"],
+                    ],
+                    tags=("warning",) if is_warning else (),
+                )
+
+        version_box.bind("<<ComboboxSelected>>", refresh)
+        temp_box.bind("<<ComboboxSelected>>", refresh)
+        trend_win.protocol(
+            "WM_DELETE_WINDOW", lambda: (plt.close(fig), trend_win.destroy())
+        )
+        btn_close.configure(command=lambda: (plt.close(fig), trend_win.destroy()))
+        refresh()
+    except Exception as e:
+        messagebox.showerror("Error", f"Error showing trends: {str(e)}")
@@ -0,0 +1,116 @@
+"""
+Cross-order trend analytics for the Ballistic Tests Database application.
+Summarizes every order of a version (peak pressures, Cpk at the PK points,
+limit violations) in test date order. Per-order summaries are cached and
+only recomputed for orders whose data changed since they were computed.
+"""
+
+import os
+import numpy as np
+import config
+import database
+from cpk import capability_stats
+
+# (json_file, version, order, temp_type) -> (order revision, summary or None)
+_summaries = {}
+
+
+def order_curves(db, version, order, temp_type):
+    """Return the (matrix, limits_max, limits_min) a summary is computed from.
+
+    Reads the database, so it is called with db.lock held; returns None when
+    the order has no pressure curves for `temp_type`.
+    """
+    block = db.get_curves(version, order, temp_type)
+    if block is None or not block.matrix.size:
+        return None
+    temp_data = db.get_temperature(version, order, temp_type) or {}
+    limits = temp_data.get("limits", {})
+    ms_points = [str(ms) for ms in block.ms_axis.tolist()]
+    limits_max = np.array(
+        [limits.get("maximums", {}).get(ms, np.nan) for ms in ms_points]
+    )
+    limits_min = np.array(
+        [limits.get("minimums", {}).get(ms, np.nan) for ms in ms_points]
+    )
+    # Blocks are replaced, never modified, when an order changes, so the
+    # matrix can be used after the lock is released
+    return block.matrix, limits_max, limits_min
+
+
+def summarize_order(version, order, test_date, curves):
+    """Compute the trend summary of one temperature block of an order.
+
+    `curves` is what order_curves returned; needs no database access.
+    Returns None when the order has no pressure curves.
+    """
+    if curves is None:
+        return None
+    matrix, limits_max, limits_min = curves
+    has_data = ~np.all(np.isnan(matrix), axis=1)
+    if not has_data.any():
+        return None
+    matrix = matrix[has_data]
+
+    # One order is one subgroup, so Cpk uses that order's own sigma
+    stats = capability_stats(matrix, limits_max, limits_min)
+    peaks = np.nanmax(matrix, axis=1)
+    with np.errstate(invalid="ignore"):
+        out_of_limits = (matrix > limits_max) | (matrix < limits_min)
+    cpk = stats["cpk"][: config.TREND_KEY_POINTS]
+    return {
+        "version": version,
+        "order": order,
+        "test_date": test_date,
+        "inflators": int(len(matrix)),
+        "peak_mean": float(peaks.mean()),
+        "peak_min": float(peaks.min()),
+        "peak_max": float(peaks.max()),
+        "cpk": [None if np.isnan(value) else float(value) for value in cpk],
+        "above_max": int(stats["above_max"].sum()),
+        "below_min": int(stats["below_min"].sum()),
+        "inflators_out": int(out_of_limits.any(axis=1).sum()),
+    }
+
+
+def get_trend(json_file, version, temp_type):
+    """Return the summaries of all orders of a version, oldest test first.
+
+    Orders without curves for `temp_type` are left out. The lock is only held
+    to list the orders and to copy the curves of each changed order; the
+    statistics are computed without it, so the UI is not blocked.
+    """
+    db = database.get_database(json_file)
+    json_key = os.path.abspath(json_file)
+    with db.lock:
+        # The index is most recent first; trends read left to right in time
+        selection = [
+            (entry_version, order, test_date, db.order_revision(entry_version, order))
+            for entry_version, order, test_date in reversed(
+                list(db.select_orders(version))
+            )
+        ]
+
+    summaries = []
+    seen = set()
+    for entry_version, order, test_date, revision in selection:
+        key = (json_key, entry_version, order, temp_type)
+        seen.add(key)
+        cached = _summaries.get(key)
+        if cached is None or cached[0] != revision:
+            with db.lock:
+                # The order may have changed since the selection was taken
+                revision = db.order_revision(entry_version, order)
+                curves = order_curves(db, entry_version, order, temp_type)
+            summary = summarize_order(entry_version, order, test_date, curves)
+            cached = (revision, summary)
+            _summaries[key] = cached
+        if cached[1] is not None:
+            summaries.append(cached[1])
+
+    # Forget orders of this version that were removed from the database
+    for key in list(_summaries):
+        if key[0] == json_key and key[1] == version and key[3] == temp_type:
+            if key not in seen:
+                del _summaries[key]
+    return summaries
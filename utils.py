@@ -1,5 +1,14 @@
+import json
+import os
+import stat
+import tempfile
 from datetime import datetime
 
+# Read once at import (os.umask can only be read by setting it, which is not
+# safe once other threads create files)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
 
 def clean_value(value):
     if value is None:
@@ -30,3 +39,31 @@ def parse_date(date_value):
         return "0000-00-00"
     except Exception:
         return "0000-00-00"
+
+
+def write_json_atomic(path, data, **dump_kwargs):
+    """Write JSON to a temporary file and rename it over `path`.
+
+    A crash mid-write leaves the previous file intact instead of a truncated one.
+    The file keeps its permissions (new files get the umask default), as
+    mkstemp creates the temporary file readable by its owner only.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            os.chmod(tmp_path, mode)
+            json.dump(data, f, ensure_ascii=False, **dump_kwargs)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
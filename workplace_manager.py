@@ -1,9 +1,21 @@
+import heapq
 import tkinter as tk
+from itertools import islice
 from tkinter import ttk, messagebox
-from export_database import export_database_to_excel
-from report import show_report
 from tooltip import ToolTip
 
+HEADER = "Test | Inflator | Temperature | Type | Version | Order | Date"
+
+
+def format_workplace_line(reg):
+    """Format one workplace record as a line of the results listbox."""
+    line = f"{reg['test_no']} | {reg['inflator_no']} | {reg['temperature_c']}°C | {reg['type']} | {reg['version']} | {reg['order']} | {reg.get('test_date', 'N/A')}"
+    if reg["has_pressures"]:
+        line += " | Pressure data available"
+    else:
+        line += " | No pressure data"
+    return line
+
 
 class WorkplaceManager:
     def __init__(self, parent, json_file):
@@ -13,6 +25,12 @@ class WorkplaceManager:
         self.workplace_data = []
         self.filtered_workplace_data = None
 
+        # Formatted listbox lines of workplace_data and, per temperature type,
+        # the positions of its records; kept in step by refresh_workplace_index
+        self.workplace_lines = []
+        self.temperature_index = {}
+        self._indexed_data = None
+
         # Configure ttk style for buttons
         style = ttk.Style()
         style.configure(
@@ -230,14 +248,10 @@ class WorkplaceManager:
                 if var.get()
             ]
 
-        self.list_results.delete(0, tk.END)
-        header = "Test | Inflator | Temperature | Type | Version | Order | Date"
-        self.list_results.insert(tk.END, header)
-        self.list_results.insert(tk.END, "-" * len(header))
-
         # Check for mixed versions
         versions = {reg["version"] for reg in self.workplace_data}
         if len(versions) > 1:
+            self.show_lines([])
             messagebox.showerror(
                 "Error",
                 "Workplace contains mixed versions! Clear before applying filters.",
@@ -246,6 +260,7 @@ class WorkplaceManager:
 
         # If no temperatures selected, show warning and clear display
         if not self.selected_temperatures and not self.temp_all_var.get():
+            self.show_lines([])
             messagebox.showwarning(
                 "Warning", "No temperatures selected. Please select at least one."
             )
@@ -253,34 +268,33 @@ class WorkplaceManager:
             self.update_workplace_counters([])
             return
 
-        # Apply filters
-        filtered_data = []
-        for reg in self.workplace_data:
-            if reg["type"] not in self.selected_temperatures:
-                continue
-            filtered_data.append(reg)
-
-        # Apply limiter
+        # Merge the index lists of the selected temperatures, keeping the
+        # workplace order, and stop at the limiter
+        self.refresh_workplace_index()
+        positions = heapq.merge(
+            *(
+                self.temperature_index.get(temp, [])
+                for temp in self.selected_temperatures
+            )
+        )
         if limit_filter != "All":
-            limit = int(limit_filter)
-            filtered_data = filtered_data[:limit]
-
-        # Update display
-        for reg in filtered_data:
-            line = f"{reg['test_no']} | {reg['inflator_no']} | {reg['temperature_c']}°C | {reg['type']} | {reg['version']} | {reg['order']} | {reg.get('test_date', 'N/A')}"
-            if reg["pressures"]:
-                line += " | Pressure data available"
-            else:
-                line += " | No pressure data"
-            self.list_results.insert(tk.END, line)
+            positions = islice(positions, int(limit_filter))
+        positions = list(positions)
 
+        self.show_lines([self.workplace_lines[i] for i in positions])
+        filtered_data = [self.workplace_data[i] for i in positions]
         self.filtered_workplace_data = filtered_data
         self.update_workplace_counters(filtered_data)
 
     def export_database_to_excel(self):
+        from export_database import export_database_to_excel
+
         export_database_to_excel(self)
 
     def show_report(self):
+        # Loaded on first use: the report pulls in matplotlib and the exporters
+        from report import show_report
+
         show_report(self)
 
     def close_application(self):
@@ -293,20 +307,33 @@ class WorkplaceManager:
             print(f"Error closing application: {str(e)}")
             raise
 
+    def refresh_workplace_index(self):
+        """Bring the formatted lines and temperature index up to date.
+
+        Records appended to workplace_data are formatted on their own; when
+        the list was replaced or shrunk, everything is rebuilt.
+        """
+        data = self.workplace_data
+        start = len(self.workplace_lines)
+        if data is not self._indexed_data or len(data) < start:
+            self.workplace_lines = []
+            self.temperature_index = {}
+            self._indexed_data = data
+            start = 0
+        for position in range(start, len(data)):
+            reg = data[position]
+            self.workplace_lines.append(format_workplace_line(reg))
+            self.temperature_index.setdefault(reg["type"], []).append(position)
+
+    def show_lines(self, lines):
+        """Replace the listbox contents with the header and `lines` in one go."""
+        self.list_results.delete(0, tk.END)
+        self.list_results.insert(tk.END, HEADER, "-" * len(HEADER), *lines)
+
     def update_workplace_display(self):
         """Update the workplace listbox display."""
-        self.list_results.delete(0, tk.END)
-        header = "Test | Inflator | Temperature | Type | Version | Order | Date"
-        self.list_results.insert(tk.END, header)
-        self.list_results.insert(tk.END, "-" * len(header))
-
-        for reg in self.workplace_data:
-            line = f"{reg['test_no']} | {reg['inflator_no']} | {reg['temperature_c']}°C | {reg['type']} | {reg['version']} | {reg['order']} | {reg.get('test_date', 'N/A')}"
-            if reg["pressures"]:
-                line += " | Pressure data available"
-            else:
-                line += " | No pressure data"
-            self.list_results.insert(tk.END, line)
+        self.refresh_workplace_index()
+        self.show_lines(self.workplace_lines)
         self.update_workplace_counters()
 
     def update_workplace_counters(self, data=None):
@@ -331,6 +358,7 @@ class WorkplaceManager:
     def clear_workplace(self):
         """Clear all data from the workplace."""
         self.workplace_data.clear()
+        self.refresh_workplace_index()
         self.list_results.delete(0, tk.END)
         messagebox.showinfo("Success", "Workplace cleared successfully.")
         self.update_workplace_counters()